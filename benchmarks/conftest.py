@@ -0,0 +1,10 @@
+"""
+pytest-benchmark suites; run with ``pytest benchmarks --benchmark-json=out.json``.
+
+These are not part of the test suite and need ``pip install pytest-benchmark``.
+"""
+
+import importlib.util
+
+if importlib.util.find_spec("pytest_benchmark") is None:
+    collect_ignore_glob = ["test_*.py"]
@@ -0,0 +1,41 @@
+"""Agent loop overhead per request against the mock Ollama server."""
+
+import asyncio
+
+import pytest
+
+from smart_agent.agent import SmartAgent, create_client
+from smart_agent.config import Settings
+from smart_agent.mock_ollama import mock_transport
+
+
+@pytest.fixture
+def agent():
+    settings = Settings(response_cache_size=0)
+    return SmartAgent(
+        client=create_client(settings, transport=mock_transport()),
+        validate_health=False,
+        settings=settings,
+    )
+
+
+def test_direct_answer(benchmark, agent):
+    loop = asyncio.new_event_loop()
+    try:
+        response = benchmark(lambda: loop.run_until_complete(agent.run("hello")))
+    finally:
+        loop.close()
+    assert response.content
+
+
+def test_tool_round_trip(benchmark, agent, tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n3,4\n")
+    loop = asyncio.new_event_loop()
+    try:
+        response = benchmark(
+            lambda: loop.run_until_complete(agent.run(f"summarize {path}"))
+        )
+    finally:
+        loop.close()
+    assert response.tool_name == "CSV Tool"
@@ -0,0 +1,39 @@
+"""Tool parsing throughput on generated files."""
+
+import asyncio
+
+import pytest
+
+from smart_agent.bench import generate_csv, generate_markdown, parse_size
+from smart_agent.tools.csv_tool import CsvTool
+from smart_agent.tools.md_tool import MarkdownTool
+
+SIZES = ["1MB", "10MB"]
+
+
+@pytest.fixture(scope="module")
+def data_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("bench-data")
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("engine", ["rows", "stream", "columnar"])
+def test_csv_tool(benchmark, data_dir, size, engine):
+    path = str(data_dir / f"{size}.csv")
+    generate_csv(path, parse_size(size))
+    tool = CsvTool(engine=engine)
+    tool.cache_results = False
+
+    result = benchmark(lambda: asyncio.run(tool.run(file_path=path)))
+    assert "error" not in result.meta
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_markdown_tool(benchmark, data_dir, size):
+    path = str(data_dir / f"{size}.md")
+    generate_markdown(path, parse_size(size))
+    tool = MarkdownTool()
+    tool.cache_results = False
+
+    result = benchmark(lambda: asyncio.run(tool.run(file_path=path)))
+    assert "error" not in result.meta
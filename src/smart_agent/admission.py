@@ -0,0 +1,211 @@
+"""Admission control for API requests: bounded, fair, prioritized queueing."""
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Served strictly in this order; batch work runs only when no interactive waits
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Weight of the newest sample in the service time average used for Retry-After
+_EWMA_ALPHA = 0.2
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a request cannot be queued.
+
+    Attributes:
+        retry_after (int): Suggested seconds before retrying.
+        status_code (int): 429 if the client exceeded its own share of the
+            queue, 503 if the server as a whole is at capacity.
+    """
+
+    def __init__(self, message: str, retry_after: int, status_code: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+@dataclass
+class Ticket:
+    """
+    An admitted (or waiting) request.
+
+    Attributes:
+        client_id (str): Client the request is accounted to.
+        priority (str): One of ``PRIORITIES``.
+        position (int): Estimated queue position on arrival; 0 if admitted
+            immediately.
+    """
+
+    client_id: str
+    priority: str
+    position: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    admitted_at: float | None = None
+    released: bool = False
+
+    @property
+    def wait_seconds(self) -> float:
+        return (self.admitted_at or time.monotonic()) - self.enqueued_at
+
+
+class AdmissionController:
+    """
+    Limits how many requests run at once and queues the rest.
+
+    Waiting requests are grouped by priority class and then by client; within a
+    class, clients are served round-robin so one busy client cannot starve the
+    others. The queue is bounded overall and per client, and a full queue fails
+    fast with ``QueueFullError`` instead of adding unbounded latency.
+    """
+
+    def __init__(
+        self,
+        max_active: int = 8,
+        max_queued: int = 64,
+        max_queued_per_client: int = 16,
+    ):
+        self.max_active = max(1, max_active)
+        self.max_queued = max_queued
+        self.max_queued_per_client = max_queued_per_client
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self._service_seconds = 1.0
+        self._queues: dict[str, OrderedDict[str, deque[asyncio.Future[None]]]] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+
+    async def acquire(self, client_id: str, priority: str = INTERACTIVE) -> Ticket:
+        """
+        Wait for a slot.
+
+        Args:
+            client_id: Identity used for per-client fairness and limits.
+            priority: One of ``PRIORITIES``.
+
+        Returns:
+            Ticket: Pass to ``release`` when the request finishes.
+
+        Raises:
+            ValueError: If ``priority`` is not a known class.
+            QueueFullError: If the request cannot be queued.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(
+                f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}"
+            )
+        ticket = Ticket(client_id, priority)
+        if self.active < self.max_active and self.queued == 0:
+            self.active += 1
+            ticket.admitted_at = time.monotonic()
+            return ticket
+
+        clients = self._queues[priority]
+        waiting = clients.get(client_id)
+        if waiting is not None and len(waiting) >= self.max_queued_per_client:
+            self._reject(
+                f"Client '{client_id}' already has {len(waiting)} requests queued", 429
+            )
+        if self.queued >= self.max_queued:
+            self._reject("Server is at capacity, try again later", 503)
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiting = clients.setdefault(client_id, deque())
+        waiting.append(future)
+        self.queued += 1
+        ticket.position = self._position(priority, client_id, len(waiting))
+        logger.debug(f"Queued request from '{client_id}' at position {ticket.position}")
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as the caller gave up
+                self._release_slot()
+            else:
+                self._remove(priority, client_id, future)
+            raise
+        ticket.admitted_at = time.monotonic()
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot for the next waiter; safe to call twice."""
+        if ticket.released or ticket.admitted_at is None:
+            return
+        ticket.released = True
+        elapsed = time.monotonic() - ticket.admitted_at
+        self._service_seconds += _EWMA_ALPHA * (elapsed - self._service_seconds)
+        self._release_slot()
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue is expected to drain."""
+        drain = self._service_seconds * (self.queued + 1) / self.max_active
+        return max(1, math.ceil(drain))
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "queued_by_priority": {
+                priority: sum(len(waiting) for waiting in clients.values())
+                for priority, clients in self._queues.items()
+            },
+            "rejected": self.rejected,
+            "retry_after": self.retry_after(),
+        }
+
+    def _reject(self, message: str, status_code: int) -> None:
+        self.rejected += 1
+        logger.warning(f"Rejected request: {message}")
+        raise QueueFullError(message, self.retry_after(), status_code)
+
+    def _position(self, priority: str, client_id: str, index: int) -> int:
+        """Estimate the 1-based dispatch position of a client's ``index``-th waiter."""
+        ahead = 0
+        for other in PRIORITIES[: PRIORITIES.index(priority)]:
+            ahead += sum(len(waiting) for waiting in self._queues[other].values())
+        # Round-robin: every other client gets up to ``index`` turns first
+        for other_client, waiting in self._queues[priority].items():
+            if other_client != client_id:
+                ahead += min(len(waiting), index)
+        return ahead + index
+
+    def _release_slot(self) -> None:
+        future = self._next_waiter()
+        if future is None:
+            self.active -= 1
+        else:
+            # The slot passes straight to the waiter; ``active`` is unchanged
+            future.set_result(None)
+
+    def _next_waiter(self) -> asyncio.Future[None] | None:
+        for clients in self._queues.values():
+            while clients:
+                client_id, waiting = next(iter(clients.items()))
+                future = waiting.popleft()
+                self.queued -= 1
+                if waiting:
+                    clients.move_to_end(client_id)
+                else:
+                    del clients[client_id]
+                if not future.done():
+                    return future
+        return None
+
+    def _remove(self, priority: str, client_id: str, future: asyncio.Future) -> None:
+        waiting = self._queues[priority].get(client_id)
+        if waiting is None or future not in waiting:
+            return
+        waiting.remove(future)
+        self.queued -= 1
+        if not waiting:
+            del self._queues[priority][client_id]
@@ -1,12 +1,37 @@
+import asyncio
+import functools
 import logging
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any
 
-from ollama import AsyncClient, Message
+import httpx
 
+from ollama import AsyncClient, ChatResponse, Message, Tool
+
+from . import metrics, tracing
+from .cache import ResponseCache, is_path_argument, stable_hash
+from .config import Settings
+from .context import ContextBuilder
+from .logging_setup import Truncated
+from .model_lifecycle import ModelLifecycle, parse_keep_alive
 from .ollama_health import validate_ollama_setup_async
-from .tools.base_tool import BaseTool
+from .response import AgentResponse, Stage
+from .routing import ModelRouter
+from .tools.base_tool import BaseTool, ToolResult
 
 logger = logging.getLogger(__name__)
 
+# Files read by tools during the current query, for response cache invalidation
+_touched_files: ContextVar[list[str] | None] = ContextVar("touched_files", default=None)
+# Directory relative tool paths resolve against; None: the process's own
+_working_dir: ContextVar[str | None] = ContextVar("working_dir", default=None)
+
 SYS_PROMPT = """You are a highly capable and resourceful AI assistant.
 You can answer questions, solve problems, and perform tasks by leveraging the tools available to you.
 When using tools, ensure their outputs are accurate and relevant to the user's query.
@@ -26,82 +51,1021 @@ Example:
 user: give me information about options.md -> use tool <tool_name> with args {"file_path": "options.md"}
 """
 
+# Returned when the final round produced no text
+NO_RESPONSE = "No response from model."
+
+
+def create_transport(settings: Settings | None = None) -> httpx.AsyncHTTPTransport:
+    """
+    Create a bounded keep-alive connection pool to Ollama.
+
+    Args:
+        settings: Pool configuration (default: read from the environment)
+
+    Returns:
+        httpx.AsyncHTTPTransport: The pool; whoever creates it closes it
+    """
+    settings = settings or Settings.from_env()
+    return httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.pool_size,
+            max_keepalive_connections=settings.pool_size,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+    )
+
+
+def create_client(
+    settings: Settings | None = None,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> AsyncClient:
+    """
+    Create an Ollama client with a bounded keep-alive connection pool.
+
+    Args:
+        settings: Pool configuration (default: read from the environment)
+        transport: Custom transport, e.g. an in-process mock Ollama server
+
+    Returns:
+        AsyncClient: A client meant to be shared for the process lifetime
+    """
+    return AsyncClient(transport=transport or create_transport(settings))
+
+
+@dataclass
+class ToolTiming:
+    """
+    Outcome of one tool call.
+
+    Attributes:
+        name (str): Tool name as requested by the model.
+        seconds (float): Wall time including waiting for a concurrency slot.
+        status (str): ``ok``, ``error``, ``timeout`` or ``unknown``.
+    """
+
+    name: str
+    seconds: float
+    status: str
+
+
+@dataclass
+class AgentStep:
+    """
+    Timing and token usage of one round of the agent loop.
+
+    Attributes:
+        index (int): 1-based round number.
+        stage (str): Routing stage of the round: ``route``, ``synthesis``
+            or ``direct``.
+        model (str): Model that served the round.
+        model_seconds (float): Time spent waiting for the model.
+        tool_seconds (float): Time spent running this round's tool calls.
+        prompt_tokens (int): Prompt tokens evaluated by the model.
+        completion_tokens (int): Tokens generated by the model.
+        load_seconds (float): Model load time reported by Ollama.
+        prompt_eval_seconds (float): Prompt evaluation time reported by Ollama.
+        eval_seconds (float): Generation time reported by Ollama.
+        tool_calls (list[str]): Names of the tools the model called.
+        tools (list[ToolTiming]): Timing of each of those calls, in call order.
+        prefix_hit (bool | None): Whether Ollama reused the cached prompt
+            prefix, judged from ``prompt_tokens`` on a request's first round;
+            None on later rounds or if the prefix length is unknown.
+        empty (bool): Whether this final round produced no answer text, so
+            a placeholder was returned instead.
+    """
+
+    index: int
+    stage: str = ""
+    model: str = ""
+    model_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    load_seconds: float = 0.0
+    prompt_eval_seconds: float = 0.0
+    eval_seconds: float = 0.0
+    tool_calls: list[str] = field(default_factory=list)
+    tools: list[ToolTiming] = field(default_factory=list)
+    prefix_hit: bool | None = None
+    empty: bool = False
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def failed(self) -> bool:
+        """Whether the round's answer or any of its tool calls is missing."""
+        return self.empty or any(tool.status != "ok" for tool in self.tools)
+
+
+class _Budget:
+    """Tracks the step, token and time limits of a single ``generate`` call."""
+
+    def __init__(
+        self, max_steps: int, token_budget: int | None, time_budget: float | None
+    ):
+        self.max_steps = max(1, max_steps)
+        self.token_budget = token_budget
+        self.deadline = time.monotonic() + time_budget if time_budget else None
+        self.tokens = 0
+
+    def allows_tools(self, step: int) -> bool:
+        """Whether round ``step`` may still call tools or must answer."""
+        if step >= self.max_steps:
+            return False
+        if self.token_budget and self.tokens >= self.token_budget:
+            logger.info(f"Token budget of {self.token_budget} spent, answering")
+            return False
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            logger.info("Time budget spent, answering")
+            return False
+        return True
+
+
+class ChatScheduler:
+    """
+    Admission gate in front of ``AsyncClient.chat`` for one process.
+
+    At most ``max_concurrent`` calls reach Ollama at once so its own request
+    parallelism is not oversubscribed; further calls wait in FIFO order.
+    Identical non-streaming calls that are already in flight are merged into
+    a single request whose response every caller receives (singleflight).
+    """
+
+    def __init__(self, max_concurrent: int = 4, wait_window: int = 1024):
+        self.max_concurrent = max(1, max_concurrent)
+        self.calls = 0
+        self.coalesced = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.running = 0
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._inflight: dict[str, asyncio.Task[ChatResponse]] = {}
+        # Recent queue wait times in seconds, for the reported averages
+        self._waits: deque[float] = deque(maxlen=wait_window)
+
+    async def chat(
+        self, key: str, call: Callable[[], Awaitable[ChatResponse]]
+    ) -> ChatResponse:
+        """
+        Run ``call`` under the concurrency cap, joining an identical call.
+
+        Args:
+            key: Identity of the request; equal keys are coalesced.
+            call: Starts the request; invoked only once a slot is free.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug("Coalesced an identical in-flight chat request")
+        else:
+            task = asyncio.create_task(self._run(call))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        # Shielded so one caller giving up does not cancel the others
+        return await asyncio.shield(task)
+
+    async def stream(
+        self, call: Callable[[], Awaitable[AsyncIterator[ChatResponse]]]
+    ) -> AsyncIterator[ChatResponse]:
+        """Hold a slot while a streamed response is consumed."""
+        await self._acquire()
+        try:
+            async for chunk in await call():
+                yield chunk
+        finally:
+            self._release()
+
+    def stats(self) -> dict[str, float]:
+        waits = sorted(self._waits)
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "running": self.running,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queued,
+            "wait_avg_ms": round(1000 * sum(waits) / len(waits), 3) if waits else 0.0,
+            "wait_p95_ms": (
+                round(1000 * waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0
+            ),
+        }
+
+    async def _run(self, call: Callable[[], Awaitable[ChatResponse]]) -> ChatResponse:
+        await self._acquire()
+        try:
+            return await call()
+        finally:
+            self._release()
+
+    async def _acquire(self) -> None:
+        self.calls += 1
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        enqueued = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        waited = time.perf_counter() - enqueued
+        self._waits.append(waited)
+        metrics.LLM_QUEUE_SECONDS.observe(waited)
+        self.running += 1
+
+    def _release(self) -> None:
+        self.running -= 1
+        self._semaphore.release()
+
+    def _forget(self, key: str, task: "asyncio.Task[ChatResponse]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the outcome so a failure nobody awaited is not logged as lost
+        if not task.cancelled():
+            task.exception()
+
+
+class UnknownToolError(Exception):
+    """Raised when the model calls a tool that is not registered."""
+
+    pass
+
 
 class LLaMA3Client:
-    def __init__(self, tools: list[BaseTool], system_prompt: str):
-        self.client = AsyncClient()
-        self.tools = tools
+    def __init__(
+        self,
+        tools: list[BaseTool],
+        system_prompt: str,
+        context_builder: ContextBuilder | None = None,
+        max_concurrent_tools: int = 4,
+        tool_timeout: float | None = 30.0,
+        client: AsyncClient | None = None,
+        max_steps: int = 5,
+        token_budget: int | None = None,
+        time_budget: float | None = None,
+        scheduler: ChatScheduler | None = None,
+        lifecycle: ModelLifecycle | None = None,
+        options: Mapping[str, Any] | None = None,
+        router: ModelRouter | None = None,
+    ):
+        """
+        Args:
+            tools: Tools offered to the model.
+            system_prompt: System message prepended to every conversation.
+            context_builder: Packs tool results into the model context.
+            max_concurrent_tools: Tool calls run in parallel per round.
+            tool_timeout: Seconds a single tool call may take.
+            client: Ollama client (default: a new unpooled one).
+            max_steps: Model rounds per prompt; the last round must answer.
+            token_budget: Prompt + completion tokens after which the model is
+                asked to answer instead of calling more tools.
+            time_budget: Seconds after which the model is asked to answer.
+            scheduler: Gate shared by every chat call to Ollama.
+            lifecycle: Supplies ``keep_alive`` for every chat call and
+                records model use and load times.
+            options: Ollama model options sent unchanged with every call,
+                e.g. ``num_ctx``. Changing them between calls makes Ollama
+                reload the model and drop its prompt cache.
+            router: Model of each stage (default: the default model for all).
+        """
+        self.client = client or AsyncClient()
+        self.router = router or ModelRouter()
+        self.options = dict(options) if options else None
         self.system_prompt = system_prompt
+        self.tools = tools  # builds the name index and schema list
+        self.context_builder = context_builder or ContextBuilder()
+        self.max_concurrent_tools = max_concurrent_tools
+        self.tool_timeout = tool_timeout
+        self.max_steps = max_steps
+        self.token_budget = token_budget
+        self.time_budget = time_budget
+        self.scheduler = scheduler or ChatScheduler()
+        self.lifecycle = lifecycle
+        # Set by pin_prefix: the prefix it measured and its length in tokens
+        # for each model that is offered tools
+        self.prefix_tokens: dict[str, int] = {}
+        self._pinned_prefix: str | None = None
+
+    @property
+    def model(self) -> str:
+        """The main model, which writes answers from tool results."""
+        return self.router.synthesis
+
+    @model.setter
+    def model(self, model: str) -> None:
+        """Use ``model`` for every stage."""
+        self.router = ModelRouter.single(model)
+
+    @property
+    def tools(self) -> list[BaseTool]:
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools: list[BaseTool]) -> None:
+        """Replace the tool set and rebuild the dispatch index and schemas."""
+        index: dict[str, BaseTool] = {}
+        for tool in tools:
+            name = tool.get_name()
+            if name in index:
+                logger.warning(f"Duplicate tool name '{name}', keeping the first")
+                continue
+            index[name] = tool
+        self._tools = list(index.values())
+        self._tool_index: Mapping[str, BaseTool] = MappingProxyType(index)
+        # Validated once here instead of on every chat call. Tools are sorted
+        # by name so the serialized tools (and with them the prompt prefix
+        # Ollama can reuse) do not depend on plugin load order. Validation
+        # emits model fields in pydantic's field order; _canonical only fixes
+        # the order of free-form mappings such as the parameter properties.
+        schemas = sorted(
+            (_canonical(tool.to_ollama_tool()) for tool in self._tools),
+            key=lambda schema: schema.get("function", {}).get("name", ""),
+        )
+        self._tool_schemas: tuple[Tool, ...] = tuple(
+            Tool.model_validate(schema) for schema in schemas
+        )
+        self.tool_schema_hash = stable_hash(
+            [schema.model_dump(exclude_none=True) for schema in self._tool_schemas]
+        )
+
+    @property
+    def prefix_hash(self) -> str:
+        """Identifies the prompt prefix: models, options, system prompt, tools."""
+        return stable_hash(
+            self.router.key, self.options, self.system_prompt, self.tool_schema_hash
+        )
+
+    async def pin_prefix(self) -> dict[str, int]:
+        """
+        Have Ollama evaluate the stable prompt prefix (system prompt and tool
+        schemas) once per model that is offered tools, so later requests start
+        from its cached state, and measure the prefix length in tokens.
+
+        Returns:
+            dict[str, int]: Prefix tokens per model; models for which Ollama
+                reported no count are left out.
+        """
+        self.prefix_tokens = {}
+        for model in dict.fromkeys((self.router.route, self.router.synthesis)):
+            response = await self.client.chat(
+                model=model,
+                messages=self._initial_messages(""),
+                tools=self._tool_schemas or None,
+                options={**(self.options or {}), "num_predict": 1},
+                keep_alive=self._keep_alive(model),
+            )
+            if response.prompt_eval_count:
+                self.prefix_tokens[model] = response.prompt_eval_count
+            logger.info(
+                f"Pinned prompt prefix {self.prefix_hash[:12]} for {model}: "
+                f"{response.prompt_eval_count or 'unknown'} tokens"
+            )
+        self._pinned_prefix = self.prefix_hash
+        return self.prefix_tokens
+
+    @property
+    def tool_schemas(self) -> tuple[Tool, ...]:
+        return self._tool_schemas
+
+    def get_tool(self, name: str) -> BaseTool:
+        """
+        Look up a registered tool by name.
+
+        Raises:
+            UnknownToolError: If no tool with that name is registered.
+        """
+        try:
+            return self._tool_index[name]
+        except KeyError:
+            available = ", ".join(self._tool_index) or "none"
+            raise UnknownToolError(
+                f"Unknown tool '{name}'. Available tools: {available}"
+            ) from None
+
+    async def generate(self, prompt: str, steps: list[AgentStep] | None = None) -> str:
+        """
+        Answer ``prompt``, letting the model chain tool calls over several rounds.
+
+        Tools are offered on every round until the model answers without
+        calling one, or until the step, token or time budget is spent, in which
+        case a final round without tools forces an answer. The first round
+        uses the router's route model and later rounds its synthesis model;
+        if the first round needs no tools and the direct model differs, the
+        direct model is asked again without tools for the answer.
+
+        Args:
+            prompt (str): The user prompt.
+            steps (list[AgentStep] | None): Receives the timing of every round.
+
+        Returns:
+            str: The model's final answer.
+        """
+        steps = [] if steps is None else steps
+        budget = self._budget()
+        messages = self._initial_messages(prompt)
+        direct = False
+        for index in range(1, budget.max_steps + 1):
+            offer_tools = budget.allows_tools(index) and not direct
+            step = self._step(index, offer_tools, direct)
+            started = time.perf_counter()
+            with tracing.span(
+                "llm.chat", model=step.model, stage=step.stage, step=index, stream=False
+            ) as span:
+                response = await self._chat(messages, offer_tools, step.model)
+                step.model_seconds = time.perf_counter() - started
+                _record_usage(step, response)
+                self._observe(step, span, stream=False)
+            budget.tokens += step.tokens
+            steps.append(step)
+
+            tool_calls = response.message.tool_calls
+            if not tool_calls and self._reroutes(step, offer_tools):
+                direct = True
+                continue
+            if not offer_tools or not tool_calls:
+                self._log_steps(steps)
+                step.empty = not response.message.content
+                return response.message.content or NO_RESPONSE
+
+            await self._run_step(step, messages, response.message, tool_calls)
+        raise AssertionError("unreachable: the last round never offers tools")
+
+    async def generate_stream(
+        self, prompt: str, steps: list[AgentStep] | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Like ``generate`` but yields the answer incrementally as Ollama produces it.
+
+        Each round is streamed; tool calls collected from a round are executed
+        and the conversation continues until a round calls no tools. Text of a
+        routing round whose answer goes to a different direct model is held
+        back and dropped if the round calls no tools.
+        """
+        steps = [] if steps is None else steps
+        budget = self._budget()
+        messages = self._initial_messages(prompt)
+        produced = False
+        direct = False
+        for index in range(1, budget.max_steps + 1):
+            offer_tools = budget.allows_tools(index) and not direct
+            step = self._step(index, offer_tools, direct)
+            hold = self._reroutes(step, offer_tools)
+            started = time.perf_counter()
+            content: list[str] = []
+            tool_calls: list[Message.ToolCall] = []
+            with tracing.span(
+                "llm.chat", model=step.model, stage=step.stage, step=index, stream=True
+            ) as span:
+                async for chunk in self.scheduler.stream(
+                    functools.partial(
+                        self._open_stream, messages, offer_tools, step.model
+                    )
+                ):
+                    if chunk.message.tool_calls:
+                        tool_calls.extend(chunk.message.tool_calls)
+                    if chunk.message.content:
+                        content.append(chunk.message.content)
+                        if not hold:
+                            produced = True
+                            yield chunk.message.content
+                    if chunk.done:
+                        _record_usage(step, chunk)
+                step.model_seconds = time.perf_counter() - started
+                self._observe(step, span, stream=True)
+            budget.tokens += step.tokens
+            steps.append(step)
+
+            if hold and not tool_calls:
+                direct = True
+                continue
+            if not offer_tools or not tool_calls:
+                break
+            message = Message(
+                role="assistant", content="".join(content), tool_calls=tool_calls
+            )
+            await self._run_step(step, messages, message, tool_calls)
 
-    async def generate(self, prompt: str) -> str:
+        self._log_steps(steps)
+        if not produced:
+            steps[-1].empty = True
+            yield NO_RESPONSE
+
+    def _step(self, index: int, offer_tools: bool, direct: bool) -> AgentStep:
+        """Start round ``index`` with the stage and model the router picks."""
+        if direct or (index == 1 and not offer_tools):
+            stage = "direct"
+        elif index == 1:
+            stage = "route"
+        else:
+            stage = "synthesis"
+        return AgentStep(index, stage=stage, model=self.router.model_for(stage))
+
+    def _reroutes(self, step: AgentStep, offer_tools: bool) -> bool:
+        """Whether a tool-free answer to ``step`` goes to the direct model."""
+        return offer_tools and step.stage == "route" and self.router.reroutes_direct
+
+    async def _chat(
+        self, messages: list[Message], offer_tools: bool, model: str
+    ) -> ChatResponse:
+        """Send one chat request through the scheduler."""
+        tools = self._tool_schemas if offer_tools else None
+        key = stable_hash(
+            model,
+            [_message_dict(message) for message in messages],
+            self.tool_schema_hash if offer_tools else None,
+        )
+        # Snapshot the messages: the caller appends to its list while we wait
+        call = functools.partial(
+            self.client.chat,
+            model=model,
+            messages=list(messages),
+            tools=tools,
+            options=self.options,
+            keep_alive=self._keep_alive(model),
+        )
+        return await self.scheduler.chat(key, call)
+
+    async def _open_stream(
+        self, messages: list[Message], offer_tools: bool, model: str
+    ) -> AsyncIterator[ChatResponse]:
+        return await self.client.chat(
+            model=model,
+            messages=messages,
+            tools=self._tool_schemas if offer_tools else None,
+            stream=True,
+            options=self.options,
+            keep_alive=self._keep_alive(model),
+        )
+
+    def _keep_alive(self, model: str) -> float | str | None:
+        if self.lifecycle is None:
+            return None
+        self.lifecycle.touch(model)
+        return self.lifecycle.keep_alive
+
+    def _budget(self) -> _Budget:
+        return _Budget(self.max_steps, self.token_budget, self.time_budget)
+
+    async def _run_step(
+        self,
+        step: AgentStep,
+        messages: list[Message],
+        message: Message,
+        tool_calls: Sequence[Message.ToolCall],
+    ) -> None:
+        """Append the assistant's tool calls and their results to ``messages``."""
+        step.tool_calls = [call.function.name for call in tool_calls]
+        started = time.perf_counter()
+        messages.append(message)
+        messages.extend(await self._run_tool_calls(tool_calls, step))
+        step.tool_seconds = time.perf_counter() - started
+
+    def _observe(
+        self, step: AgentStep, span: tracing.Span | tracing._NoopSpan, stream: bool
+    ) -> None:
+        model, mode = step.model, str(stream).lower()
+        prefix_tokens = self.prefix_tokens.get(model)
+        # Only the first round sends just the prefix plus the user message;
+        # later rounds append tool output that can outgrow the prefix itself
+        first = step.stage == "route"
+        if first and prefix_tokens and self._pinned_prefix == self.prefix_hash:
+            # A reused prefix is not evaluated again, so fewer prompt tokens
+            # than the prefix alone means Ollama's cache served it
+            step.prefix_hit = step.prompt_tokens < prefix_tokens
+            metrics.LLM_PREFIX_REUSE.inc(
+                model=model, result="hit" if step.prefix_hit else "miss"
+            )
+        if span.recording:
+            span.set_attributes(
+                prefix_hit=step.prefix_hit,
+                prompt_tokens=step.prompt_tokens,
+                completion_tokens=step.completion_tokens,
+                load_ms=_ms(step.load_seconds),
+                eval_ms=_ms(step.eval_seconds),
+            )
+        metrics.LLM_CHAT_SECONDS.observe(step.model_seconds, model=model, stream=mode)
+        metrics.LLM_PROMPT_TOKENS.observe(step.prompt_tokens, model=model)
+        metrics.LLM_EVAL_TOKENS.observe(step.completion_tokens, model=model)
+        metrics.LLM_EVAL_SECONDS.observe(step.eval_seconds, model=model)
+        if self.lifecycle is not None:
+            self.lifecycle.observe_load(model, step.load_seconds, request=True)
+
+    @staticmethod
+    def _log_steps(steps: list[AgentStep]) -> None:
+        for step in steps:
+            logger.info(
+                f"Step {step.index} ({step.stage}, {step.model}): "
+                f"model {step.model_seconds:.2f}s, "
+                f"tools {step.tool_seconds:.2f}s, {step.tokens} tokens, "
+                f"tool calls: {', '.join(step.tool_calls) or 'none'}"
+            )
+
+    def _initial_messages(self, prompt: str) -> list[Message]:
         messages: list[Message] = []
         if self.system_prompt:
             messages.append(Message(role="system", content=self.system_prompt))
         messages.append(Message(role="user", content=prompt))
-        response = await self.client.chat(
-            model="llama3.1:8b",
-            messages=messages,
-            tools=[tool.to_ollama_tool() for tool in self.tools],
-        )
-
-        if response.message.tool_calls:
-            # Add the assistant's tool call message
-            messages.append(response.message)
-
-            # Process each tool call
-            for tool_call in response.message.tool_calls:
-                logger.info(f"Calling function: {tool_call.function.name}")
-                logger.debug(f"Arguments: {tool_call.function.arguments}")
-
-                # Find the tool by name and call it
-                tool_name = tool_call.function.name
-                for tool in self.tools:
-                    if tool.get_name() == tool_name:
-                        result = await tool.run(**tool_call.function.arguments)
-                        logger.info(f"Tool result: {result}")
-
-                        # Add tool result to conversation
-                        messages.append(
-                            Message(
-                                role="tool",
-                                content=f"Tool '{tool.get_name()}' returned: {result.data}\nMetadata: {result.meta}",
-                                tool_name=tool.get_name(),
-                            )
-                        )
-                        break
-
-            # Get final response from model with tool results
-            final_response = await self.client.chat(
-                model="llama3.1:8b", messages=messages
+        return messages
+
+    async def _run_tool_calls(
+        self, tool_calls: Sequence[Message.ToolCall], step: AgentStep | None = None
+    ) -> list[Message]:
+        """Run tool calls concurrently; results keep the original call order."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_tools)
+        results = await asyncio.gather(
+            *(self._call_tool(tool_call, semaphore) for tool_call in tool_calls)
+        )
+        if step is not None:
+            step.tools = [timing for _, timing in results]
+        return [message for message, _ in results]
+
+    async def _call_tool(
+        self, tool_call: Message.ToolCall, semaphore: asyncio.Semaphore
+    ) -> tuple[Message, ToolTiming]:
+        """Run a single tool call and return its budgeted tool message."""
+        logger.info(f"Calling function: {tool_call.function.name}")
+        logger.debug("Arguments: %s", Truncated(tool_call.function.arguments))
+
+        tool_name = tool_call.function.name
+        started = time.perf_counter()
+        arguments = _resolve_paths(tool_call.function.arguments, _working_dir.get())
+        touched = _touched_files.get()
+        if touched is not None:
+            touched.extend(
+                value
+                for name, value in arguments.items()
+                if isinstance(value, str) and is_path_argument(name)
             )
-            # Simple check for thinking - avoid infinite loops
-            if (
-                hasattr(final_response.message, "thinking")
-                and final_response.message.thinking
-            ):
-                logger.debug("Model is thinking, getting final response...")
-            return (
-                final_response.message.content
-                if final_response.message.content
-                else "No response from model."
+
+        async with semaphore:
+            with tracing.span("tool.run", tool=tool_name) as span:
+                label, status = tool_name, "error"
+                try:
+                    tool = self.get_tool(tool_name)
+                    result = await asyncio.wait_for(
+                        tool.run(**arguments),
+                        timeout=self.tool_timeout,
+                    )
+                    if "error" not in (result.meta or {}):
+                        status = "ok"
+                except UnknownToolError as e:
+                    # Report back so the model can correct itself instead of
+                    # silently answering without the data it asked for
+                    logger.warning(str(e))
+                    result = ToolResult(data="", meta={"error": str(e)})
+                    # Model-invented names would make the label set unbounded
+                    label = status = "unknown"
+                except asyncio.TimeoutError:
+                    status = "timeout"
+                    logger.warning(
+                        f"Tool '{tool_name}' timed out after {self.tool_timeout}s"
+                    )
+                    result = ToolResult(
+                        data="",
+                        meta={"error": f"Timed out after {self.tool_timeout} seconds."},
+                    )
+                except Exception as e:
+                    logger.error(f"Tool '{tool_name}' failed: {str(e)}")
+                    result = ToolResult(data="", meta={"error": str(e)})
+                if span.recording:
+                    span.set_attributes(
+                        status=status, **_tool_attributes(arguments, result.meta)
+                    )
+        elapsed = time.perf_counter() - started
+        metrics.TOOL_SECONDS.observe(elapsed, tool=label, status=status)
+        logger.debug("Tool result meta: %s", Truncated(result.meta))
+
+        # Add the budgeted tool result to conversation
+        packed = self.context_builder.pack(tool_name, result)
+        logger.info(
+            f"Tool '{tool_name}' context: {packed.tokens_used} "
+            f"tokens used, {packed.tokens_dropped} tokens dropped"
+        )
+        message = Message(role="tool", content=packed.content, tool_name=tool_name)
+        return message, ToolTiming(tool_name, elapsed, status)
+
+
+def _resolve_paths(
+    arguments: Mapping[str, Any], working_dir: str | None
+) -> dict[str, Any]:
+    """Make relative path arguments absolute under ``working_dir``, if given."""
+    if working_dir is None:
+        return dict(arguments)
+    return {
+        name: (
+            os.path.join(working_dir, value)
+            if isinstance(value, str)
+            and is_path_argument(name)
+            and not os.path.isabs(os.path.expanduser(value))
+            else value
+        )
+        for name, value in arguments.items()
+    }
+
+
+def _tool_attributes(
+    arguments: Mapping[str, Any], meta: Mapping[str, Any] | None
+) -> dict[str, Any]:
+    """Span attributes describing the files a tool call read and what it parsed."""
+    attributes: dict[str, Any] = {}
+    for name, value in arguments.items():
+        if isinstance(value, str) and is_path_argument(name):
+            attributes["file.path"] = value
+            try:
+                attributes["file.size"] = os.path.getsize(value)
+            except OSError:
+                pass
+    meta = meta or {}
+    if isinstance(meta.get("row_count"), int):
+        attributes["rows"] = meta["row_count"]
+    if "error" in meta:
+        attributes["error"] = str(meta["error"])
+    return attributes
+
+
+def _canonical(value: Any) -> Any:
+    """``value`` with the keys of every nested mapping in sorted order."""
+    if isinstance(value, Mapping):
+        return {key: _canonical(value[key]) for key in sorted(value)}
+    if isinstance(value, list | tuple):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def _record_usage(step: AgentStep, response: ChatResponse) -> None:
+    """Copy Ollama's token counts and timings from a final response."""
+    step.prompt_tokens = response.prompt_eval_count or 0
+    step.completion_tokens = response.eval_count or 0
+    step.load_seconds = (response.load_duration or 0) / 1e9
+    step.prompt_eval_seconds = (response.prompt_eval_duration or 0) / 1e9
+    step.eval_seconds = (response.eval_duration or 0) / 1e9
+
+
+def _stages(steps: list[AgentStep]) -> list[Stage]:
+    """Break agent rounds down into one stage per model call and tool call."""
+    stages = []
+    for step in steps:
+        stages.append(
+            Stage(
+                "llm",
+                _ms(step.model_seconds),
+                {
+                    "step": step.index,
+                    "stage": step.stage,
+                    "model": step.model,
+                    "final": step is steps[-1],
+                    "prompt_tokens": step.prompt_tokens,
+                    "eval_tokens": step.completion_tokens,
+                    "load_ms": _ms(step.load_seconds),
+                    "prompt_eval_ms": _ms(step.prompt_eval_seconds),
+                    "eval_ms": _ms(step.eval_seconds),
+                    "tokens_per_second": _rate(
+                        step.completion_tokens, step.eval_seconds
+                    ),
+                    "tool_calls": step.tool_calls,
+                    "prefix_hit": step.prefix_hit,
+                },
             )
-        else:
-            # No tool calls, return original response
-            return (
-                response.message.content
-                if response.message.content
-                else "No response from model."
+        )
+        stages.extend(
+            Stage(
+                "tool",
+                _ms(tool.seconds),
+                {"step": step.index, "tool": tool.name, "status": tool.status},
             )
+            for tool in step.tools
+        )
+    return stages
+
+
+def _usage(steps: list[AgentStep]) -> dict[str, Any]:
+    """Token and Ollama timing totals over all rounds."""
+    eval_tokens = sum(step.completion_tokens for step in steps)
+    eval_seconds = sum(step.eval_seconds for step in steps)
+    return {
+        "steps": len(steps),
+        "prompt_tokens": sum(step.prompt_tokens for step in steps),
+        "eval_tokens": eval_tokens,
+        "load_ms": _ms(sum(step.load_seconds for step in steps)),
+        "prompt_eval_ms": _ms(sum(step.prompt_eval_seconds for step in steps)),
+        "eval_ms": _ms(eval_seconds),
+        "tokens_per_second": _rate(eval_tokens, eval_seconds),
+    }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _rate(tokens: int, seconds: float) -> float:
+    return round(tokens / seconds, 2) if seconds > 0 else 0.0
+
+
+def _message_dict(message: Message | Mapping[str, Any]) -> Mapping[str, Any]:
+    if isinstance(message, Message):
+        return message.model_dump(exclude_none=True)
+    return message
 
 
 class SmartAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        client: AsyncClient | None = None,
+        validate_health: bool = True,
+        settings: Settings | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """
+        Args:
+            client: Ollama client owned by the caller, who also closes it
+                (default: one built on ``transport``).
+            validate_health: Run the Ollama health check on every ``run``.
+                Servers that track health in the background disable this.
+            settings: Runtime settings (default: read from the environment).
+            transport: Connection pool or e.g. an in-process mock Ollama
+                server for the agent's own client; closed by ``aclose``
+                (default: a pool from ``create_transport``). Ignored when
+                ``client`` is given.
+        """
         from smart_agent.registry import load_tools
 
+        settings = settings or Settings.from_env()
+        self.transport: httpx.AsyncBaseTransport | None = None
+        if client is None:
+            self.transport = transport or create_transport(settings)
+            client = AsyncClient(transport=self.transport)
+        self.settings = settings
         self.system_prompt = SYS_PROMPT
-        self.llm = LLaMA3Client(load_tools(), self.system_prompt)
+        self.validate_health = validate_health
+        self.llm = LLaMA3Client(
+            load_tools(),
+            self.system_prompt,
+            client=client,
+            max_steps=settings.max_steps,
+            token_budget=settings.token_budget or None,
+            time_budget=settings.time_budget or None,
+            scheduler=ChatScheduler(settings.llm_concurrency),
+            options={"num_ctx": settings.num_ctx} if settings.num_ctx else None,
+            router=ModelRouter.from_settings(settings),
+        )
+        self.lifecycle = ModelLifecycle(
+            self.llm.client,
+            self.llm.router.models,
+            keep_alive=parse_keep_alive(settings.keep_alive),
+            keep_warm_interval=settings.keep_warm_interval,
+            options=self.llm.options,
+        )
+        self.llm.lifecycle = self.lifecycle
+        self.cache: ResponseCache | None = None
+        if settings.response_cache_size > 0 or settings.response_cache_path:
+            self.cache = ResponseCache(
+                max_entries=settings.response_cache_size,
+                disk_path=settings.response_cache_path or None,
+                max_disk_bytes=settings.response_cache_max_bytes,
+            )
+
+    async def start(self) -> None:
+        """
+        Prepare a long-lived agent: load the models, pin the prompt prefix and
+        start keep-warm pings, as configured. Failures are logged, not raised.
+        """
+        if self.settings.warm_up:
+            await self.lifecycle.warm_up()
+        if self.settings.pin_prefix:
+            try:
+                await self.llm.pin_prefix()
+            except Exception as e:
+                logger.warning(f"Could not pin the prompt prefix: {e}")
+        self.lifecycle.start()
+
+    def reload_tools(self) -> None:
+        """Reload tool entry points and rebuild the client's dispatch index."""
+        from smart_agent.registry import reload_tools
+
+        self.llm.tools = reload_tools()
+
+    async def run(
+        self, user_query: str, working_dir: str | None = None
+    ) -> AgentResponse:
+        """
+        Answer ``user_query`` and report where the time went.
+
+        Args:
+            user_query: The question.
+            working_dir: Absolute directory that relative file paths resolve
+                against, e.g. the caller's when serving a daemon client
+                (default: the current directory).
+
+        Returns:
+            AgentResponse: The answer with one stage per cache lookup, health
+                check, model round and tool call, plus token totals.
+        """
+        with tracing.request_context(), tracing.span("agent.run") as span:
+            response = await self._run(user_query, working_dir)
+            if span.recording:
+                span.set_attributes(
+                    model=self.llm.model,
+                    cached=bool(response.meta.get("cached")),
+                    tools=response.tool_name,
+                    prompt_tokens=response.meta.get("prompt_tokens", 0),
+                    eval_tokens=response.meta.get("eval_tokens", 0),
+                )
+            return response
+
+    async def _run(self, user_query: str, working_dir: str | None) -> AgentResponse:
+        started = time.perf_counter()
+        stages: list[Stage] = []
+
+        # Cache hits skip the model (and its health check) entirely
+        cache, key = self.cache, self._cache_key(user_query, working_dir)
+        if cache is not None:
+            lookup = time.perf_counter()
+            cached = await cache.aget(key)
+            stages.append(Stage("cache", _ms(time.perf_counter() - lookup)))
+            if cached is not None:
+                logger.info("Response cache hit")
+                return AgentResponse(
+                    content=cached,
+                    tool_name="",
+                    meta={"cached": True},
+                    duration_ms=round(_ms(time.perf_counter() - started)),
+                    stages=stages,
+                )
 
-    async def run(self, user_query: str) -> str:
         # Validate Ollama setup before processing the query
-        await validate_ollama_setup_async()
-        return await self.llm.generate(user_query)
+        if self.validate_health:
+            check = time.perf_counter()
+            await validate_ollama_setup_async(*self.llm.router.models)
+            stages.append(Stage("health", _ms(time.perf_counter() - check)))
+        touched: list[str] = []
+        steps: list[AgentStep] = []
+        token = _touched_files.set(touched)
+        directory = _working_dir.set(working_dir)
+        try:
+            answer = await self.llm.generate(user_query, steps=steps)
+        finally:
+            _working_dir.reset(directory)
+            _touched_files.reset(token)
+        # A failed tool call or an empty answer must not outlive its cause
+        if cache is not None and not any(step.failed for step in steps):
+            await cache.aput(key, answer, touched)
+
+        stages.extend(_stages(steps))
+        tools = dict.fromkeys(tool.name for step in steps for tool in step.tools)
+        return AgentResponse(
+            content=answer,
+            tool_name=", ".join(tools),
+            meta={"cached": False, **_usage(steps)},
+            duration_ms=round(_ms(time.perf_counter() - started)),
+            stages=stages,
+        )
+
+    async def run_stream(
+        self, user_query: str, working_dir: str | None = None
+    ) -> AsyncIterator[str]:
+        """Stream the answer to ``user_query`` chunk by chunk; see ``run``."""
+        with tracing.request_context(), tracing.span("agent.run", stream=True):
+            async for chunk in self._run_stream(user_query, working_dir):
+                yield chunk
+
+    async def _run_stream(
+        self, user_query: str, working_dir: str | None
+    ) -> AsyncIterator[str]:
+        cache, key = self.cache, self._cache_key(user_query, working_dir)
+        if cache is not None and (cached := await cache.aget(key)) is not None:
+            logger.info("Response cache hit")
+            yield cached
+            return
+
+        if self.validate_health:
+            await validate_ollama_setup_async(*self.llm.router.models)
+        touched: list[str] = []
+        chunks: list[str] = []
+        steps: list[AgentStep] = []
+        token = _touched_files.set(touched)
+        directory = _working_dir.set(working_dir)
+        try:
+            async for chunk in self.llm.generate_stream(user_query, steps=steps):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            _working_dir.reset(directory)
+            _touched_files.reset(token)
+        if cache is not None and not any(step.failed for step in steps):
+            await cache.aput(key, "".join(chunks), touched)
+
+    def _cache_key(self, user_query: str, working_dir: str | None = None) -> str:
+        return ResponseCache.make_key(
+            user_query,
+            self.llm.router.key,
+            self.system_prompt,
+            self.llm.tool_schema_hash,
+            working_dir or os.getcwd(),
+        )
+
+    async def aclose(self) -> None:
+        """Stop keep-warm pings and close the connections and response cache."""
+        await self.lifecycle.stop()
+        if self.transport is not None:
+            await self.transport.aclose()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,188 @@
+"""Concurrent batch execution of JSONL prompts through one shared agent."""
+
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from smart_agent.agent import SmartAgent
+
+logger = logging.getLogger(__name__)
+
+# Keys accepted for the prompt text of an input record, in order of preference
+PROMPT_KEYS = ("prompt", "query", "text")
+
+
+class BatchInputError(ValueError):
+    """Raised for an input line that is not a usable prompt record."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """
+    One prompt of a batch.
+
+    Attributes:
+        id (str): Identifier copied to the output record and the checkpoint.
+        prompt (str): Text sent to the agent.
+    """
+
+    id: str
+    prompt: str
+
+
+@dataclass
+class BatchSummary:
+    """Counts of a finished batch run."""
+
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+def parse_line(line: str, line_number: int) -> BatchItem | None:
+    """
+    Parse one JSONL input line.
+
+    A line is either a JSON object with an ``id`` and one of ``PROMPT_KEYS``,
+    or a bare JSON string. Lines without an ``id`` are identified by their
+    line number.
+
+    Returns:
+        BatchItem | None: The item, or None for a blank line.
+
+    Raises:
+        BatchInputError: If the line is not valid JSON or has no prompt.
+    """
+    if not line.strip():
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise BatchInputError(f"line {line_number}: invalid JSON ({e})") from e
+
+    if isinstance(record, str):
+        return BatchItem(id=str(line_number), prompt=record)
+    if isinstance(record, dict):
+        prompt = next((record[k] for k in PROMPT_KEYS if k in record), None)
+        if isinstance(prompt, str) and prompt.strip():
+            return BatchItem(id=str(record.get("id", line_number)), prompt=prompt)
+    raise BatchInputError(
+        f"line {line_number}: expected a string or an object with one of "
+        f"{', '.join(PROMPT_KEYS)}"
+    )
+
+
+class Checkpoint:
+    """
+    Append-only file of completed item ids, one per line.
+
+    Ids are appended after their result has been written, so a crash can at
+    worst repeat the items that were in flight, never lose one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+        self._file: IO[str] = open(path, "a", encoding="utf-8")
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.done
+
+    def add(self, item_id: str) -> None:
+        self.done.add(item_id)
+        self._file.write(item_id + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+async def run_batch(
+    agent: "SmartAgent",
+    lines: Iterator[str],
+    write: Callable[[dict[str, Any]], None],
+    concurrency: int = 4,
+    timeout: float | None = None,
+    checkpoint: Checkpoint | None = None,
+) -> BatchSummary:
+    """
+    Run every prompt in ``lines`` through ``agent`` with bounded concurrency.
+
+    Input is read lazily, so stdin and files larger than memory work, and
+    results are passed to ``write`` in completion order.
+
+    Args:
+        agent: Shared agent; its connection pool and caches serve every item.
+        lines: JSONL input lines (see ``parse_line``).
+        write: Receives one result record per item.
+        concurrency: Prompts in flight at once.
+        timeout: Seconds allowed per prompt (default: no limit).
+        checkpoint: Completed ids to skip and to record successes into.
+
+    Returns:
+        BatchSummary: Counts of succeeded, failed and skipped items.
+    """
+    summary = BatchSummary()
+    queue: asyncio.Queue[BatchItem | None] = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def produce() -> None:
+        line_number = 0
+        while (line := await asyncio.to_thread(next, lines, None)) is not None:
+            line_number += 1
+            try:
+                item = parse_line(line, line_number)
+            except BatchInputError as e:
+                summary.failed += 1
+                write({"id": str(line_number), "status": "error", "error": str(e)})
+                continue
+            if item is None:
+                continue
+            if checkpoint is not None and item.id in checkpoint:
+                summary.skipped += 1
+                continue
+            await queue.put(item)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work() -> None:
+        while (item := await queue.get()) is not None:
+            try:
+                response = await asyncio.wait_for(agent.run(item.prompt), timeout)
+            except asyncio.TimeoutError:
+                record = {"id": item.id, "status": "error", "error": "timeout"}
+            except Exception as e:
+                logger.warning(f"Batch item '{item.id}' failed: {e}")
+                record = {"id": item.id, "status": "error", "error": str(e)}
+            else:
+                details = response.to_dict()
+                record = {
+                    "id": item.id,
+                    "status": "success",
+                    "response": details.pop("content"),
+                    **details,
+                }
+
+            write(record)
+            if record["status"] == "success":
+                summary.succeeded += 1
+                if checkpoint is not None:
+                    checkpoint.add(item.id)
+            else:
+                summary.failed += 1
+
+    await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    logger.info(
+        f"Batch finished: {summary.succeeded} succeeded, {summary.failed} failed, "
+        f"{summary.skipped} skipped"
+    )
+    return summary
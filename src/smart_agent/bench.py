@@ -0,0 +1,343 @@
+"""
+Benchmark suites for ``smart-agent bench``.
+
+Every suite talks to the in-process mock Ollama server, so results measure this
+package: tool parsing throughput, agent loop overhead per request, API
+throughput under concurrent load and cold start time. Reports are plain JSON
+and ``compare`` diffs two of them to spot regressions between versions.
+"""
+
+import asyncio
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, replace
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any
+
+from smart_agent.agent import SmartAgent
+from smart_agent.config import Settings
+from smart_agent.mock_ollama import MockOllamaConfig, mock_transport
+
+SUITES = ("parsing", "agent", "api", "cold-start")
+DEFAULT_SIZES = ("1MB", "10MB")
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+_CATEGORIES = ("alpha", "beta", "gamma", "delta")
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a size such as ``"512KB"``, ``"10MB"`` or ``"1GB"`` into bytes.
+
+    Raises:
+        ValueError: If the size is malformed.
+    """
+    value = text.strip().upper()
+    for unit in sorted(_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            number = value[: -len(unit)].strip()
+            try:
+                return int(float(number) * _UNITS[unit])
+            except ValueError:
+                break
+    raise ValueError(f"Invalid size '{text}', expected e.g. 512KB, 10MB or 1GB")
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Latency statistics in milliseconds for samples in seconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[min(len(ordered), int(rank)) - 1]
+
+
+def generate_csv(path: str, size: int) -> None:
+    """Write a deterministic CSV file of about ``size`` bytes."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("id,name,category,value,ratio\n")
+        written, row, lines = 0, 0, []
+        while written < size:
+            line = (
+                f"{row},item-{row % 9973},{_CATEGORIES[row % 4]},"
+                f"{(row * 37) % 10000},{(row % 1000) / 1000:.3f}\n"
+            )
+            lines.append(line)
+            written += len(line)
+            row += 1
+            if len(lines) >= 10_000:
+                f.writelines(lines)
+                lines.clear()
+        f.writelines(lines)
+
+
+def generate_markdown(path: str, size: int) -> None:
+    """Write a deterministic Markdown file of about ``size`` bytes."""
+    paragraph = (
+        "The quarterly report covers revenue, costs and regional growth. "
+        "Each section lists the figures and a short commentary.\n\n"
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        written, section = 0, 0
+        while written < size:
+            block = f"## Section {section}\n\n{paragraph * 8}"
+            f.write(block)
+            written += len(block)
+            section += 1
+
+
+async def bench_parsing(
+    directory: str, sizes: list[str], repeat: int = 3
+) -> dict[str, Any]:
+    """
+    Measure CSV and Markdown tool throughput on generated files.
+
+    Files are reused between runs when they already have the requested size,
+    and the tool result cache is bypassed so every run parses the file.
+
+    Returns:
+        dict: ``{"csv/10MB": {...}, "markdown/10MB": {...}, ...}``
+    """
+    from smart_agent.tools.csv_tool import CsvTool
+    from smart_agent.tools.md_tool import MarkdownTool
+
+    os.makedirs(directory, exist_ok=True)
+    results: dict[str, Any] = {}
+    for label in sizes:
+        size = parse_size(label)
+        cases = (
+            ("csv", "csv", generate_csv, CsvTool()),
+            ("markdown", "md", generate_markdown, MarkdownTool()),
+        )
+        for name, extension, generate, tool in cases:
+            path = os.path.join(directory, f"bench-{label.upper()}.{extension}")
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                await asyncio.to_thread(generate, path, size)
+            tool.cache_results = False
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                result = await tool.run(file_path=path)
+                timings.append(time.perf_counter() - started)
+                if "error" in (result.meta or {}):
+                    raise RuntimeError(f"{name} tool failed: {result.meta['error']}")
+            actual = os.path.getsize(path)
+            best = min(timings)
+            meta = result.meta or {}
+            results[f"{name}/{label.upper()}"] = {
+                "bytes": actual,
+                "seconds": round(best, 6),
+                "mb_per_second": round(actual / 1e6 / best, 3),
+                "rows": meta.get("row_count", meta.get("lines_count")),
+            }
+    return results
+
+
+async def bench_agent(
+    directory: str, requests: int = 200, config: MockOllamaConfig | None = None
+) -> dict[str, Any]:
+    """
+    Measure ``SmartAgent.run`` overhead per request against the mock model.
+
+    Two workloads run sequentially: direct answers (one model round) and a
+    CSV question (tool call plus a second round). Overhead is the mean
+    latency minus the time the mock spends "evaluating" and "generating".
+    """
+    config = config or MockOllamaConfig()
+    settings = replace(
+        Settings.from_env(), response_cache_size=0, response_cache_path=""
+    )
+    agent = SmartAgent(
+        transport=mock_transport(config),
+        validate_health=False,
+        settings=settings,
+    )
+    os.makedirs(directory, exist_ok=True)
+    csv_path = os.path.join(directory, "bench-agent.csv")
+    await asyncio.to_thread(generate_csv, csv_path, 16 * 1024)
+
+    results: dict[str, Any] = {}
+    workloads = (
+        ("direct", "What is the capital of France? ({i})", 1),
+        ("tool", "Summarize " + csv_path + " ({i})", 2),
+    )
+    try:
+        for name, template, rounds in workloads:
+            timings = []
+            for i in range(requests):
+                started = time.perf_counter()
+                await agent.run(template.format(i=i))
+                timings.append(time.perf_counter() - started)
+            stats = summarize(timings)
+            # Tool-calling rounds generate no text, only the last one does
+            model_ms = (config.model_seconds + config.latency * (rounds - 1)) * 1000
+            stats["overhead_ms"] = round(stats["mean_ms"] - model_ms, 3)
+            results[name] = stats
+    finally:
+        await agent.aclose()
+    return results
+
+
+async def bench_api(
+    requests: int = 500, concurrency: int = 32, config: MockOllamaConfig | None = None
+) -> dict[str, Any]:
+    """
+    Measure ``/answer`` throughput of the API app under concurrent load.
+
+    The app built by ``run.build_app`` is driven in-process over ASGI by a
+    closed-loop ``loadtest`` with ``concurrency`` users.
+    """
+    from smart_agent.loadtest import (
+        PromptMix,
+        answer_sender,
+        closed_loop,
+        in_process_client,
+    )
+
+    mix = PromptMix([("What is the capital of France?", 1.0)])
+    async with in_process_client(config) as client:
+        samples, elapsed = await closed_loop(
+            answer_sender(client), mix, users=concurrency, requests=requests
+        )
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(not sample.ok for sample in samples),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 2),
+        "latency": summarize([sample.latency for sample in samples]),
+    }
+
+
+def bench_cold_start(runs: int = 5) -> dict[str, Any]:
+    """Time fresh interpreter processes importing the CLI and listing tools."""
+    commands = {
+        "import": [sys.executable, "-c", "import smart_agent.cli"],
+        "tools_list": [
+            sys.executable,
+            "-c",
+            "from smart_agent.cli import app; app(['tools', 'list'])",
+        ],
+    }
+    results: dict[str, Any] = {}
+    for name, command in commands.items():
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run(command, check=True, capture_output=True)
+            timings.append(time.perf_counter() - started)
+        results[name] = summarize(timings)
+    return results
+
+
+async def run_benchmarks(
+    suites: list[str],
+    directory: str,
+    sizes: list[str] | None = None,
+    requests: int = 200,
+    concurrency: int = 32,
+    repeat: int = 3,
+    config: MockOllamaConfig | None = None,
+) -> dict[str, Any]:
+    """
+    Run the selected ``SUITES`` and return a JSON-serializable report.
+
+    Raises:
+        ValueError: If a suite name is unknown.
+    """
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise ValueError(
+            f"Unknown suite(s) {', '.join(sorted(unknown))}, expected {', '.join(SUITES)}"
+        )
+    config = config or MockOllamaConfig()
+    results: dict[str, Any] = {}
+    if "parsing" in suites:
+        results["parsing"] = await bench_parsing(
+            directory, list(sizes or DEFAULT_SIZES), repeat
+        )
+    if "agent" in suites:
+        results["agent"] = await bench_agent(directory, requests, config)
+    if "api" in suites:
+        results["api"] = await bench_api(requests, concurrency, config)
+    if "cold-start" in suites:
+        results["cold_start"] = await asyncio.to_thread(bench_cold_start, repeat)
+    return {
+        "version": _version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "mock_ollama": asdict(config),
+        "results": results,
+    }
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float = 0.1
+) -> tuple[list[str], list[str]]:
+    """
+    Compare two reports metric by metric.
+
+    Metrics ending in ``_per_second`` are better when higher; ``_ms`` and
+    ``seconds`` metrics are better when lower. Other values are ignored.
+
+    Returns:
+        tuple[list[str], list[str]]: One line per metric that changed by more
+            than ``threshold``, split into regressions and improvements.
+    """
+    old = _flatten(baseline.get("results", {}))
+    new = _flatten(current.get("results", {}))
+    regressions: list[str] = []
+    improvements: list[str] = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        if key.endswith("_per_second"):
+            higher_is_better = True
+        elif key.endswith("_ms") or key.endswith("seconds"):
+            higher_is_better = False
+        else:
+            continue
+        if not before:
+            continue
+        change = (after - before) / before
+        if abs(change) <= threshold:
+            continue
+        line = f"{key}: {before:g} -> {after:g} ({change:+.1%})"
+        worse = change < 0 if higher_is_better else change > 0
+        (regressions if worse else improvements).append(line)
+    return regressions, improvements
+
+
+def _flatten(value: Any, prefix: str = "") -> dict[str, float]:
+    if isinstance(value, dict):
+        flat: dict[str, float] = {}
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: float(value)}
+    return {}
+
+
+def _version() -> str:
+    try:
+        return metadata.version("smart-agent")
+    except metadata.PackageNotFoundError:
+        return "0.0.0"
@@ -0,0 +1,285 @@
+"""Response cache keyed on prompt, model, prompt/tool hashes and file fingerprints."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed from each end of a file; keeps fingerprinting O(1) in file size
+FINGERPRINT_BLOCK = 64 * 1024
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """
+    Identity of a file's content at a point in time.
+
+    Attributes:
+        path (str): Absolute path of the file.
+        mtime_ns (int): Modification time in nanoseconds.
+        size (int): Size in bytes.
+        digest (str): BLAKE2b of the first and last ``FINGERPRINT_BLOCK`` bytes.
+    """
+
+    path: str
+    mtime_ns: int
+    size: int
+    digest: str
+
+
+def fingerprint_file(path: str) -> FileFingerprint | None:
+    """Fingerprint ``path``, or return None if it is not a readable file."""
+    path = _absolute(path)
+    try:
+        stat = os.stat(path)
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            digest.update(f.read(FINGERPRINT_BLOCK))
+            if stat.st_size > FINGERPRINT_BLOCK:
+                f.seek(max(FINGERPRINT_BLOCK, stat.st_size - FINGERPRINT_BLOCK))
+                digest.update(f.read(FINGERPRINT_BLOCK))
+    except OSError:
+        return None
+    return FileFingerprint(path, stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+
+
+def _absolute(path: str) -> str:
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def _missing(path: str) -> FileFingerprint:
+    """Placeholder recording that ``path`` did not exist when cached."""
+    return FileFingerprint(_absolute(path), -1, -1, "")
+
+
+def is_path_argument(name: str) -> bool:
+    """Whether a tool argument named ``name`` holds a file path."""
+    return name == "path" or name.endswith(("_path", "file"))
+
+
+def stable_hash(*parts: object) -> str:
+    """SHA-256 over the canonical JSON encoding of ``parts``."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry."""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+@dataclass
+class _Entry:
+    response: str
+    files: list[FileFingerprint]
+
+    @property
+    def size(self) -> int:
+        return len(self.response.encode("utf-8"))
+
+    def is_fresh(self) -> bool:
+        # A file that was missing must still be missing, e.g. "not found" answers
+        return all(
+            (fingerprint_file(fp.path) or _missing(fp.path)) == fp for fp in self.files
+        )
+
+
+class ResponseCache:
+    """
+    Two-tier cache for final agent answers.
+
+    Entries live in an in-memory LRU and, when ``disk_path`` is set, in a
+    SQLite file shared across processes and restarts. An entry records the
+    fingerprints of every file its tools read and is discarded on lookup if
+    any of those files changed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        disk_path: str | None = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if disk_path:
+            self._db = self._open_db(disk_path)
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        model: str,
+        system_prompt: str,
+        tool_schema_hash: str,
+        working_dir: str = "",
+    ) -> str:
+        """
+        Key for a query; file fingerprints are checked separately on lookup.
+
+        ``working_dir`` is the directory relative paths in the prompt resolve
+        against, so "summarize data.csv" asked in two directories does not
+        share an answer.
+        """
+        return stable_hash(
+            normalize_prompt(prompt),
+            model,
+            hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            tool_schema_hash,
+            working_dir,
+        )
+
+    def get(self, key: str) -> str | None:
+        """Return the cached answer for ``key`` if its files are unchanged."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None and self._db is not None:
+            entry = self._disk_get(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is not None and not entry.is_fresh():
+            logger.debug("Response cache entry invalidated by a changed file")
+            self.invalidate(key)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            metrics.CACHE_REQUESTS.inc(cache="response", result="miss")
+            return None
+        self.hits += 1
+        metrics.CACHE_REQUESTS.inc(cache="response", result="hit")
+        return entry.response
+
+    def put(self, key: str, response: str, files: Iterable[str] = ()) -> None:
+        """Store an answer together with fingerprints of the files it used."""
+        fingerprints = [
+            fingerprint_file(path) or _missing(path) for path in dict.fromkeys(files)
+        ]
+        entry = _Entry(response, fingerprints)
+        self._remember(key, entry)
+        if self._db is not None:
+            self._disk_put(key, entry)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+
+    async def aget(self, key: str) -> str | None:
+        """``get`` that keeps disk reads and fingerprinting off the event loop."""
+        if self._db is None:
+            with self._lock:
+                entry = self._memory.get(key)
+            # Only an entry without files can be checked without touching disk
+            if entry is None or not entry.files:
+                return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, response: str, files: Iterable[str] = ()) -> None:
+        """``put`` that keeps fingerprinting and disk writes off the event loop."""
+        await asyncio.to_thread(self.put, key, response, list(files))
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _open_db(self, path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, response TEXT NOT NULL, files TEXT NOT NULL,"
+            " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        db.commit()
+        return db
+
+    def _disk_get(self, key: str) -> _Entry | None:
+        assert self._db is not None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT response, files FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+        files = [FileFingerprint(**fp) for fp in json.loads(row[1])]
+        return _Entry(row[0], files)
+
+    def _disk_put(self, key: str, entry: _Entry) -> None:
+        assert self._db is not None
+        files = json.dumps([asdict(fp) for fp in entry.files])
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, entry.response, files, entry.size, time.time()),
+            )
+            self._evict_disk()
+            self._db.commit()
+
+    def _evict_disk(self) -> None:
+        """Drop least recently used rows until the total size fits the limit."""
+        assert self._db is not None
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_disk_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed ASC"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_disk_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} responses from the disk cache")
@@ -1,11 +1,50 @@
+import importlib
+import os
 from importlib import metadata
 
 import typer
+from typer.core import TyperGroup
 
-from smart_agent.cli.commands import info, query, run, tools
+from smart_agent import tracing
+from smart_agent.config import Settings
 from smart_agent.logging_setup import configure_logging
 
+# Subcommand name -> (module in smart_agent.cli.commands, help). Modules are
+# imported only when their command runs, so `smart-agent tools list` does not
+# pay for FastAPI, uvicorn or the Ollama client.
+COMMANDS = {
+    "query": ("query", "One-shot query (text/file)"),
+    # "chat": ("chat", "Interactive chat session"),
+    "info": ("info", "Diagnostics & config"),
+    "run": ("run", "Run FastAPI server (OpenAPI)"),
+    "tools": ("tools", "List/describe available Tools"),
+    "bench": ("bench", "Benchmarks and a mock Ollama server"),
+    "loadtest": ("loadtest", "Load-test the /answer endpoint"),
+    "daemon": ("daemon", "Keep a warm agent behind a Unix socket"),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Root group that imports a subcommand's module on first lookup."""
+
+    def list_commands(self, ctx):
+        return list(dict.fromkeys([*super().list_commands(ctx), *COMMANDS]))
+
+    def get_command(self, ctx, cmd_name):
+        command = super().get_command(ctx, cmd_name)
+        if command is not None or cmd_name not in COMMANDS:
+            return command
+        module_name, help_text = COMMANDS[cmd_name]
+        module = importlib.import_module(f"smart_agent.cli.commands.{module_name}")
+        group = typer.main.get_group(module.app)
+        group.name = cmd_name
+        group.help = group.short_help = help_text
+        self.add_command(group)
+        return group
+
+
 app = typer.Typer(
+    cls=LazyGroup,
     add_completion=False,
     help="SmartAgent – unified CLI",
 )
@@ -23,6 +62,29 @@ def _root(
     journald: bool = typer.Option(
         False, "--journald", help="Send logs to systemd-journald (Linux)"
     ),
+    log_queue: bool = typer.Option(
+        False,
+        "--log-queue",
+        help="Write logs from a background thread so logging never blocks",
+    ),
+    log_rate: float = typer.Option(
+        0.0,
+        "--log-rate",
+        metavar="N",
+        help="Max INFO/DEBUG records per second from each log statement (0: no limit)",
+    ),
+    trace: str = typer.Option(
+        "",
+        "--trace",
+        metavar="TARGET",
+        help="Export spans: file:<path>|otlp[:<url>] (default: $SMART_AGENT_TRACE_EXPORT)",
+    ),
+    config: str = typer.Option(
+        "",
+        "--config",
+        metavar="PATH",
+        help="TOML or JSON settings file (default: $SMART_AGENT_CONFIG)",
+    ),
     version: bool = typer.Option(False, "--version", help="Print version and exit"),
 ):
     if version:
@@ -32,17 +94,27 @@ def _root(
             typer.echo("0.0.0")
         raise typer.Exit(code=0)
 
+    if config:
+        # Read by every Settings.from_env(), including in API workers
+        os.environ["SMART_AGENT_CONFIG"] = config
+
     # Configure logging once at the root
-    configure_logging(level=log_level, fmt=log_format, to_journald=journald)
+    configure_logging(
+        level=log_level,
+        fmt=log_format,
+        to_journald=journald,
+        queued=log_queue,
+        rate_limit=log_rate,
+    )
+    if trace:
+        # API workers are separate processes and read the target from the env
+        os.environ["SMART_AGENT_TRACE_EXPORT"] = trace
+    try:
+        tracing.configure_tracing(trace or Settings.from_env().trace_export)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--trace") from e
 
     # If no subcommand was invoked, show help
     if ctx.invoked_subcommand is None:
         typer.echo(ctx.get_help())
         raise typer.Exit(code=0)
-
-
-app.add_typer(query.app, name="query", help="One-shot query (text/file)")
-# app.add_typer(chat.app,  name="chat",  help="Interactive chat session")
-app.add_typer(info.app, name="info", help="Diagnostics & config")
-app.add_typer(run.app, name="run", help="Run FastAPI server (OpenAPI)")
-app.add_typer(tools.app, name="tools", help="List/describe available Tools")
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import tempfile
+
+import typer
+
+from smart_agent.bench import DEFAULT_SIZES, SUITES, compare, run_benchmarks
+from smart_agent.mock_ollama import MockOllamaConfig
+
+app = typer.Typer(add_completion=False)
+
+
+def _mock_config(
+    latency: float, tokens_per_second: float, reply_tokens: int
+) -> MockOllamaConfig:
+    return MockOllamaConfig(
+        latency=latency, tokens_per_second=tokens_per_second, reply_tokens=reply_tokens
+    )
+
+
+@app.command("run")
+def run_(
+    suites: str = typer.Option(
+        ",".join(SUITES), "--suites", help=f"Comma-separated: {', '.join(SUITES)}"
+    ),
+    sizes: str = typer.Option(
+        ",".join(DEFAULT_SIZES),
+        "--sizes",
+        help="Parsing file sizes, e.g. 1MB,100MB,1GB",
+    ),
+    requests: int = typer.Option(200, "--requests", min=1, help="Agent/API requests"),
+    concurrency: int = typer.Option(32, "--concurrency", min=1, help="API clients"),
+    repeat: int = typer.Option(3, "--repeat", min=1, help="Runs per parsing case"),
+    latency: float = typer.Option(
+        0.0, "--latency", min=0.0, help="Mock model seconds before the first token"
+    ),
+    tokens_per_second: float = typer.Option(
+        0.0, "--tokens-per-second", min=0.0, help="Mock generation speed (0: instant)"
+    ),
+    reply_tokens: int = typer.Option(32, "--reply-tokens", min=1),
+    data_dir: str | None = typer.Option(
+        None, "--data-dir", help="Where generated files are kept (default: temp dir)"
+    ),
+    output: str | None = typer.Option(
+        None, "--output", "-o", help="Write the JSON report here instead of stdout"
+    ),
+    baseline: str | None = typer.Option(
+        None, "--baseline", help="Earlier report to compare against"
+    ),
+    threshold: float = typer.Option(
+        0.1, "--threshold", help="Relative change reported by --baseline"
+    ),
+):
+    """Run benchmark suites against an in-process mock Ollama server."""
+    selected = [s.strip() for s in suites.split(",") if s.strip()]
+    config = _mock_config(latency, tokens_per_second, reply_tokens)
+    directory = data_dir or tempfile.mkdtemp(prefix="smart-agent-bench-")
+    try:
+        report = asyncio.run(
+            run_benchmarks(
+                selected,
+                directory,
+                sizes=[s.strip() for s in sizes.split(",") if s.strip()],
+                requests=requests,
+                concurrency=concurrency,
+                repeat=repeat,
+                config=config,
+            )
+        )
+    except ValueError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(2) from e
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        typer.echo(f"Wrote {output}", err=True)
+    else:
+        typer.echo(text)
+
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            regressions, improvements = compare(json.load(f), report, threshold)
+        for line in improvements:
+            typer.echo(f"improved  {line}", err=True)
+        for line in regressions:
+            typer.echo(f"regressed {line}", err=True)
+        if regressions:
+            raise typer.Exit(1)
+
+
+@app.command("mock-ollama")
+def mock_ollama(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(11434, "--port"),
+    latency: float = typer.Option(0.0, "--latency", min=0.0),
+    tokens_per_second: float = typer.Option(0.0, "--tokens-per-second", min=0.0),
+    reply_tokens: int = typer.Option(32, "--reply-tokens", min=1),
+):
+    """Serve the mock Ollama API over HTTP, e.g. for a real multi-worker server."""
+    import uvicorn
+
+    from smart_agent.mock_ollama import build_mock_ollama
+
+    config = _mock_config(latency, tokens_per_second, reply_tokens)
+    uvicorn.run(build_mock_ollama(config), host=host, port=port)
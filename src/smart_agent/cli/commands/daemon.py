@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import typer
+
+from smart_agent.daemon import (
+    DaemonClient,
+    DaemonError,
+    DaemonServer,
+    default_socket_path,
+)
+
+app = typer.Typer(add_completion=False, invoke_without_command=True)
+
+SOCKET_HELP = "Unix socket (default: $SMART_AGENT_DAEMON_SOCKET or runtime dir)"
+
+
+@app.callback()
+def callback(
+    ctx: typer.Context,
+    socket: str | None = typer.Option(None, "--socket", help=SOCKET_HELP),
+):
+    """Keep a warm agent running; `smart-agent query` uses it when it is up."""
+    if ctx.invoked_subcommand is None:
+        main(socket)
+
+
+def main(socket: str | None = None) -> None:
+    server = DaemonServer(socket or default_socket_path())
+    try:
+        asyncio.run(server.serve_forever())
+    except DaemonError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command("status")
+def status(
+    socket: str | None = typer.Option(None, "--socket", help=SOCKET_HELP),
+):
+    """Print the running daemon's pid, uptime and request count."""
+    typer.echo(json.dumps(_call(socket, "status")))
+
+
+@app.command("stop")
+def stop(
+    socket: str | None = typer.Option(None, "--socket", help=SOCKET_HELP),
+):
+    """Ask the running daemon to shut down."""
+    _call(socket, "stop")
+    typer.echo("Daemon stopped")
+
+
+def _call(socket: str | None, op: str) -> dict:
+    path = socket or default_socket_path()
+    client = DaemonClient.connect(path, timeout=10.0)
+    if client is None:
+        typer.echo(f"No daemon is listening on {path}", err=True)
+        raise typer.Exit(1)
+    try:
+        with client:
+            return client.call(op)
+    except DaemonError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
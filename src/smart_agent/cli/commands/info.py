@@ -1,19 +1,15 @@
 import json
 import os
 import platform
+import subprocess
 import sys
+import time
 from importlib import metadata
+from typing import Any
 
 import typer
 
-from smart_agent.ollama_health import (
-    DEFAULT_MODEL,
-    OllamaHealthError,
-    check_ollama_service,
-    get_available_models,
-    validate_ollama_setup,
-)
-from smart_agent.registry import load_tools
+IMPORTTIME_MARKER = "-- smart-agent importtime --"
 
 app = typer.Typer(add_completion=False, invoke_without_command=True)
 
@@ -21,15 +17,24 @@ app = typer.Typer(add_completion=False, invoke_without_command=True)
 @app.command("health")
 def health_check():
     """Check Ollama service and model availability."""
+    from smart_agent.ollama_health import (
+        OllamaHealthError,
+        get_available_models,
+        validate_ollama_setup,
+    )
+    from smart_agent.routing import ModelRouter
+
+    router = ModelRouter.from_settings()
     try:
-        validate_ollama_setup()
+        validate_ollama_setup(*router.models)
         typer.echo("Ollama health check passed", color=True)
         typer.echo("Service is running", color=True)
-        typer.echo(f"Required model '{DEFAULT_MODEL}' is available", color=True)
+        for stage, model in router.to_dict().items():
+            typer.echo(f"Required model '{model}' ({stage}) is available", color=True)
 
         available_models = get_available_models()
-        if len(available_models) > 1:
-            other_models = [m for m in available_models if m != DEFAULT_MODEL]
+        other_models = [m for m in available_models if m not in router.models]
+        if other_models:
             typer.echo(
                 f"ℹ Other available models: {', '.join(other_models)}", color=True
             )
@@ -49,12 +54,19 @@ def callback(
 
 
 def main(format: str = typer.Option("text", "--format", help="json|text")):
+    from smart_agent.config import Settings
+    from smart_agent.ollama_health import check_ollama_service, get_available_models
+    from smart_agent.registry import load_tools
+    from smart_agent.routing import ModelRouter
+
+    settings = Settings.from_env()
+    router = ModelRouter.from_settings(settings)
+
     # Gather Ollama information
     ollama_service_running = check_ollama_service()
     available_models = get_available_models() if ollama_service_running else []
-    required_model_available = (
-        DEFAULT_MODEL in available_models if ollama_service_running else False
-    )
+    missing_models = [m for m in router.models if m not in available_models]
+    required_model_available = ollama_service_running and not missing_models
 
     ollama_status = (
         "healthy"
@@ -75,8 +87,10 @@ def main(format: str = typer.Option("text", "--format", help="json|text")):
         "ollama": {
             "status": ollama_status,
             "service_running": ollama_service_running,
-            "required_model": DEFAULT_MODEL,
+            "required_model": settings.model,
             "required_model_available": required_model_available,
+            "router": router.to_dict(),
+            "missing_models": missing_models,
             "available_models": available_models,
         },
     }
@@ -85,3 +99,96 @@ def main(format: str = typer.Option("text", "--format", help="json|text")):
         if format == "json"
         else "\n".join(f"{k}: {v}" for k, v in data.items())
     )
+
+
+@app.command("imports")
+def imports(
+    module: str = typer.Argument(
+        "smart_agent.cli", help="Module to import, e.g. smart_agent.cli.commands.run"
+    ),
+    top: int = typer.Option(15, "--top", min=1, help="Number of modules to show"),
+    sort: str = typer.Option("cumulative", "--sort", help="cumulative|self"),
+    format: str = typer.Option("text", "--format", help="json|text"),
+):
+    """Measure the import time of a module in a fresh interpreter."""
+    if sort not in ("cumulative", "self"):
+        raise typer.BadParameter("expected cumulative or self", param_hint="--sort")
+    try:
+        report = measure_imports(module)
+    except RuntimeError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
+
+    report["modules"] = sorted(
+        report["modules"], key=lambda m: m[f"{sort}_ms"], reverse=True
+    )[:top]
+    if format == "json":
+        typer.echo(json.dumps(report))
+        return
+    typer.echo(f"import {module}: {report['total_ms']:.1f} ms")
+    typer.echo(f"{'cumulative':>12}  {'self':>8}  module")
+    for m in report["modules"]:
+        typer.echo(
+            f"{m['cumulative_ms']:>9.1f} ms  {m['self_ms']:>5.1f} ms  {m['name']}"
+        )
+
+
+def measure_imports(module: str) -> dict[str, Any]:
+    """
+    Import ``module`` in a new interpreter under ``-X importtime``.
+
+    Imports done by interpreter startup (``site``) happen before a marker and
+    are left out, so the report covers what ``module`` itself pulls in.
+
+    Returns:
+        dict: ``total_ms`` (wall time of the import), ``process_ms`` (the
+            whole interpreter run) and ``modules``, one
+            ``{"name", "self_ms", "cumulative_ms", "depth"}`` per module.
+
+    Raises:
+        RuntimeError: If the module cannot be imported.
+    """
+    code = (
+        "import sys, time\n"
+        f"sys.stderr.write({IMPORTTIME_MARKER!r} + '\\n')\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"cannot import {module}")
+    _, _, stderr = result.stderr.partition(IMPORTTIME_MARKER)
+    return {
+        "module": module,
+        "total_ms": round(float(result.stdout.split()[-1]) * 1000, 2),
+        "process_ms": round((time.perf_counter() - started) * 1000, 2),
+        "modules": _parse_importtime(stderr),
+    }
+
+
+def _parse_importtime(text: str) -> list[dict[str, Any]]:
+    """Parse ``import time: <self us> | <cumulative us> | <name>`` lines."""
+    modules = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        name = fields[2].rstrip()
+        modules.append(
+            {
+                "name": name.strip(),
+                "self_ms": int(fields[0]) / 1000,
+                "cumulative_ms": int(fields[1]) / 1000,
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+    return modules
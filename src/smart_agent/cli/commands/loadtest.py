@@ -0,0 +1,141 @@
+import asyncio
+import json
+from typing import Any
+
+import typer
+
+from smart_agent.loadtest import (
+    MODES,
+    PromptMix,
+    answer_sender,
+    arrival_times,
+    closed_loop,
+    in_process_client,
+    open_loop,
+    remote_client,
+    summarize_load,
+)
+from smart_agent.mock_ollama import MockOllamaConfig
+
+app = typer.Typer(add_completion=False, invoke_without_command=True)
+
+DEFAULT_PROMPT = "What is the capital of France?"
+
+
+@app.callback()
+def main(
+    mode: str = typer.Option("closed", "--mode", help="closed|open"),
+    users: int = typer.Option(
+        16, "--users", min=1, help="Closed loop: concurrent users"
+    ),
+    requests: int | None = typer.Option(
+        None, "--requests", min=1, help="Closed loop: stop after this many requests"
+    ),
+    think_time: float = typer.Option(
+        0.0,
+        "--think-time",
+        min=0.0,
+        help="Closed loop: pause between a user's requests",
+    ),
+    rps: float = typer.Option(10.0, "--rps", min=0.001, help="Open loop: arrival rate"),
+    ramp_to: float | None = typer.Option(
+        None, "--ramp-to", min=0.001, help="Open loop: rate reached at the end"
+    ),
+    poisson: bool = typer.Option(
+        False, "--poisson", help="Open loop: random instead of evenly spaced arrivals"
+    ),
+    clients: int = typer.Option(
+        16, "--clients", min=1, help="Open loop: client ids requests are spread over"
+    ),
+    duration: float = typer.Option(10.0, "--duration", min=0.1, help="Seconds"),
+    prompts: str | None = typer.Option(
+        None, "--prompts", help="JSONL prompt mix ({'prompt', 'weight'} per line)"
+    ),
+    prompt: list[str] | None = typer.Option(  # noqa: B008
+        None, "--prompt", help="Prompt to send; repeat for an evenly weighted mix"
+    ),
+    cache_bust: bool = typer.Option(
+        True,
+        "--cache-bust/--no-cache-bust",
+        help="Make every prompt unique so the response cache cannot answer it",
+    ),
+    url: str | None = typer.Option(
+        None, "--url", help="Running server to target (default: in-process app)"
+    ),
+    mock_latency: float = typer.Option(
+        0.0, "--mock-latency", min=0.0, help="In-process mock model latency"
+    ),
+    mock_tokens_per_second: float = typer.Option(
+        0.0, "--mock-tokens-per-second", min=0.0
+    ),
+    timeout: float = typer.Option(60.0, "--timeout", min=0.1, help="Per request"),
+    interval: float = typer.Option(
+        1.0, "--interval", min=0.1, help="Timeline bucket in seconds"
+    ),
+    seed: int = typer.Option(0, "--seed"),
+    output: str | None = typer.Option(
+        None, "--output", "-o", help="Write the JSON report here instead of stdout"
+    ),
+):
+    """Drive POST /answer with open- or closed-loop load and report latency."""
+    if mode not in MODES:
+        raise typer.BadParameter(
+            f"expected one of {', '.join(MODES)}", param_hint="--mode"
+        )
+    try:
+        if prompts:
+            mix = PromptMix.from_file(prompts, seed=seed, unique=cache_bust)
+        else:
+            pairs = [(p, 1.0) for p in prompt or [DEFAULT_PROMPT]]
+            mix = PromptMix(pairs, seed=seed, unique=cache_bust)
+        schedule = (
+            arrival_times(rps, duration, ramp_to, poisson, seed)
+            if mode == "open"
+            else []
+        )
+    except (OSError, ValueError) as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(2) from e
+
+    async def run() -> dict[str, Any]:
+        config = MockOllamaConfig(
+            latency=mock_latency, tokens_per_second=mock_tokens_per_second
+        )
+        target = (
+            remote_client(url, timeout) if url else in_process_client(config, timeout)
+        )
+        async with target as http:
+            send = answer_sender(http)
+            if mode == "open":
+                samples, elapsed = await open_loop(send, mix, schedule, clients)
+            else:
+                samples, elapsed = await closed_loop(
+                    send,
+                    mix,
+                    users,
+                    requests=requests,
+                    duration=None if requests else duration,
+                    think_time=think_time,
+                )
+        return summarize_load(samples, elapsed, interval)
+
+    report = {
+        "mode": mode,
+        "target": url or "in-process",
+        **({"users": users} if mode == "closed" else {"rps": rps, "ramp_to": ramp_to}),
+        **asyncio.run(run()),
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        typer.echo(text)
+
+    latency = report["latency"]
+    typer.echo(
+        f"{report['requests']} requests, {report['throughput']} req/s, "
+        f"{report['error_rate']:.1%} errors, p50 {latency.get('p50_ms')} ms, "
+        f"p95 {latency.get('p95_ms')} ms, p99 {latency.get('p99_ms')} ms",
+        err=True,
+    )
@@ -1,11 +1,14 @@
 import asyncio
 import json
 import logging
+import os
+from dataclasses import replace
 
 import typer
 
-from smart_agent.agent import SmartAgent
-from smart_agent.ollama_health import OllamaHealthError, validate_ollama_setup_async
+from smart_agent.batch import Checkpoint, run_batch
+from smart_agent.config import Settings
+from smart_agent.daemon import DaemonClient, DaemonError, default_socket_path
 
 app = typer.Typer(add_completion=False, invoke_without_command=True)
 
@@ -19,9 +22,36 @@ def callback(
     format: str = typer.Option("text", "--format", help="json|text"),
     timeout: float = typer.Option(30.0, "--timeout", min=0.1),
     verbose: bool = typer.Option(False, "--verbose", "-v"),
+    stream: bool = typer.Option(
+        False, "--stream", help="Print the answer as it is generated"
+    ),
+    batch: str | None = typer.Option(
+        None, "--batch", help="JSONL file of prompts to run; use '-' for stdin"
+    ),
+    concurrency: int = typer.Option(
+        4, "--concurrency", min=1, help="Batch prompts in flight at once"
+    ),
+    checkpoint: str | None = typer.Option(
+        None, "--checkpoint", help="File of completed batch ids, for resuming"
+    ),
+    daemon: bool = typer.Option(
+        True,
+        "--daemon/--no-daemon",
+        help="Answer through `smart-agent daemon` when it is running",
+    ),
 ):
     if ctx.invoked_subcommand is None:
-        main(text=text, format=format, timeout=timeout, verbose=verbose)
+        main(
+            text=text,
+            format=format,
+            timeout=timeout,
+            verbose=verbose,
+            stream=stream,
+            batch=batch,
+            concurrency=concurrency,
+            checkpoint=checkpoint,
+            daemon=daemon,
+        )
 
 
 def main(
@@ -31,11 +61,31 @@ def main(
     format: str = typer.Option("text", "--format", help="json|text"),
     timeout: float = typer.Option(30.0, "--timeout", min=0.1),
     verbose: bool = typer.Option(False, "--verbose", "-v"),
+    stream: bool = typer.Option(
+        False, "--stream", help="Print the answer as it is generated"
+    ),
+    batch: str | None = typer.Option(
+        None, "--batch", help="JSONL file of prompts to run; use '-' for stdin"
+    ),
+    concurrency: int = typer.Option(
+        4, "--concurrency", min=1, help="Batch prompts in flight at once"
+    ),
+    checkpoint: str | None = typer.Option(
+        None, "--checkpoint", help="File of completed batch ids, for resuming"
+    ),
+    daemon: bool = typer.Option(
+        True,
+        "--daemon/--no-daemon",
+        help="Answer through `smart-agent daemon` when it is running",
+    ),
 ):
     """Run a single query through SmartAgent and print the result."""
     log = logging.getLogger(__name__)
     if verbose:
         log.debug("verbose mode enabled")
+    if batch:
+        run_batch_file(batch, concurrency, timeout, checkpoint)
+        return
     query = text
     if not query:
         typer.echo(
@@ -45,22 +95,54 @@ def main(
         )
         query = typer.get_text_stream("stdin").read()
 
+    if daemon:
+        client = DaemonClient.connect(default_socket_path(), timeout=timeout + 5)
+        if client is not None:
+            with client:
+                _query_daemon(client, query, format, timeout, stream)
+            return
+
+    from smart_agent.agent import SmartAgent
+    from smart_agent.ollama_health import OllamaHealthError
+
     async def _run():
-        # Check Ollama health before proceeding
-        await validate_ollama_setup_async()
+        # SmartAgent.run validates Ollama health before querying the model
+        agent = SmartAgent()
+        return await agent.run(query)
 
+    async def _stream():
         agent = SmartAgent()
-        resp = await agent.run(query)
-        return resp.to_dict() if hasattr(resp, "to_dict") else str(resp)
+        out = typer.get_text_stream("stdout")
+        async for chunk in agent.run_stream(query):
+            # Text mode writes raw deltas; json mode writes one event per line
+            out.write(
+                json.dumps({"delta": chunk}, ensure_ascii=False) + "\n"
+                if format == "json"
+                else chunk
+            )
+            out.flush()
+        out.write(
+            json.dumps({"status": "success"}) + "\n" if format == "json" else "\n"
+        )
+        out.flush()
 
     try:
+        if stream:
+            asyncio.run(asyncio.wait_for(_stream(), timeout=timeout))
+            log.info("query streamed", extra={"format": format, "timeout": timeout})
+            return
         result = asyncio.run(asyncio.wait_for(_run(), timeout=timeout))
-        out = {"status": "success", "response": result}
-        log.info("query completed", extra={"format": format, "timeout": timeout})
+        out = {"status": "success", "response": result.to_dict()}
+        log.info(
+            "query completed",
+            extra={
+                "format": format,
+                "timeout": timeout,
+                "duration_ms": result.duration_ms,
+            },
+        )
         typer.echo(
-            json.dumps(out, ensure_ascii=False)
-            if format == "json"
-            else str(out["response"])
+            json.dumps(out, ensure_ascii=False) if format == "json" else result.content
         )
     except asyncio.TimeoutError:
         err = {"status": "error", "error": "timeout"}
@@ -86,3 +168,124 @@ def main(
             err=True,
         )
         raise typer.Exit(1) from e
+
+
+def _query_daemon(
+    client: DaemonClient, query: str, format: str, timeout: float, stream: bool
+) -> None:
+    """Answer through a running daemon, printing what the in-process path would."""
+    log = logging.getLogger(__name__)
+    out = typer.get_text_stream("stdout")
+    try:
+        # Relative paths in the query refer to where the user is, not the daemon
+        replies = client.query(query, timeout=timeout, stream=stream, cwd=os.getcwd())
+        for reply in replies:
+            if "delta" in reply:
+                out.write(
+                    json.dumps(reply, ensure_ascii=False) + "\n"
+                    if format == "json"
+                    else reply["delta"]
+                )
+                out.flush()
+    except DaemonError as e:
+        reply = {"status": "error", "error": str(e), "kind": "error"}
+
+    if reply["status"] == "success":
+        if stream:
+            out.write(
+                json.dumps({"status": "success"}) + "\n" if format == "json" else "\n"
+            )
+            out.flush()
+            log.info("query streamed", extra={"format": format, "daemon": True})
+            return
+        response = reply["response"]
+        log.info(
+            "query completed",
+            extra={
+                "format": format,
+                "timeout": timeout,
+                "duration_ms": response["duration_ms"],
+                "daemon": True,
+            },
+        )
+        typer.echo(
+            json.dumps({"status": "success", "response": response}, ensure_ascii=False)
+            if format == "json"
+            else response["content"]
+        )
+        return
+
+    err = {"status": "error", "error": reply["error"]}
+    if reply.get("kind") == "timeout":
+        log.warning("query timeout", extra={"timeout": timeout, "daemon": True})
+        typer.echo(
+            json.dumps(err, ensure_ascii=False) if format == "json" else "timeout",
+            err=(format != "json"),
+        )
+    else:
+        log.error("query failed", extra={"error": reply["error"], "daemon": True})
+        typer.echo(
+            (
+                json.dumps(err, ensure_ascii=False)
+                if format == "json"
+                else f"Error: {reply['error']}"
+            ),
+            err=True,
+        )
+    raise typer.Exit(1)
+
+
+def run_batch_file(
+    path: str, concurrency: int, timeout: float, checkpoint_path: str | None
+) -> None:
+    """
+    Run a JSONL batch through one shared agent, writing JSONL results to stdout.
+
+    ``timeout`` applies to each prompt. Exits with status 1 if any prompt failed.
+    """
+    log = logging.getLogger(__name__)
+    out = typer.get_text_stream("stdout")
+    stdin = path == "-"
+    lines = typer.get_text_stream("stdin") if stdin else open(path, encoding="utf-8")
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+
+    def write(record: dict) -> None:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    from smart_agent.agent import SmartAgent
+
+    async def _batch():
+        settings = Settings.from_env()
+        # Size the pool so every worker can keep a connection to Ollama
+        settings = replace(settings, pool_size=max(settings.pool_size, concurrency))
+        agent = SmartAgent(settings=settings)
+        try:
+            return await run_batch(
+                agent,
+                iter(lines),
+                write,
+                concurrency=concurrency,
+                timeout=timeout,
+                checkpoint=checkpoint,
+            )
+        finally:
+            await agent.aclose()
+
+    try:
+        summary = asyncio.run(_batch())
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        if not stdin:
+            lines.close()
+    log.info(
+        "batch completed",
+        extra={
+            "succeeded": summary.succeeded,
+            "failed": summary.failed,
+            "skipped": summary.skipped,
+        },
+    )
+    if summary.failed:
+        raise typer.Exit(1)
@@ -1,9 +1,38 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import replace
+
+import httpx
 import typer
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from smart_agent import metrics, tracing
+from smart_agent.admission import (
+    INTERACTIVE,
+    AdmissionController,
+    QueueFullError,
+    Ticket,
+)
+from smart_agent.agent import SmartAgent, create_transport
+from smart_agent.config import Settings
+from smart_agent.ollama_health import (
+    OllamaHealthError,
+    OllamaHealthMonitor,
+    get_health_monitor,
+    validate_ollama_setup,
+)
+from smart_agent.response import Stage
+from smart_agent.routing import ModelRouter
 
-from smart_agent.agent import SmartAgent
-from smart_agent.ollama_health import OllamaHealthError, validate_ollama_setup
+logger = logging.getLogger(__name__)
 
 app = typer.Typer(add_completion=False, invoke_without_command=True)
 
@@ -16,46 +45,232 @@ def callback(
     reload: bool = typer.Option(False, "--reload"),
     workers: int = typer.Option(1, "--workers"),
     log_level: str = typer.Option("info", "--log-level"),
+    pool_size: int | None = typer.Option(
+        None, "--pool-size", help="Max pooled connections to Ollama per worker"
+    ),
 ):
     if ctx.invoked_subcommand is None:
-        main(host=host, port=port, reload=reload, workers=workers, log_level=log_level)
+        main(
+            host=host,
+            port=port,
+            reload=reload,
+            workers=workers,
+            log_level=log_level,
+            pool_size=pool_size,
+        )
+
+
+@asynccontextmanager
+async def _lifespan(api: FastAPI):
+    # One agent and one connection pool for the whole worker process
+    settings = Settings.from_env()
+    if settings.trace_export and not tracing.is_enabled():
+        # Worker processes do not run the CLI callback that configures tracing
+        try:
+            tracing.configure_tracing(settings.trace_export)
+        except ValueError as e:
+            logger.warning(str(e))
+    transport = api.state.ollama_transport
+    api.state.health = (
+        get_health_monitor()
+        if transport is None
+        else OllamaHealthMonitor(ttl=settings.health_interval, transport=transport)
+    )
+    api.state.health.start(settings.health_interval)
+    api.state.agent = SmartAgent(
+        transport=transport or create_transport(settings), validate_health=False
+    )
+    # Load the model and its prompt prefix before the first request
+    await api.state.agent.start()
+    api.state.admission = AdmissionController(
+        max_active=settings.max_active_requests,
+        max_queued=settings.max_queued_requests,
+        max_queued_per_client=settings.max_queued_per_client,
+    )
+    api.state.metrics_dir = settings.metrics_dir
+    snapshots = None
+    if settings.metrics_dir:
+        snapshots = asyncio.create_task(
+            _write_metrics_forever(api, settings.metrics_dir, settings.metrics_interval)
+        )
+    try:
+        yield
+    finally:
+        if snapshots is not None:
+            snapshots.cancel()
+            with suppress(asyncio.CancelledError):
+                await snapshots
+            _update_gauges(api)
+            metrics.REGISTRY.write_snapshot(settings.metrics_dir)
+        await api.state.health.stop()
+        await api.state.agent.aclose()
 
 
-def build_app() -> FastAPI:
-    api = FastAPI(title="SmartAgent API")
+async def _write_metrics_forever(api: FastAPI, directory: str, interval: float) -> None:
+    """Publish this worker's metrics for the worker answering ``/metrics``."""
+    while True:
+        _update_gauges(api)
+        try:
+            await asyncio.to_thread(metrics.REGISTRY.write_snapshot, directory)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+        await asyncio.sleep(interval)
+
+
+def _update_gauges(api: FastAPI) -> None:
+    metrics.QUEUED_REQUESTS.set(api.state.admission.queued)
+
+
+def build_app(ollama_transport: httpx.AsyncBaseTransport | None = None) -> FastAPI:
+    """
+    Build the API app.
+
+    Args:
+        ollama_transport: Transport for every Ollama call, e.g. an in-process
+            mock for benchmarks (default: connect to the Ollama service).
+    """
+    api = FastAPI(title="SmartAgent API", lifespan=_lifespan)
+    api.state.ollama_transport = ollama_transport
+    api.add_middleware(metrics.MetricsMiddleware, paths=("/answer", "/answer/stream"))
+    api.add_middleware(tracing.RequestContextMiddleware)
+
+    @api.get("/metrics")
+    async def prometheus_metrics():
+        """Prometheus text exposition, merged across all workers."""
+        _update_gauges(api)
+        text = await asyncio.to_thread(
+            metrics.REGISTRY.render, api.state.metrics_dir or None
+        )
+        return PlainTextResponse(text, media_type=metrics.CONTENT_TYPE)
 
     @api.get("/healthz")
     async def healthz():
-        return {"status": "ok"}
+        status = await api.state.health.status()
+        router = api.state.agent.llm.router
+        healthy = not any(status.error_for(model) for model in router.models)
+        return {
+            "status": "ok",
+            "ollama": "healthy" if healthy else "unhealthy",
+            "router": router.to_dict(),
+            "checked_seconds_ago": round(status.age(), 3),
+            "llm": api.state.agent.llm.scheduler.stats(),
+            "models": api.state.agent.lifecycle.stats(),
+            "queue": api.state.admission.stats(),
+        }
 
     @api.post("/answer")
-    async def answer(query: dict):
-        # Replace with actual smart agent logic
+    async def answer(query: dict, request: Request, response: Response):
         text = query.get("query", "")
         try:
-            response = await SmartAgent().run(text)
-            return {"answer": response}
+            # Served from the monitor's cache; refreshed in the background
+            await api.state.health.ensure_healthy(*api.state.agent.llm.router.models)
         except OllamaHealthError as e:
             raise HTTPException(status_code=503, detail=str(e)) from e
 
+        ticket = await _admit(api.state.admission, request)
+        try:
+            result = await api.state.agent.run(text)
+        finally:
+            api.state.admission.release(ticket)
+        queued = Stage("queue", round(ticket.wait_seconds * 1000, 3))
+        result = replace(result, stages=[queued, *result.stages])
+        response.headers.update(_queue_headers(ticket))
+        details = result.to_dict()
+        return {"answer": details.pop("content"), **details}
+
+    @api.post("/answer/stream")
+    async def answer_stream(query: dict, request: Request):
+        """Stream the answer as Server-Sent Events (``data:`` per chunk)."""
+        text = query.get("query", "")
+        try:
+            await api.state.health.ensure_healthy(*api.state.agent.llm.router.models)
+        except OllamaHealthError as e:
+            raise HTTPException(status_code=503, detail=str(e)) from e
+
+        ticket = await _admit(api.state.admission, request)
+        # Released after the stream ends, including when the client disconnects
+        return StreamingResponse(
+            _sse_events(api.state.agent.run_stream(text)),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+                **_queue_headers(ticket),
+            },
+            background=BackgroundTask(api.state.admission.release, ticket),
+        )
+
     return api
 
 
+async def _admit(admission: AdmissionController, request: Request) -> Ticket:
+    """
+    Queue the request for a slot, keyed on ``X-Client-Id`` and ``X-Priority``.
+
+    Clients without an id are told apart by address.
+    """
+    client_id = request.headers.get("x-client-id") or (
+        request.client.host if request.client else "anonymous"
+    )
+    priority = request.headers.get("x-priority", INTERACTIVE).strip().lower()
+    try:
+        return await admission.acquire(client_id, priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
+
+
+def _queue_headers(ticket: Ticket) -> dict[str, str]:
+    return {
+        "X-Queue-Position": str(ticket.position),
+        "X-Queue-Wait-Ms": str(round(ticket.wait_seconds * 1000)),
+    }
+
+
+async def _sse_events(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    try:
+        async for chunk in chunks:
+            yield f"data: {json.dumps({'delta': chunk}, ensure_ascii=False)}\n\n"
+    except Exception as e:
+        # Headers are already sent, so errors are reported in-band
+        logger.exception("streamed answer failed")
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        return
+    yield "event: done\ndata: {}\n\n"
+
+
 def main(
     host: str = typer.Option("0.0.0.0", "--host"),
     port: int = typer.Option(8000, "--port"),
     reload: bool = typer.Option(False, "--reload"),
     workers: int = typer.Option(1, "--workers"),
     log_level: str = typer.Option("info", "--log-level"),
+    pool_size: int | None = typer.Option(
+        None, "--pool-size", help="Max pooled connections to Ollama per worker"
+    ),
 ):
     # Check Ollama health before starting the server
     try:
-        validate_ollama_setup()
+        validate_ollama_setup(*ModelRouter.from_settings().models)
         typer.echo("Ollama health check passed")
     except OllamaHealthError as e:
         typer.echo(f"Ollama health check failed: {e}", err=True)
         raise typer.Exit(1) from e
 
+    # Workers build the app through the factory, so pass settings via env
+    if pool_size is not None:
+        os.environ["SMART_AGENT_POOL_SIZE"] = str(pool_size)
+    if workers > 1 and not os.environ.get("SMART_AGENT_METRICS_DIR"):
+        # Fresh per server so counters restart with it, like a single process
+        os.environ["SMART_AGENT_METRICS_DIR"] = tempfile.mkdtemp(
+            prefix="smart-agent-metrics-"
+        )
+
     # Logging is configured at root via CLI callback; emit a startup message
     uvicorn.run(
         "smart_agent.cli.commands.run:build_app",
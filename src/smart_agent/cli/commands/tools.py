@@ -1,6 +1,6 @@
 import typer
 
-from smart_agent.registry import load_tools
+from smart_agent.registry import load_tool, load_tools, tool_names
 
 app = typer.Typer(add_completion=False)
 
@@ -33,7 +33,11 @@ def list_(
 
 @app.command("describe")
 def describe(name: str):
-    """Describe a specific tool in detail."""
+    """Describe a specific tool by display or entry point name."""
+    if name in tool_names():
+        # Entry point names load only that plugin
+        _print_tool_detailed(load_tool(name).to_ollama_tool())
+        return
     tools = [tool.to_ollama_tool() for tool in load_tools()]
 
     for tool in tools:
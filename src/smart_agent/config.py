@@ -0,0 +1,210 @@
+"""
+Runtime settings read from an optional config file and ``SMART_AGENT_*``
+environment variables.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, fields
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ENV_PREFIX = "SMART_AGENT_"
+CONFIG_ENV = f"{ENV_PREFIX}CONFIG"
+DEFAULT_MODEL = "llama3.1:8b"
+
+
+def _parse_bool(raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off", ""):
+        return False
+    raise ValueError(raw)
+
+
+_PARSERS: dict[type, Callable[[str], Any]] = {
+    bool: _parse_bool,
+    int: int,
+    float: float,
+    str: str,
+}
+
+
+def _coerce(expected: type, value: Any) -> Any:
+    """Check a config-file value against a field type; strings are parsed."""
+    if isinstance(value, str):
+        return _PARSERS[expected](value)
+    if expected is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, expected) and not (
+        expected is int and isinstance(value, bool)
+    ):
+        return value
+    raise ValueError(value)
+
+
+def read_config_file(path: str) -> dict[str, Any]:
+    """
+    Read a flat table of settings from a TOML (``.toml``) or JSON file.
+
+    Keys are field names of ``Settings``; a ``[smart_agent]`` table (or
+    ``"smart_agent"`` object) is used instead of the top level if present.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If it cannot be parsed or is not a table.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError as e:  # Python 3.10
+            raise ValueError("TOML config files need Python 3.11+") from e
+        values: Any = tomllib.loads(data.decode("utf-8"))
+    else:
+        values = json.loads(data)
+    if isinstance(values, dict) and isinstance(values.get("smart_agent"), dict):
+        values = values["smart_agent"]
+    if not isinstance(values, dict):
+        raise ValueError("expected a table of settings")
+    return values
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Tunables shared by the CLI, the API server and the agent.
+
+    Every field can be overridden with an environment variable named after it,
+    e.g. ``pool_size`` is read from ``SMART_AGENT_POOL_SIZE``. Defaults can
+    also come from a TOML or JSON file named by ``SMART_AGENT_CONFIG``;
+    environment variables win over the file.
+
+    Attributes:
+        model (str): Main Ollama model; used by every stage without its own.
+        route_model (str): Model of the first round, which decides whether
+            and which tools to call; empty uses ``model``.
+        synthesis_model (str): Model that writes the answer from tool
+            results; empty uses ``model``.
+        direct_model (str): Model that answers queries needing no tools;
+            empty uses ``model``.
+        pool_size (int): Max HTTP connections kept open to Ollama.
+        keepalive_expiry (float): Seconds an idle pooled connection is kept.
+        health_interval (float): Seconds between background health refreshes.
+        response_cache_size (int): Answers kept in memory; 0 disables caching.
+        response_cache_path (str): SQLite file for a persistent answer cache.
+        response_cache_max_bytes (int): Size limit of the SQLite cache.
+        tool_cache_entries (int): Tool results kept in memory; 0 disables it.
+        tool_cache_max_bytes (int): Approximate memory limit of the tool cache.
+        csv_engine (str): CSV parsing engine: ``auto``, ``rows``, ``stream``
+            or ``columnar``.
+        csv_columnar_max_bytes (int): Largest CSV file the ``auto`` engine
+            loads into columnar arrays, which take several times the file
+            size; larger files are streamed.
+        max_steps (int): Model rounds per query, including the final answer.
+        token_budget (int): Tokens per query before tools are withheld; 0 = no limit.
+        time_budget (float): Seconds per query before tools are withheld; 0 = no limit.
+        llm_concurrency (int): Chat requests sent to Ollama at once per process.
+        max_active_requests (int): API requests processed at once per worker.
+        max_queued_requests (int): API requests allowed to wait per worker.
+        max_queued_per_client (int): Waiting API requests allowed per client.
+        metrics_dir (str): Directory where API workers share metric snapshots.
+        metrics_interval (float): Seconds between metric snapshot writes.
+        trace_export (str): Span export target: ``file:<path>``, ``otlp`` or
+            ``otlp:<collector url>``; empty disables tracing.
+        num_ctx (int): Context window requested from Ollama on every call;
+            0 uses the model's default. Kept fixed so the model is not
+            reloaded and its prompt cache survives between requests.
+        pin_prefix (bool): Evaluate the system prompt and tool schemas once
+            at server or daemon start-up so requests reuse them.
+        keep_alive (str): How long Ollama keeps the model loaded after a
+            request, e.g. ``30m`` or seconds (``-1``: forever); empty uses
+            Ollama's default.
+        warm_up (bool): Load the model when the server or daemon starts.
+        keep_warm_interval (float): Ping the model after this many idle
+            seconds so it stays loaded; 0 disables pings.
+        daemon_socket (str): Unix socket of the local daemon; empty uses
+            ``$XDG_RUNTIME_DIR/smart-agent.sock`` or a per-user temp file.
+    """
+
+    model: str = DEFAULT_MODEL
+    route_model: str = ""
+    synthesis_model: str = ""
+    direct_model: str = ""
+    pool_size: int = 10
+    keepalive_expiry: float = 60.0
+    health_interval: float = 30.0
+    response_cache_size: int = 256
+    response_cache_path: str = ""
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    tool_cache_entries: int = 128
+    tool_cache_max_bytes: int = 256 * 1024 * 1024
+    csv_engine: str = "auto"
+    csv_columnar_max_bytes: int = 32 * 1024 * 1024
+    max_steps: int = 5
+    token_budget: int = 0
+    time_budget: float = 0.0
+    llm_concurrency: int = 4
+    max_active_requests: int = 8
+    max_queued_requests: int = 64
+    max_queued_per_client: int = 16
+    metrics_dir: str = ""
+    metrics_interval: float = 5.0
+    trace_export: str = ""
+    num_ctx: int = 8192
+    pin_prefix: bool = True
+    keep_alive: str = "30m"
+    warm_up: bool = True
+    keep_warm_interval: float = 600.0
+    daemon_socket: str = ""
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Build settings from defaults, overridden by the ``SMART_AGENT_CONFIG``
+        file and then by the environment.
+        """
+        values = {}
+        path = os.environ.get(CONFIG_ENV)
+        if path:
+            values = cls._from_file(path)
+        for f in fields(cls):
+            raw = os.environ.get(f"{ENV_PREFIX}{f.name.upper()}")
+            if raw is None:
+                continue
+            parse = _PARSERS[type(f.default)]
+            try:
+                values[f.name] = parse(raw)
+            except ValueError:
+                logger.warning(
+                    f"Ignoring {ENV_PREFIX}{f.name.upper()}={raw!r}: "
+                    f"expected {type(f.default).__name__}"
+                )
+        return cls(**values)
+
+    @classmethod
+    def _from_file(cls, path: str) -> dict[str, Any]:
+        try:
+            raw_values = read_config_file(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring config file {path}: {e}")
+            return {}
+        types = {f.name: type(f.default) for f in fields(cls)}
+        values = {}
+        for name, raw in raw_values.items():
+            if name not in types:
+                logger.warning(f"Ignoring unknown setting {name!r} in {path}")
+                continue
+            try:
+                values[name] = _coerce(types[name], raw)
+            except ValueError:
+                logger.warning(
+                    f"Ignoring {name}={raw!r} in {path}: "
+                    f"expected {types[name].__name__}"
+                )
+        return values
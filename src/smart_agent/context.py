@@ -0,0 +1,220 @@
+"""Token-budgeted packing of tool results into model context."""
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from .tools.base_tool import ToolResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = 2000
+DEFAULT_SAMPLE_ROWS = 20
+CHARS_PER_TOKEN = 4
+
+# Number of rows rendered to extrapolate the size of an unpacked result
+_SIZE_SAMPLE = 50
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/CSV text)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class PackedContext:
+    """
+    A tool result reduced to fit a token budget.
+
+    Attributes:
+        content (str): Text to send to the model as the tool message.
+        tokens_used (int): Estimated tokens in ``content``.
+        tokens_dropped (int): Estimated tokens of the raw result left out.
+        sections (list[str]): Names of the sections that made it in.
+    """
+
+    content: str
+    tokens_used: int
+    tokens_dropped: int
+    sections: list[str] = field(default_factory=list)
+
+
+class ContextBuilder:
+    """
+    Chooses what part of a tool result goes back to the model.
+
+    Sections are added in priority order (error, schema, statistics, markdown
+    outline, sampled rows, text excerpt, remaining metadata) until the budget
+    is spent, so the most informative summary survives even for huge files.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    ):
+        self.token_budget = token_budget
+        self.sample_rows = sample_rows
+
+    def pack(self, tool_name: str, result: ToolResult) -> PackedContext:
+        """
+        Pack a tool result into at most ``token_budget`` estimated tokens.
+
+        Args:
+            tool_name (str): Name of the tool that produced the result.
+            result (ToolResult): The raw tool result.
+
+        Returns:
+            PackedContext: The packed text with token accounting.
+        """
+        packer = _Packer(self.token_budget)
+        packer.add("header", [f"Tool '{tool_name}' returned:"], required=True)
+
+        meta = result.meta or {}
+        if "error" in meta:
+            packer.add("error", [f"Error: {meta['error']}"], required=True)
+            return packer.finish(_estimate_raw_tokens(result))
+
+        packer.add("schema", _schema_lines(meta))
+        packer.add("statistics", _stats_lines(meta.get("stats")))
+        packer.add("outline", _outline_lines(meta.get("headers")))
+
+        data = result.data
+        if isinstance(data, list) and data:
+            packer.add("rows", self._sample_lines(data, packer.remaining))
+        elif isinstance(data, str) and data:
+            packer.add("excerpt", ["Content:", *data.splitlines()])
+
+        packer.add("metadata", _extra_meta_lines(meta))
+        packed = packer.finish(_estimate_raw_tokens(result))
+        logger.debug(
+            f"Packed '{tool_name}' result: {packed.tokens_used} tokens used, "
+            f"{packed.tokens_dropped} dropped ({', '.join(packed.sections)})"
+        )
+        return packed
+
+    def _sample_lines(self, rows: list[Any], budget: int) -> list[str]:
+        """Render a stratified sample of rows that fits in ``budget`` tokens."""
+        if not isinstance(rows[0], dict):
+            lines = [json.dumps(row, default=str) for row in rows[: self.sample_rows]]
+            return [f"Sample rows ({len(lines)} of {len(rows)}):", *lines]
+
+        columns = list(rows[0])
+        probe = [_csv_line(rows[i], columns) for i in _stratified(len(rows), 5)]
+        per_row = max(1, sum(estimate_tokens(line) for line in probe) // len(probe))
+        fit = max(1, (budget - estimate_tokens(",".join(columns)) - 10) // per_row)
+        indices = _stratified(len(rows), min(self.sample_rows, fit))
+        return [
+            f"Sample rows ({len(indices)} of {len(rows)}, evenly spaced):",
+            ",".join(columns),
+            *(_csv_line(rows[i], columns) for i in indices),
+        ]
+
+
+class _Packer:
+    def __init__(self, budget: int):
+        self.remaining = budget
+        self.lines: list[str] = []
+        self.sections: list[str] = []
+
+    def add(self, name: str, lines: list[str], required: bool = False) -> None:
+        kept = 0
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if cost > self.remaining and not required:
+                break
+            self.lines.append(line)
+            self.remaining -= cost
+            kept += 1
+        if kept:
+            self.sections.append(name)
+
+    def finish(self, raw_tokens: int) -> PackedContext:
+        content = "\n".join(self.lines)
+        used = estimate_tokens(content)
+        return PackedContext(
+            content=content,
+            tokens_used=used,
+            tokens_dropped=max(0, raw_tokens - used),
+            sections=self.sections,
+        )
+
+
+def _schema_lines(meta: dict[str, Any]) -> list[str]:
+    lines = []
+    if "file_path" in meta:
+        lines.append(f"File: {meta['file_path']}")
+    if "columns" in meta:
+        lines.append(f"Columns: {', '.join(str(c) for c in meta['columns'] or [])}")
+    if "row_count" in meta:
+        lines.append(f"Rows: {meta['row_count']}")
+    for key in ("lines_count", "word_count", "summary"):
+        if key in meta:
+            lines.append(f"{key}: {meta[key]}")
+    return lines
+
+
+def _stats_lines(stats: dict[str, dict[str, Any]] | None) -> list[str]:
+    if not stats:
+        return []
+    lines = ["Column statistics:"]
+    for name, summary in stats.items():
+        fields = " ".join(
+            f"{key}={json.dumps(value, default=str, separators=(',', ':'))}"
+            for key, value in summary.items()
+            if value is not None and key != "histogram"
+        )
+        lines.append(f"- {name}: {fields}")
+    return lines
+
+
+def _outline_lines(headers: list[str] | None) -> list[str]:
+    if not headers:
+        return []
+    return ["Section outline:", *headers]
+
+
+def _extra_meta_lines(meta: dict[str, Any]) -> list[str]:
+    shown = {
+        "file_path",
+        "columns",
+        "row_count",
+        "lines_count",
+        "word_count",
+        "summary",
+        "stats",
+        "headers",
+    }
+    return [f"{key}: {value}" for key, value in meta.items() if key not in shown]
+
+
+def _csv_line(row: dict[str, Any], columns: list[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(
+        "" if row.get(c) is None else row.get(c) for c in columns
+    )
+    return buffer.getvalue()
+
+
+def _stratified(total: int, k: int) -> list[int]:
+    """Pick ``k`` row indices spread evenly over ``total`` rows."""
+    if k >= total:
+        return list(range(total))
+    if k <= 1:
+        return [0]
+    return sorted({round(i * (total - 1) / (k - 1)) for i in range(k)})
+
+
+def _estimate_raw_tokens(result: ToolResult) -> int:
+    """Estimate what the unpacked ``data`` + ``meta`` repr would have cost."""
+    data = result.data
+    if isinstance(data, list) and data:
+        sample = [repr(data[i]) for i in _stratified(len(data), _SIZE_SAMPLE)]
+        data_chars = sum(len(s) for s in sample) * len(data) // len(sample)
+    else:
+        data_chars = len(str(data))
+    meta_chars = len(repr(result.meta))
+    return (data_chars + meta_chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
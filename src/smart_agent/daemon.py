@@ -0,0 +1,333 @@
+"""
+Local daemon that keeps a warm agent behind a Unix domain socket.
+
+A one-shot ``smart-agent query`` pays for interpreter start-up, imports, a
+health check and a fresh Ollama connection before the model sees the prompt.
+The daemon does that work once: it holds one ``SmartAgent`` (with its tool and
+response caches), one connection pool and a background health monitor, and
+answers queries sent over the socket.
+
+The protocol is newline-delimited JSON. Each request is one object with an
+``op`` (``query``, ``status`` or ``stop``); the daemon replies with zero or
+more ``{"delta": ...}`` lines for streamed queries followed by exactly one
+line carrying ``status`` (``success`` or ``error``). A connection can carry
+any number of requests. Queries include the client's working directory as
+``cwd`` so relative file paths resolve where the user asked the question, not
+where the daemon was started.
+
+The client half only needs the standard library, so the CLI can check for a
+running daemon without importing the agent stack.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any
+
+from smart_agent.config import Settings
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+SOCKET_NAME = "smart-agent.sock"
+# Replies larger than this are not expected; a guard against a wrong socket
+MAX_LINE_BYTES = 64 * 1024 * 1024
+
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be started or talked to."""
+
+    pass
+
+
+def default_socket_path(settings: Settings | None = None) -> str:
+    """
+    ``SMART_AGENT_DAEMON_SOCKET``, else ``smart-agent.sock`` in
+    ``$XDG_RUNTIME_DIR``, else a per-user file in the temp directory.
+    """
+    settings = settings or Settings.from_env()
+    if settings.daemon_socket:
+        return settings.daemon_socket
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, SOCKET_NAME)
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"smart-agent-{uid}.sock")
+
+
+class DaemonClient:
+    """
+    Blocking client for one daemon connection.
+
+    Args:
+        sock: Connected Unix socket.
+    """
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._file = sock.makefile("rb")
+
+    @classmethod
+    def connect(cls, path: str, timeout: float | None = None) -> "DaemonClient | None":
+        """
+        Connect to the daemon at ``path``.
+
+        Returns:
+            DaemonClient | None: The client, or None if no daemon is listening.
+        """
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(path)
+        except OSError:
+            # Stale socket file left by a daemon that did not shut down cleanly
+            sock.close()
+            return None
+        return cls(sock)
+
+    def request(self, message: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Send one request and yield reply lines up to the final one.
+
+        Raises:
+            DaemonError: If the connection breaks before the final reply.
+        """
+        try:
+            self._sock.sendall(json.dumps(message).encode() + b"\n")
+            while True:
+                line = self._file.readline(MAX_LINE_BYTES)
+                if not line:
+                    raise DaemonError("Daemon closed the connection")
+                reply = json.loads(line)
+                yield reply
+                if "status" in reply:
+                    return
+        except (OSError, ValueError) as e:
+            raise DaemonError(f"Daemon connection failed: {e}") from e
+
+    def query(
+        self,
+        text: str,
+        timeout: float = 30.0,
+        stream: bool = False,
+        cwd: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Run ``text`` through the daemon's agent, resolving relative file
+        paths against ``cwd`` (default: the current directory).
+        """
+        return self.request(
+            {
+                "op": "query",
+                "query": text,
+                "timeout": timeout,
+                "stream": stream,
+                "cwd": os.path.abspath(cwd or os.getcwd()),
+            }
+        )
+
+    def call(self, op: str) -> dict[str, Any]:
+        """Send a request without streamed replies and return the final reply."""
+        *_, reply = self.request({"op": op})
+        return reply
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class DaemonServer:
+    """
+    Serve queries on ``socket_path`` from one long-lived agent.
+
+    Args:
+        socket_path: Unix socket to listen on; created with owner-only access.
+        settings: Runtime settings (default: read from the environment).
+        ollama_transport: Transport for every Ollama call, e.g. an in-process
+            mock for tests (default: connect to the Ollama service).
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        settings: Settings | None = None,
+        ollama_transport: "httpx.AsyncBaseTransport | None" = None,
+    ):
+        self.socket_path = socket_path
+        self.settings = settings or Settings.from_env()
+        self.ollama_transport = ollama_transport
+        self.requests = 0
+        self._started = 0.0
+        self._server: asyncio.AbstractServer | None = None
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        """
+        Build the agent and start listening.
+
+        Raises:
+            DaemonError: If Unix sockets are unsupported or another daemon is
+                already listening on the path.
+        """
+        from smart_agent.agent import SmartAgent
+        from smart_agent.ollama_health import OllamaHealthMonitor, get_health_monitor
+
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("Unix domain sockets are not supported here")
+        client = DaemonClient.connect(self.socket_path, timeout=1.0)
+        if client is not None:
+            client.close()
+            raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+        with suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+
+        settings = self.settings
+        transport = self.ollama_transport
+        self.health = (
+            get_health_monitor()
+            if transport is None
+            else OllamaHealthMonitor(ttl=settings.health_interval, transport=transport)
+        )
+        self.health.start(settings.health_interval)
+        self.agent = SmartAgent(
+            transport=transport,
+            validate_health=False,
+            settings=settings,
+        )
+        await self.agent.start()
+        umask = os.umask(0o077)
+        try:
+            self._server = await asyncio.start_unix_server(
+                self._handle, path=self.socket_path, limit=MAX_LINE_BYTES
+            )
+        finally:
+            os.umask(umask)
+        self._started = time.monotonic()
+        logger.info(f"Daemon listening on {self.socket_path}")
+
+    async def serve_forever(self) -> None:
+        """Serve until a ``stop`` request arrives, then release everything."""
+        if self._server is None:
+            await self.start()
+        try:
+            await self._stopping.wait()
+        finally:
+            await self.aclose()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def aclose(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        with suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        await self.health.stop()
+        await self.agent.aclose()
+        logger.info("Daemon stopped")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "uptime_seconds": round(time.monotonic() - self._started, 3),
+            "requests": self.requests,
+            "llm": self.agent.llm.scheduler.stats(),
+            "router": self.agent.llm.router.to_dict(),
+            "models": self.agent.lifecycle.stats(),
+        }
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while not reader.at_eof():
+                line = await reader.readline()
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                    op = message.get("op", "query")
+                except (ValueError, AttributeError):
+                    await self._send(writer, _error("invalid request"))
+                    continue
+                if op == "query":
+                    await self._query(message, writer)
+                elif op == "status":
+                    await self._send(writer, {"status": "success", **self.stats()})
+                elif op == "stop":
+                    await self._send(writer, {"status": "success"})
+                    self.stop()
+                    return
+                else:
+                    await self._send(writer, _error(f"unknown op {op!r}"))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _query(
+        self, message: dict[str, Any], writer: asyncio.StreamWriter
+    ) -> None:
+        from smart_agent.ollama_health import OllamaHealthError
+
+        self.requests += 1
+        text = str(message.get("query", ""))
+        timeout = float(message.get("timeout") or 30.0)
+        cwd = message.get("cwd")
+        if not (isinstance(cwd, str) and os.path.isabs(cwd)):
+            # Older clients: fall back to the daemon's own directory
+            cwd = None
+
+        async def answer() -> dict[str, Any]:
+            # Served from the monitor's cache; refreshed in the background
+            await self.health.ensure_healthy(*self.agent.llm.router.models)
+            if not message.get("stream"):
+                result = await self.agent.run(text, working_dir=cwd)
+                return {"status": "success", "response": result.to_dict()}
+            async for chunk in self.agent.run_stream(text, working_dir=cwd):
+                await self._send(writer, {"delta": chunk})
+            return {"status": "success"}
+
+        try:
+            reply = await asyncio.wait_for(answer(), timeout=timeout)
+        except asyncio.TimeoutError:
+            reply = _error("timeout", kind="timeout")
+        except OllamaHealthError as e:
+            reply = _error(str(e), kind="health")
+        except ConnectionError:
+            raise
+        except Exception as e:
+            logger.exception("daemon query failed")
+            reply = _error(str(e))
+        await self._send(writer, reply)
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: dict[str, Any]) -> None:
+        writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+        await writer.drain()
+
+
+def _error(message: str, kind: str = "error") -> dict[str, Any]:
+    return {"status": "error", "error": message, "kind": kind}
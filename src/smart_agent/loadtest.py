@@ -0,0 +1,305 @@
+"""
+Load generator for the ``/answer`` endpoint.
+
+Two load models are supported:
+
+* closed loop: a fixed number of users, each sending its next request as soon
+  as the previous one finished (plus optional think time). Throughput adapts
+  to the server, which shows its saturation point.
+* open loop: requests arrive on a schedule, optionally ramping from one rate
+  to another, whether or not earlier requests finished. Latency is measured
+  from the scheduled arrival, so a stalled server is not hidden by the
+  generator slowing down (coordinated omission).
+
+The target is either a running server (``url``) or the app built by
+``run.build_app`` served in-process against the mock Ollama backend, which
+isolates server overhead from model time.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from smart_agent.bench import summarize
+from smart_agent.mock_ollama import MockOllamaConfig, mock_transport
+
+MODES = ("closed", "open")
+
+# Sends one prompt as the given client and returns the HTTP status
+Send = Callable[[str, str], Awaitable[int]]
+
+
+@dataclass
+class Sample:
+    """
+    Outcome of one request.
+
+    Attributes:
+        offset (float): Seconds from the start of the test to the (scheduled)
+            start of the request.
+        latency (float): Seconds until the response was complete.
+        status (int): HTTP status, or 0 if the request failed without one.
+    """
+
+    offset: float
+    latency: float
+    status: int
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+class PromptMix:
+    """
+    Weighted prompts drawn in a reproducible order.
+
+    Args:
+        prompts: ``(prompt, weight)`` pairs.
+        seed: Seed of the random draw.
+        unique: Append a request counter to every prompt so the response
+            cache cannot answer it.
+    """
+
+    def __init__(
+        self, prompts: list[tuple[str, float]], seed: int = 0, unique: bool = True
+    ):
+        if not prompts:
+            raise ValueError("The prompt mix is empty")
+        self.prompts = [prompt for prompt, _ in prompts]
+        self.weights = [weight for _, weight in prompts]
+        self.unique = unique
+        self._random = random.Random(seed)
+        self._count = 0
+
+    @classmethod
+    def from_file(cls, path: str, seed: int = 0, unique: bool = True) -> "PromptMix":
+        """
+        Read a JSONL mix: ``{"prompt": ..., "weight": ...}`` objects or bare
+        strings (weight 1), one per line.
+
+        Raises:
+            ValueError: If a line is neither.
+        """
+        prompts: list[tuple[str, float]] = []
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"line {number}: invalid JSON ({e})") from e
+                if isinstance(record, str):
+                    prompts.append((record, 1.0))
+                elif isinstance(record, dict) and isinstance(record.get("prompt"), str):
+                    prompts.append((record["prompt"], float(record.get("weight", 1))))
+                else:
+                    raise ValueError(
+                        f"line {number}: expected a string or an object with 'prompt'"
+                    )
+        return cls(prompts, seed=seed, unique=unique)
+
+    def next(self) -> str:
+        self._count += 1
+        (prompt,) = self._random.choices(self.prompts, self.weights)
+        return f"{prompt} (#{self._count})" if self.unique else prompt
+
+
+def arrival_times(
+    rps: float,
+    duration: float,
+    ramp_to: float | None = None,
+    poisson: bool = False,
+    seed: int = 0,
+) -> list[float]:
+    """
+    Scheduled request offsets for an open-loop test.
+
+    The rate changes linearly from ``rps`` to ``ramp_to`` (default: constant)
+    over ``duration`` seconds. Arrivals are evenly spaced, or exponentially
+    distributed with ``poisson``.
+
+    Raises:
+        ValueError: If a rate is not positive.
+    """
+    end_rps = rps if ramp_to is None else ramp_to
+    if rps <= 0 or end_rps <= 0:
+        raise ValueError("Request rates must be positive")
+    rng = random.Random(seed)
+    times: list[float] = []
+    t = 0.0
+    while t < duration:
+        times.append(t)
+        rate = rps + (end_rps - rps) * t / duration
+        t += rng.expovariate(rate) if poisson else 1 / rate
+    return times
+
+
+async def closed_loop(
+    send: Send,
+    mix: PromptMix,
+    users: int,
+    requests: int | None = None,
+    duration: float | None = None,
+    think_time: float = 0.0,
+) -> tuple[list[Sample], float]:
+    """
+    Run ``users`` concurrent request loops until ``requests`` were sent or
+    ``duration`` seconds passed.
+
+    Returns:
+        tuple[list[Sample], float]: Samples and the elapsed seconds.
+    """
+    if requests is None and duration is None:
+        raise ValueError("Give a request count or a duration")
+    samples: list[Sample] = []
+    remaining = requests
+    start = time.perf_counter()
+
+    async def user(index: int) -> None:
+        nonlocal remaining
+        while True:
+            if duration is not None and time.perf_counter() - start >= duration:
+                return
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                remaining -= 1
+            offset = time.perf_counter() - start
+            status = await send(mix.next(), f"user-{index}")
+            latency = time.perf_counter() - start - offset
+            samples.append(Sample(offset, latency, status))
+            if think_time:
+                await asyncio.sleep(think_time)
+
+    await asyncio.gather(*(user(i) for i in range(users)))
+    return samples, time.perf_counter() - start
+
+
+async def open_loop(
+    send: Send, mix: PromptMix, schedule: list[float], clients: int = 16
+) -> tuple[list[Sample], float]:
+    """
+    Start one request at every offset in ``schedule`` regardless of how many
+    are still in flight. Requests are spread over ``clients`` client ids.
+
+    Returns:
+        tuple[list[Sample], float]: Samples and the elapsed seconds.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    perf_start = time.perf_counter()
+
+    async def one(index: int, offset: float) -> Sample:
+        status = await send(mix.next(), f"client-{index % clients}")
+        # Measured from the scheduled arrival, not from when we got to it
+        return Sample(offset, time.perf_counter() - perf_start - offset, status)
+
+    tasks = []
+    for index, offset in enumerate(schedule):
+        delay = start + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(index, offset)))
+    samples = list(await asyncio.gather(*tasks))
+    return samples, time.perf_counter() - perf_start
+
+
+def summarize_load(
+    samples: list[Sample], elapsed: float, interval: float = 1.0
+) -> dict[str, Any]:
+    """
+    Aggregate samples into totals, latency percentiles and a timeline.
+
+    Latency percentiles cover successful requests. The timeline groups
+    requests by start time in ``interval`` second buckets, which shows the
+    rate at which latency or errors start to climb during a ramp.
+    """
+    statuses = Counter("error" if s.status == 0 else str(s.status) for s in samples)
+    succeeded = sum(s.ok for s in samples)
+    buckets: dict[int, list[Sample]] = {}
+    for sample in samples:
+        buckets.setdefault(int(sample.offset // interval), []).append(sample)
+    timeline = []
+    for index in sorted(buckets):
+        bucket = buckets[index]
+        latency = summarize([s.latency for s in bucket if s.ok])
+        timeline.append(
+            {
+                "start": round(index * interval, 3),
+                "requests": len(bucket),
+                "rps": round(len(bucket) / interval, 2),
+                "error_rate": round(1 - sum(s.ok for s in bucket) / len(bucket), 4),
+                "p50_ms": latency.get("p50_ms"),
+                "p95_ms": latency.get("p95_ms"),
+                "p99_ms": latency.get("p99_ms"),
+            }
+        )
+    return {
+        "requests": len(samples),
+        "succeeded": succeeded,
+        "errors": len(samples) - succeeded,
+        "error_rate": round(1 - succeeded / len(samples), 4) if samples else 0.0,
+        "status_codes": dict(statuses),
+        "seconds": round(elapsed, 3),
+        "throughput": round(succeeded / elapsed, 2) if elapsed else 0.0,
+        "latency": summarize([s.latency for s in samples if s.ok]),
+        "timeline": timeline,
+    }
+
+
+@asynccontextmanager
+async def in_process_client(
+    config: MockOllamaConfig | None = None, timeout: float = 60.0
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Serve ``run.build_app`` in-process against the mock Ollama backend and
+    yield a client for it.
+    """
+    from smart_agent.cli.commands.run import build_app
+
+    app = build_app(ollama_transport=mock_transport(config))
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://loadtest",
+            timeout=timeout,
+        ) as client:
+            yield client
+
+
+@asynccontextmanager
+async def remote_client(
+    url: str, timeout: float = 60.0
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield a client for a running server without a connection limit."""
+    async with httpx.AsyncClient(
+        base_url=url,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+    ) as client:
+        yield client
+
+
+def answer_sender(client: httpx.AsyncClient) -> Send:
+    """Send prompts to ``POST /answer``, identifying clients by ``X-Client-Id``."""
+
+    async def send(prompt: str, client_id: str) -> int:
+        try:
+            response = await client.post(
+                "/answer", json={"query": prompt}, headers={"X-Client-Id": client_id}
+            )
+        except httpx.HTTPError:
+            return 0
+        return response.status_code
+
+    return send
@@ -1,6 +1,15 @@
+import atexit
+import copy
 import json
 import logging
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from smart_agent import tracing
 
 try:
     from systemd.journal import JournalHandler
@@ -8,37 +17,204 @@ except ImportError:
     JournalHandler = None
 
 
+# Longest message passed on by the queued handler; tool payloads can be megabytes
+MAX_MESSAGE_CHARS = 16_000
+# Default length of values wrapped in ``Truncated``
+MAX_VALUE_CHARS = 2_000
+# Seconds a WARNING or above waits for room in a full queue before it is dropped
+PUT_TIMEOUT = 0.1
+
+_listener: QueueListener | None = None
+_front: "_QueueHandler | None" = None
+
+
+class Truncated:
+    """
+    Lazily rendered, length-limited value for log arguments.
+
+    Pass as a ``%s`` argument rather than inside an f-string, so nothing is
+    formatted when the level is disabled::
+
+        logger.debug("Tool result meta: %s", Truncated(result.meta))
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int = MAX_VALUE_CHARS):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        return _truncate(text, self.limit)
+
+    __repr__ = __str__
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site for records below WARNING.
+
+    Each logging statement may emit ``rate`` records per second with bursts
+    of up to ``burst``; the rest are dropped and counted, and the next record
+    let through from that call site reports how many were suppressed. One
+    instance can be shared by several handlers; each record is judged once.
+    """
+
+    def __init__(self, rate: float, burst: int = 20):
+        super().__init__()
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.suppressed = 0
+        self._buckets: dict[tuple[str, int], list[float]] = {}
+        self._dropped: dict[tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        decided = record.__dict__.get("rate_limit_passed")
+        if decided is not None:
+            return bool(decided)
+        allowed = self._allow(record)
+        record.rate_limit_passed = allowed
+        return allowed
+
+    def _allow(self, record: logging.LogRecord) -> bool:
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = [tokens, now]
+                self._dropped[key] = self._dropped.get(key, 0) + 1
+                self.suppressed += 1
+                return False
+            self._buckets[key] = [tokens - 1, now]
+            dropped = self._dropped.pop(key, 0)
+        if dropped:
+            record.msg = (
+                f"{record.getMessage()} ({dropped} similar messages suppressed)"
+            )
+            record.args = None
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without blocking the caller.
+
+    The message is rendered (and truncated) here, while the caller's context
+    variables are still visible; JSON encoding and I/O happen on the listener.
+    When the queue is full, records below WARNING are dropped and counted;
+    WARNING and above wait up to ``PUT_TIMEOUT`` seconds for room first.
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self._queue = q
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if record.levelno < logging.WARNING:
+                self._queue.put_nowait(record)
+            else:
+                self._queue.put(record, timeout=PUT_TIMEOUT)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = _truncate(record.getMessage(), MAX_MESSAGE_CHARS)
+        record.args = None
+        record.request_id = tracing.current_request_id()
+        span = tracing.current_span()
+        if span is not None:
+            record.trace_id, record.span_id = span.trace_id, span.span_id
+        return record
+
+
 class JsonFormatter(logging.Formatter):
-    """JSON formatter for structured logging."""
+    """
+    JSON formatter for structured logging.
+
+    Records logged while a request or span is active also carry its
+    ``request_id`` and ``trace_id``/``span_id``.
+    """
 
     def format(self, record: logging.LogRecord) -> str:
-        return json.dumps(
-            {
-                "time": self.formatTime(record, self.datefmt),
-                "name": record.name,
-                "level": record.levelname,
-                "message": record.getMessage(),
+        entry = {
+            "time": self.formatTime(record, self.datefmt),
+            "name": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "request_id"):
+            # Captured by the queued handler on the logging thread
+            context = {
+                "request_id": record.request_id,
+                "trace_id": getattr(record, "trace_id", None),
+                "span_id": getattr(record, "span_id", None),
             }
-        )
+        else:
+            span = tracing.current_span()
+            context = {
+                "request_id": tracing.current_request_id(),
+                "trace_id": span.trace_id if span else None,
+                "span_id": span.span_id if span else None,
+            }
+        entry.update((k, v) for k, v in context.items() if v is not None)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
 
 
 def configure_logging(
-    level: str = "INFO", fmt: str = "color", to_journald: bool = False
+    level: str = "INFO",
+    fmt: str = "color",
+    to_journald: bool = False,
+    queued: bool = False,
+    rate_limit: float = 0.0,
+    queue_size: int = 10_000,
 ) -> None:
-    """Configure stdlib logging with optional journald and JSON format."""
+    """
+    Configure stdlib logging with optional journald and JSON format.
+
+    Args:
+        level: Root log level name.
+        fmt: ``"color"`` or ``"json"``.
+        to_journald: Also send records to systemd-journald when available.
+        queued: Format and write records on a background thread, so logging
+            never blocks the caller (e.g. the server's event loop).
+        rate_limit: Records per second allowed from each logging statement
+            below WARNING; ``0`` disables rate limiting.
+        queue_size: Records buffered in queued mode before new ones are dropped
+            (WARNING and above wait briefly for room first).
+    """
+    global _listener, _front
     log_level = getattr(logging, level.upper(), logging.INFO)
+    stop_logging()
 
     # Clear and configure root logger
     root = logging.getLogger()
     root.handlers.clear()
     root.setLevel(log_level)
+    handlers: list[logging.Handler] = []
 
     # Add journald handler if requested and available
     if to_journald and JournalHandler:
         try:
             jh = JournalHandler(SYSLOG_IDENTIFIER="smart-agent")
             jh.setLevel(log_level)
-            root.addHandler(jh)
+            handlers.append(jh)
         except Exception:
             pass
 
@@ -56,8 +232,48 @@ def configure_logging(
             )
         )
 
-    root.addHandler(console)
+    handlers.append(console)
+
+    if queued:
+        log_queue: queue.Queue[logging.LogRecord] = queue.Queue(queue_size)
+        _front = _QueueHandler(log_queue)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        handlers = [_front]
+    limiter = RateLimitFilter(rate_limit) if rate_limit > 0 else None
+    for handler in handlers:
+        if limiter is not None:
+            handler.addFilter(limiter)
+        root.addHandler(handler)
 
     # Quiet noisy third-party loggers
     for name in ("urllib3", "botocore"):
         logging.getLogger(name).setLevel(max(log_level, logging.WARNING))
+
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the listener thread, if running.
+
+    Records dropped because the queue was full are reported as a final warning.
+    """
+    global _listener, _front
+    listener, _listener = _listener, None
+    front, _front = _front, None
+    if listener is None:
+        return
+    listener.stop()
+    if front is not None and front.dropped:
+        record = logging.LogRecord(
+            __name__,
+            logging.WARNING,
+            __file__,
+            0,
+            f"Dropped {front.dropped} log records because the log queue was full",
+            None,
+            None,
+        )
+        for handler in listener.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
@@ -0,0 +1,387 @@
+"""
+Prometheus-style metrics with a text exposition renderer.
+
+Metrics live in a process-local registry. With several uvicorn workers each
+worker periodically writes a JSON snapshot to ``Settings.metrics_dir`` and
+``/metrics`` merges every snapshot, so whichever worker answers a scrape
+reports totals for the whole server.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable, Collection, Iterable, Sequence
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = [[list(key), _copy(value)] for key, value in self._values.items()]
+        return {
+            "type": self.type,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. requests in flight."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative ``le`` buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-serializable state of every metric in this process."""
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "metrics": {name: m.snapshot() for name, m in self._metrics.items()},
+        }
+
+    def write_snapshot(self, directory: str) -> None:
+        """Atomically write this process's snapshot to ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"worker-{os.getpid()}.json")
+        # Unique temp name: a periodic write may overlap the final one
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def render(self, directory: str | None = None) -> str:
+        """
+        Render the Prometheus text format.
+
+        Args:
+            directory: Snapshot directory shared by workers; when set, totals
+                of every worker are merged into the output.
+        """
+        snapshots = [self.snapshot()]
+        if directory:
+            snapshots.extend(_read_snapshots(directory, exclude_pid=os.getpid()))
+        return render(merge_snapshots(snapshots))
+
+
+def merge_snapshots(snapshots: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Sum counters, histograms and gauges across worker snapshots.
+
+    Gauges of workers that are no longer running are skipped, since values
+    like "requests in flight" are meaningless once the process is gone.
+    """
+    merged: dict[str, Any] = {}
+    for snapshot in snapshots:
+        live = _pid_alive(snapshot.get("pid", 0))
+        for name, metric in snapshot.get("metrics", {}).items():
+            if metric["type"] == "gauge" and not live:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                current = target["samples"].get(key)
+                target["samples"][key] = (
+                    _copy(value) if current is None else _add(current, value)
+                )
+    return merged
+
+
+def render(metrics: dict[str, Any]) -> str:
+    lines: list[str] = []
+    for name, metric in metrics.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric["labelnames"]
+        for key, value in metric["samples"].items():
+            labels = list(zip(labelnames, key, strict=True))
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            for bound, count in zip(metric["buckets"], value["buckets"], strict=True):
+                le = [*labels, ("le", _number(bound))]
+                lines.append(f"{name}_bucket{_labels(le)} {count}")
+            inf = [*labels, ("le", "+Inf")]
+            lines.append(f"{name}_bucket{_labels(inf)} {value['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _read_snapshots(directory: str, exclude_pid: int) -> list[dict[str, Any]]:
+    snapshots = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        if not name.endswith(".json") or name == f"worker-{exclude_pid}.json":
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.debug(f"Skipping unreadable metrics snapshot {name}: {e}")
+    return snapshots
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {**value, "buckets": list(value["buckets"])}
+    return value
+
+
+def _add(current: Any, value: Any) -> Any:
+    if isinstance(current, dict):
+        current["buckets"] = [
+            a + b for a, b in zip(current["buckets"], value["buckets"], strict=True)
+        ]
+        current["sum"] += value["sum"]
+        current["count"] += value["count"]
+        return current
+    return current + value
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and in-flight counts for ``paths``.
+
+    Latency is measured until the last body chunk is sent, so streamed
+    responses are timed in full. Other paths are passed through untouched to
+    keep the label set bounded.
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]], paths: Collection[str]):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_and_record(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc(path=path)
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(path=path)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - start, path=path, status=str(status)
+            )
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    "smart_agent_request_seconds",
+    "End-to-end API request latency.",
+    ("path", "status"),
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "smart_agent_requests_in_flight", "API requests being processed.", ("path",)
+)
+QUEUED_REQUESTS = REGISTRY.gauge(
+    "smart_agent_queued_requests", "API requests waiting for admission."
+)
+LLM_CHAT_SECONDS = REGISTRY.histogram(
+    "smart_agent_llm_chat_seconds",
+    "Duration of one chat round with Ollama, including queueing.",
+    ("model", "stream"),
+)
+LLM_QUEUE_SECONDS = REGISTRY.histogram(
+    "smart_agent_llm_queue_seconds", "Time chat calls waited for a scheduler slot."
+)
+LLM_PROMPT_TOKENS = REGISTRY.histogram(
+    "smart_agent_llm_prompt_tokens",
+    "Prompt tokens evaluated per chat round (prompt_eval_count).",
+    ("model",),
+    TOKEN_BUCKETS,
+)
+LLM_EVAL_TOKENS = REGISTRY.histogram(
+    "smart_agent_llm_eval_tokens",
+    "Tokens generated per chat round (eval_count).",
+    ("model",),
+    TOKEN_BUCKETS,
+)
+LLM_EVAL_SECONDS = REGISTRY.histogram(
+    "smart_agent_llm_eval_seconds",
+    "Generation time reported by Ollama per chat round (eval_duration).",
+    ("model",),
+)
+LLM_LOAD_SECONDS = REGISTRY.histogram(
+    "smart_agent_llm_load_seconds",
+    "Model load time reported by Ollama per chat round, warm-up or ping.",
+    ("model",),
+)
+LLM_COLD_LOADS = REGISTRY.counter(
+    "smart_agent_llm_cold_loads_total",
+    "Requests that waited for Ollama to load the model.",
+    ("model",),
+)
+LLM_PREFIX_REUSE = REGISTRY.counter(
+    "smart_agent_llm_prefix_reuse_total",
+    "First chat rounds by whether Ollama reused the pinned prompt prefix.",
+    ("model", "result"),
+)
+TOOL_SECONDS = REGISTRY.histogram(
+    "smart_agent_tool_seconds", "Tool execution time.", ("tool", "status")
+)
+HEALTH_CHECK_SECONDS = REGISTRY.histogram(
+    "smart_agent_health_check_seconds", "Ollama health probe latency.", ("result",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "smart_agent_cache_requests_total", "Cache lookups.", ("cache", "result")
+)
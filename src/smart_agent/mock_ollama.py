@@ -0,0 +1,206 @@
+"""
+Deterministic stand-in for the Ollama HTTP API, for benchmarks and load tests.
+
+The mock answers ``/api/chat`` (streamed or not, including load-only requests
+without messages), ``/api/tags`` and ``/api/version`` with the same JSON
+shapes as Ollama. Latency and token rates
+are configurable and replies depend only on the request, so runs are
+repeatable and measure this package rather than the model.
+
+Like Ollama's prompt cache, ``prompt_eval_count`` only counts the part of a
+prompt that differs from the previous prompt sent to the same model.
+
+When tools are offered and the latest user message mentions a ``.csv`` or
+``.md`` file, the first round calls the matching tool, so the agent loop is
+exercised end to end.
+"""
+
+import asyncio
+import json
+import os
+import re
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from smart_agent.ollama_health import DEFAULT_MODEL
+
+_FILE_PATTERN = re.compile(r"[\w./\\-]+\.(csv|md)\b", re.IGNORECASE)
+_TOOL_KEYWORDS = {"csv": "csv", "md": "markdown"}
+_WORDS = ("the", "data", "shows", "a", "steady", "trend", "across", "all", "rows")
+
+
+@dataclass(frozen=True)
+class MockOllamaConfig:
+    """
+    Behaviour of the mock server.
+
+    Attributes:
+        latency (float): Seconds before the first token of every chat round,
+            standing in for prompt evaluation.
+        tokens_per_second (float): Generation speed; ``0`` generates instantly.
+        reply_tokens (int): Tokens in every text reply.
+        load_seconds (float): ``load_duration`` reported on every response.
+        models (tuple[str, ...]): Models listed by ``/api/tags``.
+        tool_calls (bool): Call tools for files mentioned in the prompt.
+    """
+
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    reply_tokens: int = 32
+    load_seconds: float = 0.0
+    models: tuple[str, ...] = (DEFAULT_MODEL,)
+    tool_calls: bool = True
+
+    @property
+    def model_seconds(self) -> float:
+        """Time the mock spends on one text reply."""
+        generation = (
+            self.reply_tokens / self.tokens_per_second if self.tokens_per_second else 0
+        )
+        return self.latency + generation
+
+
+def build_mock_ollama(config: MockOllamaConfig | None = None) -> FastAPI:
+    """Build the mock Ollama ASGI app."""
+    config = config or MockOllamaConfig()
+    api = FastAPI(title="Mock Ollama")
+    api.state.config = config
+    api.state.chats = 0
+    api.state.cached_prompts = {}
+
+    @api.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-mock"}
+
+    @api.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": m, "model": m} for m in config.models]}
+
+    @api.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        api.state.chats += 1
+        model = body.get("model") or DEFAULT_MODEL
+        if model not in config.models:
+            return JSONResponse(
+                {"error": f"model '{model}' not found"}, status_code=404
+            )
+        messages = body.get("messages") or []
+        if not messages:
+            # Load-only request, as sent to warm a model up
+            load = {"load_duration": int(config.load_seconds * 1e9)}
+            return {**_chunk(model, "", None, load), "done_reason": "load"}
+        tools = body.get("tools") or []
+        prompt = _prompt_text(messages, tools)
+        cached = os.path.commonprefix([api.state.cached_prompts.get(model, ""), prompt])
+        api.state.cached_prompts[model] = prompt
+        prompt_tokens = max(1, (len(prompt) - len(cached)) // 4)
+        tool_call = _tool_call(messages, tools) if config.tool_calls else None
+        words = [] if tool_call else _reply(messages, config.reply_tokens)
+        usage = {
+            "load_duration": int(config.load_seconds * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(config.latency * 1e9),
+            "eval_count": len(words),
+            "eval_duration": int(_generation_seconds(config, len(words)) * 1e9),
+        }
+        if body.get("stream", True):
+            return StreamingResponse(
+                _stream(config, model, words, tool_call, usage),
+                media_type="application/x-ndjson",
+            )
+        await asyncio.sleep(config.latency + _generation_seconds(config, len(words)))
+        return _chunk(model, "".join(words), tool_call, usage)
+
+    return api
+
+
+def mock_transport(config: MockOllamaConfig | None = None) -> httpx.ASGITransport:
+    """An httpx transport that serves Ollama requests from an in-process mock."""
+    return httpx.ASGITransport(app=build_mock_ollama(config))
+
+
+async def _stream(
+    config: MockOllamaConfig,
+    model: str,
+    words: list[str],
+    tool_call: dict[str, Any] | None,
+    usage: dict[str, int],
+) -> AsyncIterator[str]:
+    await asyncio.sleep(config.latency)
+    delay = 1 / config.tokens_per_second if config.tokens_per_second else 0
+    for word in words:
+        if delay:
+            await asyncio.sleep(delay)
+        yield json.dumps(_chunk(model, word, None, None)) + "\n"
+    yield json.dumps(_chunk(model, "", tool_call, usage)) + "\n"
+
+
+def _chunk(
+    model: str,
+    content: str,
+    tool_call: dict[str, Any] | None,
+    usage: dict[str, int] | None,
+) -> dict[str, Any]:
+    message: dict[str, Any] = {"role": "assistant", "content": content}
+    if tool_call is not None:
+        message["tool_calls"] = [tool_call]
+    chunk: dict[str, Any] = {
+        "model": model,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "message": message,
+        "done": usage is not None,
+    }
+    if usage is not None:
+        total = sum(v for k, v in usage.items() if k.endswith("_duration"))
+        chunk.update(done_reason="stop", total_duration=total, **usage)
+    return chunk
+
+
+def _prompt_text(messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> str:
+    """Serialize a prompt with system messages and tools first, as templates do."""
+    system = [m for m in messages if m.get("role") == "system"]
+    rest = [m for m in messages if m.get("role") != "system"]
+    return "".join(json.dumps(m) for m in [*system, *tools, *rest])
+
+
+def _generation_seconds(config: MockOllamaConfig, tokens: int) -> float:
+    return tokens / config.tokens_per_second if config.tokens_per_second else 0.0
+
+
+def _reply(messages: list[dict[str, Any]], tokens: int) -> list[str]:
+    """Deterministic words derived from the conversation length."""
+    offset = sum(len(str(m.get("content") or "")) for m in messages)
+    return [
+        ("" if i == 0 else " ") + _WORDS[(offset + i) % len(_WORDS)]
+        for i in range(tokens)
+    ]
+
+
+def _tool_call(
+    messages: list[dict[str, Any]], tools: list[dict[str, Any]]
+) -> dict[str, Any] | None:
+    """Call the tool matching the file in the last user message, once."""
+    if not tools or not messages or messages[-1].get("role") != "user":
+        return None
+    match = _FILE_PATTERN.search(str(messages[-1].get("content") or ""))
+    if match is None:
+        return None
+    keyword = _TOOL_KEYWORDS[match.group(1).lower()]
+    for tool in tools:
+        function = tool.get("function", {})
+        text = f"{function.get('name', '')} {function.get('description', '')}"
+        if keyword in text.lower():
+            return {
+                "function": {
+                    "name": function["name"],
+                    "arguments": {"file_path": match.group(0)},
+                }
+            }
+    return None
@@ -0,0 +1,219 @@
+"""
+Keep Ollama models loaded between requests.
+
+Ollama unloads a model ``keep_alive`` after its last request (five minutes
+unless the request says otherwise), and the next request then waits for the
+weights to load again. ``ModelLifecycle`` removes those cold starts from the
+request path:
+
+* every chat call carries the configured ``keep_alive``;
+* ``warm_up`` loads the models before the first request, e.g. at server
+  start-up;
+* a background task pings models that have been idle for
+  ``keep_warm_interval`` seconds so they stay resident through quiet periods.
+
+Ollama reports ``load_duration`` on every response. It is recorded per model,
+and requests that waited longer than ``COLD_LOAD_SECONDS`` for a load are
+logged and counted, so cold starts are visible in the logs, ``/healthz`` and
+``/metrics``. Loads from warm-up and pings are recorded but not counted: no
+request waited for them.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Mapping, Sequence
+from contextlib import suppress
+from typing import Any
+
+from ollama import AsyncClient
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Loading weights takes seconds; a resident model reports a few milliseconds
+COLD_LOAD_SECONDS = 0.5
+MIN_PING_DELAY = 1.0
+
+
+def parse_keep_alive(raw: str) -> float | str | None:
+    """
+    Convert a ``keep_alive`` setting to what Ollama accepts.
+
+    Returns:
+        float | str | None: Seconds for plain numbers (``-1`` keeps the model
+            loaded indefinitely), durations such as ``"30m"`` unchanged, and
+            None for an empty value, which leaves Ollama's default in place.
+    """
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+
+class ModelLifecycle:
+    """
+    Warm-up, ``keep_alive`` and idle pings for the models an agent uses.
+
+    Args:
+        client: Ollama client used for warm-up and pings.
+        models: Models to keep loaded.
+        keep_alive: Sent with every chat call (None: Ollama's default).
+        keep_warm_interval: Ping a model after this many idle seconds;
+            0 disables pings.
+        options: Model options of the chat calls. Loads use the same ones,
+            since Ollama reloads a model whose ``num_ctx`` changes.
+    """
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        models: Sequence[str],
+        keep_alive: float | str | None = None,
+        keep_warm_interval: float = 0.0,
+        options: Mapping[str, Any] | None = None,
+    ):
+        self.client = client
+        self.models = list(dict.fromkeys(models))
+        self.keep_alive = keep_alive
+        self.keep_warm_interval = keep_warm_interval
+        self.options = options
+        self.cold_loads = 0
+        self.pings = 0
+        self._last_used: dict[str, float] = {}
+        self._last_load: dict[str, float] = {}
+        self._pinger: asyncio.Task[None] | None = None
+
+    def touch(self, model: str) -> None:
+        """Record that ``model`` just served a request."""
+        self._last_used[model] = time.monotonic()
+
+    def observe_load(self, model: str, seconds: float, *, request: bool) -> None:
+        """
+        Record the ``load_duration`` Ollama reported for ``model``.
+
+        Args:
+            model: Model that was loaded.
+            seconds: Load time reported by Ollama.
+            request: Whether a request waited for the load; only those count
+                as cold starts. Warm-up and ping loads pass False.
+        """
+        self._last_load[model] = seconds
+        metrics.LLM_LOAD_SECONDS.observe(seconds, model=model)
+        if request and seconds >= COLD_LOAD_SECONDS:
+            self.cold_loads += 1
+            metrics.LLM_COLD_LOADS.inc(model=model)
+            logger.warning(f"Cold start: loading {model} took {seconds:.2f}s")
+
+    async def load(self, model: str) -> float:
+        """
+        Load ``model`` with an empty chat request, which Ollama answers
+        without generating anything.
+
+        Returns:
+            float: Seconds Ollama spent loading; near zero if it was resident.
+        """
+        started = time.perf_counter()
+        response = await self.client.chat(
+            model=model, messages=[], options=self.options, keep_alive=self.keep_alive
+        )
+        # Older Ollama versions omit load_duration on load-only requests
+        seconds = (response.load_duration or 0) / 1e9 or (time.perf_counter() - started)
+        self.touch(model)
+        self.observe_load(model, seconds, request=False)
+        return seconds
+
+    async def warm_up(self) -> dict[str, float]:
+        """
+        Load every model before traffic arrives.
+
+        Failures are logged rather than raised so a server still starts while
+        Ollama is down; the health check reports that case.
+
+        Returns:
+            dict[str, float]: Load seconds of each model that loaded.
+        """
+        loaded = {}
+        for model in self.models:
+            try:
+                loaded[model] = await self.load(model)
+            except Exception as e:
+                logger.warning(f"Could not warm up {model}: {e}")
+                continue
+            logger.info(f"Warmed up {model} in {loaded[model]:.2f}s")
+        return loaded
+
+    def start(self) -> None:
+        """Start pinging idle models in the background, if enabled."""
+        if self.keep_warm_interval <= 0 or not self.models:
+            return
+        if self._pinger is None or self._pinger.done():
+            self._pinger = asyncio.create_task(self._keep_warm_forever())
+
+    async def stop(self) -> None:
+        """Stop the background pings."""
+        if self._pinger is not None:
+            self._pinger.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._pinger
+            self._pinger = None
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "keep_alive": self.keep_alive,
+            "cold_loads": self.cold_loads,
+            "pings": self.pings,
+            "models": {
+                model: {
+                    "idle_seconds": (
+                        round(now - self._last_used[model], 3)
+                        if model in self._last_used
+                        else None
+                    ),
+                    "last_load_ms": (
+                        round(self._last_load[model] * 1000, 3)
+                        if model in self._last_load
+                        else None
+                    ),
+                }
+                for model in self.models
+            },
+        }
+
+    def _idle_models(self) -> list[str]:
+        now = time.monotonic()
+        return [
+            model
+            for model in self.models
+            if now - self._last_used.get(model, 0.0) >= self.keep_warm_interval
+        ]
+
+    def _next_ping_delay(self) -> float:
+        now = time.monotonic()
+        due = min(
+            self._last_used.get(model, 0.0) + self.keep_warm_interval
+            for model in self.models
+        )
+        return max(MIN_PING_DELAY, due - now)
+
+    async def _keep_warm_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self._next_ping_delay())
+            for model in self._idle_models():
+                try:
+                    seconds = await self.load(model)
+                except Exception as e:
+                    # Retried after another interval; the model was not used
+                    self.touch(model)
+                    logger.warning(f"Keep-warm ping for {model} failed: {e}")
+                else:
+                    self.pings += 1
+                    if seconds >= COLD_LOAD_SECONDS:
+                        logger.info(
+                            f"Keep-warm ping reloaded {model} in {seconds:.2f}s"
+                        )
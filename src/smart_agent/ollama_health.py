@@ -1,15 +1,24 @@
 """Ollama health check utilities."""
 
+import asyncio
 import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
 
 import httpx
 
 from ollama import AsyncClient, Client
 
+from . import metrics
+from .config import DEFAULT_MODEL
+
 logger = logging.getLogger(__name__)
 
-DEFAULT_MODEL = "llama3.1:8b"
 OLLAMA_BASE_URL = "http://localhost:11434"
+DEFAULT_HEALTH_TTL = 30.0
+# Failures are re-checked this soon so requests recover when Ollama returns
+DEFAULT_NEGATIVE_TTL = 1.0
 
 
 class OllamaHealthError(Exception):
@@ -86,11 +95,12 @@ def get_available_models() -> list[str]:
         return []
 
 
-def validate_ollama_setup(model_name: str = DEFAULT_MODEL) -> None:
-    """Validate that Ollama is running and the required model is available.
+def validate_ollama_setup(model_name: str = DEFAULT_MODEL, *extra_models: str) -> None:
+    """Validate that Ollama is running and the required models are available.
 
     Args:
         model_name: Name of the model to check (default: llama3.1:8b)
+        extra_models: Further models that must be available too
 
     Raises:
         OllamaHealthError: If Ollama service is not running or model is not available
@@ -105,67 +115,247 @@ def validate_ollama_setup(model_name: str = DEFAULT_MODEL) -> None:
             "  3. Verify service: 'curl http://localhost:11434/api/version'"
         )
 
-    # Check if the required model is available
-    if not check_model_availability(model_name):
-        available_models = get_available_models()
-        error_msg = (
-            f"Required model '{model_name}' is not available in Ollama.\n"
-            "Please pull the model first:\n"
-            f"  ollama pull {model_name}\n"
-        )
-
-        if available_models:
-            error_msg += f"\nAvailable models: {', '.join(available_models)}"
-        else:
-            error_msg += (
-                "\nNo models are currently available. Please pull at least one model."
+    # Check if the required models are available
+    for model in (model_name, *extra_models):
+        if not check_model_availability(model):
+            available_models = get_available_models()
+            error_msg = (
+                f"Required model '{model}' is not available in Ollama.\n"
+                "Please pull the model first:\n"
+                f"  ollama pull {model}\n"
             )
 
-        raise OllamaHealthError(error_msg)
+            if available_models:
+                error_msg += f"\nAvailable models: {', '.join(available_models)}"
+            else:
+                error_msg += (
+                    "\nNo models are currently available. "
+                    "Please pull at least one model."
+                )
 
-    logger.info(
-        f"Ollama health check passed - service running, model '{model_name}' available"
-    )
+            raise OllamaHealthError(error_msg)
+
+        logger.info(
+            f"Ollama health check passed - service running, "
+            f"model '{model}' available"
+        )
 
 
-async def validate_ollama_setup_async(model_name: str = DEFAULT_MODEL) -> None:
+async def validate_ollama_setup_async(
+    model_name: str = DEFAULT_MODEL, *extra_models: str
+) -> None:
     """Async version of validate_ollama_setup.
 
+    Served from the shared ``OllamaHealthMonitor`` cache, so repeated calls
+    within the TTL cost no network round-trip.
+
     Args:
         model_name: Name of the model to check (default: llama3.1:8b)
+        extra_models: Further models that must be available too
 
     Raises:
-        OllamaHealthError: If Ollama service is not running or model is not available
+        OllamaHealthError: If Ollama service is not running or a model is not
+            available
     """
-    # Check if Ollama service is running
-    if not check_ollama_service():
-        raise OllamaHealthError(
-            f"Ollama service is not running or not accessible at {OLLAMA_BASE_URL}.\n"
-            "Please ensure Ollama is installed and running:\n"
-            "  1. Install Ollama: https://ollama.ai/\n"
-            "  2. Start Ollama service: 'ollama serve'\n"
-            "  3. Or use Docker with pre-built model: 'docker run -d -p 11434:11434 ollama/ollama:latest'\n"
-            "  4. Verify service: 'curl http://localhost:11434/api/version'"
-        )
+    await get_health_monitor().ensure_healthy(model_name, *extra_models)
 
-    # Check if the required model is available
-    if not await check_model_availability_async(model_name):
-        available_models = get_available_models()
-        error_msg = (
-            f"Required model '{model_name}' is not available in Ollama.\n"
-            "Please pull the model first:\n"
-            f"  ollama pull {model_name}\n"
-        )
 
-        if available_models:
-            error_msg += f"\nAvailable models: {', '.join(available_models)}"
-        else:
-            error_msg += (
-                "\nNo models are currently available. Please pull at least one model."
+@dataclass(frozen=True)
+class HealthStatus:
+    """Result of a single Ollama probe.
+
+    Attributes:
+        service_running: Whether ``/api/tags`` answered successfully
+        available_models: Models reported by the service
+        checked_at: ``time.monotonic()`` timestamp of the probe
+        latency_ms: Round-trip time of the probe
+    """
+
+    service_running: bool
+    available_models: tuple[str, ...] = field(default_factory=tuple)
+    checked_at: float = 0.0
+    latency_ms: float = 0.0
+
+    def age(self) -> float:
+        return time.monotonic() - self.checked_at
+
+    def error_for(self, model_name: str) -> str | None:
+        """Return the user-facing error for ``model_name``, or None if healthy."""
+        if not self.service_running:
+            return _service_error_message()
+        if model_name not in self.available_models:
+            return _model_error_message(model_name, list(self.available_models))
+        return None
+
+
+class OllamaHealthMonitor:
+    """Non-blocking, cached Ollama health checks.
+
+    A probe is a single ``GET /api/tags`` that answers both "is the service up"
+    and "which models are pulled". Results are cached for ``ttl`` seconds,
+    concurrent callers share one in-flight probe, and ``start()`` keeps the
+    cache warm from a background task so request paths never wait on it.
+    Failures are only trusted for ``negative_ttl`` seconds, so requests are
+    served again soon after Ollama comes back or a missing model is pulled.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_HEALTH_TTL,
+        timeout: float = 5.0,
+        base_url: str = OLLAMA_BASE_URL,
+        transport: httpx.AsyncBaseTransport | None = None,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = min(ttl, negative_ttl)
+        self.timeout = timeout
+        self.base_url = base_url
+        self.transport = transport
+        self._status: HealthStatus | None = None
+        self._inflight: asyncio.Task[HealthStatus] | None = None
+        self._refresher: asyncio.Task[None] | None = None
+
+    @property
+    def cached(self) -> HealthStatus | None:
+        """Last probe result, regardless of age."""
+        return self._status
+
+    async def status(self) -> HealthStatus:
+        """Return a status no older than ``ttl``, probing at most once at a time."""
+        status = self._status
+        if status is not None and status.age() < self._ttl_for(status):
+            return status
+        return await self.refresh()
+
+    async def refresh(self) -> HealthStatus:
+        """Probe now, joining a probe that is already in flight."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._probe())
+        # Shield so one cancelled caller does not cancel the shared probe
+        return await asyncio.shield(self._inflight)
+
+    async def ensure_healthy(
+        self, model_name: str = DEFAULT_MODEL, *extra_models: str
+    ) -> None:
+        """Raise OllamaHealthError unless the service is up and has every model."""
+        models = (model_name, *extra_models)
+        status = await self.status()
+        error = _first_error(status, models)
+        if error and status.age() >= self.negative_ttl:
+            # A missing model may have been pulled since; look again first
+            status = await self.refresh()
+            error = _first_error(status, models)
+        if error:
+            raise OllamaHealthError(error)
+        logger.debug(f"Ollama healthy, models {', '.join(models)} available")
+
+    def start(self, interval: float | None = None) -> None:
+        """Refresh in the background every ``interval`` seconds (default: ttl)."""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(
+                self._refresh_forever(interval or self.ttl)
             )
 
-        raise OllamaHealthError(error_msg)
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._refresher
+            self._refresher = None
+
+    async def _refresh_forever(self, interval: float) -> None:
+        while True:
+            previous = self._status
+            status = await self.refresh()
+            if previous is not None and previous.service_running != (
+                status.service_running
+            ):
+                state = "reachable" if status.service_running else "unreachable"
+                logger.warning(f"Ollama service became {state}")
+            await asyncio.sleep(
+                interval if status.service_running else self.negative_ttl
+            )
+
+    def _ttl_for(self, status: HealthStatus) -> float:
+        return self.ttl if status.service_running else self.negative_ttl
+
+    async def _probe(self) -> HealthStatus:
+        start = time.perf_counter()
+        try:
+            async with httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, transport=self.transport
+            ) as client:
+                response = await client.get("/api/tags")
+            running = response.status_code == 200
+            models = (
+                tuple(
+                    m["model"]
+                    for m in response.json().get("models", [])
+                    if m.get("model") is not None
+                )
+                if running
+                else ()
+            )
+        except (httpx.RequestError, httpx.TimeoutException, ValueError):
+            running, models = False, ()
+        elapsed = time.perf_counter() - start
+        metrics.HEALTH_CHECK_SECONDS.observe(
+            elapsed, result="up" if running else "down"
+        )
+        status = HealthStatus(
+            service_running=running,
+            available_models=models,
+            checked_at=time.monotonic(),
+            latency_ms=elapsed * 1000,
+        )
+        self._status = status
+        return status
+
 
-    logger.info(
-        f"Ollama health check passed - service running, model '{model_name}' available"
+def _first_error(status: HealthStatus, model_names: tuple[str, ...]) -> str | None:
+    for model_name in model_names:
+        error = status.error_for(model_name)
+        if error:
+            return error
+    return None
+
+
+_monitor: OllamaHealthMonitor | None = None
+
+
+def get_health_monitor() -> OllamaHealthMonitor:
+    """Return the process-wide health monitor."""
+    global _monitor
+    if _monitor is None:
+        from .config import Settings
+
+        _monitor = OllamaHealthMonitor(ttl=Settings.from_env().health_interval)
+    return _monitor
+
+
+def _service_error_message() -> str:
+    return (
+        f"Ollama service is not running or not accessible at {OLLAMA_BASE_URL}.\n"
+        "Please ensure Ollama is installed and running:\n"
+        "  1. Install Ollama: https://ollama.ai/\n"
+        "  2. Start Ollama service: 'ollama serve'\n"
+        "  3. Or use Docker with pre-built model: 'docker run -d -p 11434:11434 ollama/ollama:latest'\n"
+        "  4. Verify service: 'curl http://localhost:11434/api/version'"
     )
+
+
+def _model_error_message(model_name: str, available_models: list[str]) -> str:
+    error_msg = (
+        f"Required model '{model_name}' is not available in Ollama.\n"
+        "Please pull the model first:\n"
+        f"  ollama pull {model_name}\n"
+    )
+    if available_models:
+        error_msg += f"\nAvailable models: {', '.join(available_models)}"
+    else:
+        error_msg += (
+            "\nNo models are currently available. Please pull at least one model."
+        )
+    return error_msg
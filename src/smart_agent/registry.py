@@ -1,30 +1,69 @@
+"""
+Tool plugin registry.
+
+Tools are discovered through the ``smart_agent.tools`` entry point group.
+Listing the registered names only reads package metadata; a plugin module is
+imported the first time its tool is requested, so commands that do not use a
+tool never pay for its imports.
+"""
+
 import logging
-from importlib.metadata import entry_points
+from importlib.metadata import EntryPoint, entry_points
+from typing import TYPE_CHECKING
 
-from smart_agent.tools.base_tool import BaseTool
+if TYPE_CHECKING:
+    from smart_agent.tools.base_tool import BaseTool
 
 logger = logging.getLogger(__name__)
 
-_TOOLS_CACHE: list[BaseTool] | None = None
+ENTRY_POINT_GROUP = "smart_agent.tools"
 
+_ENTRY_POINTS: dict[str, EntryPoint] | None = None
+_LOADED: dict[str, "BaseTool"] = {}
+_TOOLS_CACHE: "list[BaseTool] | None" = None
+
+
+def _entry_points() -> dict[str, EntryPoint]:
+    global _ENTRY_POINTS
+    if _ENTRY_POINTS is None:
+        _ENTRY_POINTS = {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+    return _ENTRY_POINTS
 
-def load_tools() -> list[BaseTool]:
-    """Load all registered tools from entry points."""
-    global _TOOLS_CACHE
-    if _TOOLS_CACHE is not None:
-        return _TOOLS_CACHE
 
-    eps = entry_points()
-    selected_eps = eps.select(group="smart_agent.tools")
-    tool_instances: list[BaseTool] = []
+def tool_names() -> list[str]:
+    """Entry point names of the registered tools, without importing them."""
+    return list(_entry_points())
 
-    for ep in selected_eps:
-        tool_class = ep.load()
-        tool_instances.append(tool_class())
 
-    # Log loaded tools (now occurs after CLI logging setup)
-    for tool in tool_instances:
+def load_tool(name: str) -> "BaseTool":
+    """
+    Load the tool registered under entry point ``name`` on first use.
+
+    Raises:
+        KeyError: If no tool is registered under ``name``.
+    """
+    tool = _LOADED.get(name)
+    if tool is None:
+        tool_class = _entry_points()[name].load()
+        tool = tool_class()
+        _LOADED[name] = tool
+        # Log loaded tools (now occurs after CLI logging setup)
         logger.debug(f"Loaded tool: {tool.get_name()}")
+    return tool
+
+
+def load_tools() -> "list[BaseTool]":
+    """Load all registered tools from entry points."""
+    global _TOOLS_CACHE
+    if _TOOLS_CACHE is None:
+        _TOOLS_CACHE = [load_tool(name) for name in tool_names()]
+    return _TOOLS_CACHE
+
 
-    _TOOLS_CACHE = tool_instances
-    return tool_instances
+def reload_tools() -> "list[BaseTool]":
+    """Drop the cached tool instances and load all entry points again."""
+    global _ENTRY_POINTS, _TOOLS_CACHE
+    _ENTRY_POINTS = None
+    _TOOLS_CACHE = None
+    _LOADED.clear()
+    return load_tools()
@@ -1,7 +1,23 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from typing import Any
 
 
+@dataclass
+class Stage:
+    """
+    Timing of one part of producing a response.
+
+    Attributes:
+        name (str): ``queue``, ``cache``, ``health``, ``llm`` or ``tool``.
+        duration_ms (float): Wall time of the stage in milliseconds.
+        meta (dict): Stage details, e.g. token counts of a model call.
+    """
+
+    name: str
+    duration_ms: float
+    meta: dict[str, Any] = field(default_factory=dict)
+
+
 @dataclass
 class AgentResponse:
     """
@@ -12,9 +28,20 @@ class AgentResponse:
         tool_name (str): The name of the tool used to generate the response.
         meta (dict): Additional metadata about the response.
         duration_ms (int): The duration of the response in milliseconds.
+        stages (list[Stage]): Where the time went, in order.
     """
 
     content: str
     tool_name: str
     meta: dict[str, Any]
     duration_ms: int
+    stages: list[Stage] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert the response to JSON-serializable data.
+
+        Returns:
+            dict: All fields, with stages as plain dicts.
+        """
+        return asdict(self)
@@ -0,0 +1,82 @@
+"""
+Per-stage model choice for the agent loop.
+
+A query goes through up to three kinds of model rounds:
+
+* ``route``: the first round, which sees the tool schemas and decides
+  whether and which tools to call. A small model is usually good enough.
+* ``synthesis``: the rounds after tool results arrive, which write the answer
+  (and may call further tools).
+* ``direct``: the answer to a query that needs no tools. When it differs
+  from the route model, the routing round's text is discarded and the direct
+  model is asked again without tool schemas.
+
+All three default to the main ``model`` setting, which keeps the single-model
+behaviour and costs no extra round.
+"""
+
+from dataclasses import asdict, dataclass
+
+from .cache import stable_hash
+from .config import DEFAULT_MODEL, Settings
+
+STAGES = ("route", "synthesis", "direct")
+
+
+@dataclass(frozen=True)
+class ModelRouter:
+    """
+    Models used for each stage of a query.
+
+    Attributes:
+        route (str): Model of the tool-choice round.
+        synthesis (str): Model that answers from tool results.
+        direct (str): Model that answers when no tool is needed.
+    """
+
+    route: str = DEFAULT_MODEL
+    synthesis: str = DEFAULT_MODEL
+    direct: str = DEFAULT_MODEL
+
+    @classmethod
+    def single(cls, model: str) -> "ModelRouter":
+        """Use ``model`` for every stage."""
+        return cls(model, model, model)
+
+    @classmethod
+    def from_settings(cls, settings: Settings | None = None) -> "ModelRouter":
+        """Per-stage models from settings, falling back to ``settings.model``."""
+        settings = settings or Settings.from_env()
+        return cls(
+            route=settings.route_model or settings.model,
+            synthesis=settings.synthesis_model or settings.model,
+            direct=settings.direct_model or settings.model,
+        )
+
+    @property
+    def models(self) -> list[str]:
+        """Distinct models in stage order; the set to load and health-check."""
+        return list(dict.fromkeys((self.route, self.synthesis, self.direct)))
+
+    @property
+    def reroutes_direct(self) -> bool:
+        """Whether a tool-free answer is re-asked from a different model."""
+        return self.direct != self.route
+
+    @property
+    def key(self) -> str:
+        """Identifies the assignment; the model name when all stages share one."""
+        models = self.models
+        return models[0] if len(models) == 1 else stable_hash(self.to_dict())
+
+    def model_for(self, stage: str) -> str:
+        """
+        Raises:
+            ValueError: If ``stage`` is not one of ``STAGES``.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage!r}; expected one of {STAGES}")
+        return str(getattr(self, stage))
+
+    def to_dict(self) -> dict[str, str]:
+        return asdict(self)
@@ -2,18 +2,34 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any
 
+from .result_cache import ToolResultCache, cached_run
+
 
 @dataclass
 class ToolResult:
-    data: str
+    data: Any
     meta: dict[str, Any]
 
 
 class BaseTool(ABC):
     """
     Abstract base class for tools that can be used by the agent.
+
+    ``run`` implementations are memoized automatically: calls whose file
+    arguments are unchanged since the last call return the cached ToolResult.
+    Set ``cache_results = False`` on tools whose output is not a pure
+    function of their files, or ``result_cache`` to use a dedicated cache.
     """
 
+    cache_results: bool = True
+    result_cache: ToolResultCache | None = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        run = cls.__dict__.get("run")
+        if run is not None and not getattr(run, "__isabstractmethod__", False):
+            cls.run = cached_run(run)  # type: ignore[method-assign,assignment]
+
     @abstractmethod
     async def run(self, *args, **kwargs) -> ToolResult:
         """
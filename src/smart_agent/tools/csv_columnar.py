@@ -0,0 +1,207 @@
+"""
+Columnar CSV backend: typed NumPy columns with vectorized per-column profiling.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+HISTOGRAM_BINS = 10
+TOP_K = 5
+
+
+@dataclass
+class ColumnarTable:
+    """
+    A CSV file held as one typed NumPy array per column.
+
+    Attributes:
+        columns (dict): Column name to array; numeric columns are int64/float64,
+            boolean columns are bool and everything else is an object array.
+        row_count (int): Number of data rows read.
+        preview (list): The first rows of the file as dicts.
+    """
+
+    columns: dict[str, np.ndarray]
+    row_count: int
+    preview: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.columns.values())
+
+
+def read_columnar(
+    file_path: str, chunk_size: int = 100_000, preview_rows: int = 20
+) -> ColumnarTable:
+    """
+    Read a CSV file chunk by chunk into typed columns.
+
+    Pandas infers a dtype per chunk; chunks are concatenated per column so a
+    column that is integer in one chunk and float in the next is upcast once.
+    Ragged rows are kept like the other CSV engines do: short rows are padded
+    with nulls and cells beyond the header are dropped.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunk_size (int): Rows parsed per chunk.
+        preview_rows (int): Number of leading rows kept as dicts.
+
+    Returns:
+        ColumnarTable: The typed columns, row count and preview.
+    """
+    parts: dict[str, list[pd.Series]] = {}
+    preview: list[dict[str, Any]] = []
+    row_count = 0
+
+    header = pd.read_csv(file_path, nrows=0)
+    # usecols truncates long rows; index_col=False stops pandas from turning
+    # the first column into the index when every row has one extra cell
+    reader = pd.read_csv(
+        file_path,
+        chunksize=chunk_size,
+        index_col=False,
+        usecols=range(len(header.columns)),
+    )
+    with reader:
+        for chunk in reader:
+            if not parts:
+                parts = {str(name): [] for name in chunk.columns}
+            if len(preview) < preview_rows:
+                head = chunk.head(preview_rows - len(preview))
+                preview.extend(
+                    head.astype(object).where(head.notna(), None).to_dict("records")
+                )
+            for name in chunk.columns:
+                parts[str(name)].append(chunk[name])
+            row_count += len(chunk)
+
+    if not parts:
+        # Header-only file: pandas yields no chunks
+        parts = {str(name): [] for name in header.columns}
+
+    columns = {
+        name: _to_array(pd.concat(series, ignore_index=True) if series else None)
+        for name, series in parts.items()
+    }
+    return ColumnarTable(columns=columns, row_count=row_count, preview=preview)
+
+
+def profile_columns(table: ColumnarTable) -> dict[str, dict[str, Any]]:
+    """
+    Compute vectorized summaries for every column of a table.
+
+    Returns:
+        dict: Column name to a summary with dtype, count, nulls, distinct,
+            min/max and, depending on dtype, quantiles, histogram and top-k.
+    """
+    return {name: profile_array(array) for name, array in table.columns.items()}
+
+
+def profile_array(array: np.ndarray) -> dict[str, Any]:
+    if array.dtype.kind in "iuf":
+        return _profile_numeric(array)
+    if array.dtype.kind == "b":
+        return _profile_bool(array)
+    return _profile_object(array)
+
+
+def _to_array(series: pd.Series | None) -> np.ndarray:
+    if series is None:
+        return np.empty(0, dtype=object)
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=bool)
+    if pd.api.types.is_integer_dtype(series):
+        return series.to_numpy(dtype=np.int64)
+    if pd.api.types.is_float_dtype(series):
+        return series.to_numpy(dtype=np.float64)
+    return series.to_numpy(dtype=object, na_value=None)
+
+
+def _profile_numeric(array: np.ndarray) -> dict[str, Any]:
+    total = len(array)
+    values = array[~np.isnan(array)] if array.dtype.kind == "f" else array
+    summary: dict[str, Any] = {
+        "dtype": "int" if array.dtype.kind in "iu" else "float",
+        "count": int(len(values)),
+        "nulls": int(total - len(values)),
+    }
+    if len(values) == 0:
+        summary.update(min=None, max=None, distinct=0)
+        return summary
+
+    uniques, counts = np.unique(values, return_counts=True)
+    finite = values[np.isfinite(values)] if values.dtype.kind == "f" else values
+    quantiles = np.quantile(finite, QUANTILES) if len(finite) else []
+    hist_counts: Any = []
+    edges: Any = []
+    if len(finite):
+        hist_counts, edges = np.histogram(finite, bins=HISTOGRAM_BINS)
+    summary.update(
+        min=values.min().item(),
+        max=values.max().item(),
+        mean=float(finite.mean()) if len(finite) else None,
+        std=float(finite.std()) if len(finite) else None,
+        distinct=int(len(uniques)),
+        quantiles={
+            f"p{round(q * 100)}": float(v)
+            for q, v in zip(QUANTILES, quantiles, strict=False)
+        },
+        histogram={
+            "edges": [float(e) for e in edges],
+            "counts": [int(c) for c in hist_counts],
+        },
+        top_k=_top_k(uniques, counts),
+    )
+    return summary
+
+
+def _profile_bool(array: np.ndarray) -> dict[str, Any]:
+    trues = int(np.count_nonzero(array))
+    return {
+        "dtype": "bool",
+        "count": int(len(array)),
+        "nulls": 0,
+        "min": bool(array.min()) if len(array) else None,
+        "max": bool(array.max()) if len(array) else None,
+        "distinct": int(len(np.unique(array))),
+        "top_k": [[True, trues], [False, int(len(array) - trues)]],
+    }
+
+
+def _profile_object(array: np.ndarray) -> dict[str, Any]:
+    series = pd.Series(array, dtype=object)
+    present = series.dropna().astype(str)
+    summary: dict[str, Any] = {
+        "dtype": "string" if len(present) else "empty",
+        "count": int(len(present)),
+        "nulls": int(len(series) - len(present)),
+    }
+    if len(present) == 0:
+        summary.update(min=None, max=None, distinct=0)
+        return summary
+
+    value_counts = present.value_counts()
+    lengths = present.str.len().to_numpy()
+    summary.update(
+        min=present.min(),
+        max=present.max(),
+        distinct=int(len(value_counts)),
+        length={
+            "min": int(lengths.min()),
+            "max": int(lengths.max()),
+            "mean": float(lengths.mean()),
+        },
+        top_k=[
+            [value, int(count)] for value, count in value_counts.head(TOP_K).items()
+        ],
+    )
+    return summary
+
+
+def _top_k(uniques: np.ndarray, counts: np.ndarray) -> list[list[Any]]:
+    order = np.argsort(counts, kind="stable")[::-1][:TOP_K]
+    return [[uniques[i].item(), int(counts[i])] for i in order]
@@ -0,0 +1,138 @@
+"""
+Incremental column statistics for CSV files that are too large to materialize.
+"""
+
+import hashlib
+import heapq
+from typing import Any
+
+NULL_TOKENS = frozenset({"", "na", "n/a", "nan", "null", "none"})
+BOOL_TOKENS = frozenset({"true", "false"})
+
+# dtype widening order: a column only ever moves to the right
+_DTYPE_ORDER = ("empty", "bool", "int", "float", "string")
+
+
+class DistinctEstimator:
+    """
+    K-minimum-values sketch for estimating the number of distinct values.
+
+    Counts are exact until more than ``k`` distinct hashes have been seen,
+    after which memory stays at ``k`` entries regardless of input size.
+    Values are hashed with BLAKE2b rather than ``hash``, which is salted per
+    process for strings, so an estimate is the same on every run.
+    """
+
+    _HASH_SPACE = 1 << 64
+
+    def __init__(self, k: int = 1024):
+        self.k = k
+        self._heap: list[int] = []  # negated hashes, so heap[0] is the largest kept
+        self._members: set[int] = set()
+
+    def add(self, value: str) -> None:
+        h = int.from_bytes(
+            hashlib.blake2b(value.encode(), digest_size=8).digest(), "big"
+        )
+        if h in self._members:
+            return
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            evicted = -heapq.heapreplace(self._heap, -h)
+            self._members.discard(evicted)
+            self._members.add(h)
+
+    def estimate(self) -> int:
+        if len(self._heap) < self.k:
+            return len(self._heap)
+        kth = -self._heap[0]
+        return int((self.k - 1) * self._HASH_SPACE / (kth + 1))
+
+    @property
+    def exact(self) -> bool:
+        return len(self._heap) < self.k
+
+
+class ColumnStats:
+    """
+    Running statistics for a single CSV column, updated one chunk at a time.
+    """
+
+    def __init__(self, name: str, distinct_k: int = 1024):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.dtype = "empty"
+        self._num_min: float | None = None
+        self._num_max: float | None = None
+        self._str_min: str | None = None
+        self._str_max: str | None = None
+        self._distinct = DistinctEstimator(distinct_k)
+
+    def update(self, values: tuple[str, ...] | list[str]) -> None:
+        """
+        Fold a chunk of raw string values into the running statistics.
+
+        Args:
+            values: Raw cell values for this column from one chunk of rows.
+        """
+        rank = _DTYPE_ORDER.index(self.dtype)
+        for value in values:
+            if value.strip().lower() in NULL_TOKENS:
+                self.nulls += 1
+                continue
+            self.count += 1
+            self._distinct.add(value)
+
+            if self._str_min is None or value < self._str_min:
+                self._str_min = value
+            if self._str_max is None or value > self._str_max:
+                self._str_max = value
+
+            if rank == 4:
+                continue
+            kind, number = _classify(value)
+            kind_rank = _DTYPE_ORDER.index(kind)
+            if (kind == "bool") != (rank == 1) and rank > 0:
+                # booleans mixed with numbers have no common numeric type
+                rank = 4
+            elif kind_rank > rank:
+                rank = kind_rank
+            if number is not None and rank < 4:
+                if self._num_min is None or number < self._num_min:
+                    self._num_min = number
+                if self._num_max is None or number > self._num_max:
+                    self._num_max = number
+        self.dtype = _DTYPE_ORDER[rank]
+
+    def to_dict(self) -> dict[str, Any]:
+        numeric = self.dtype in ("int", "float")
+        minimum: Any = self._num_min if numeric else self._str_min
+        maximum: Any = self._num_max if numeric else self._str_max
+        if self.dtype == "int" and minimum is not None:
+            minimum, maximum = int(minimum), int(maximum)
+        return {
+            "dtype": self.dtype,
+            "count": self.count,
+            "nulls": self.nulls,
+            "min": minimum,
+            "max": maximum,
+            "distinct": self._distinct.estimate(),
+            "distinct_exact": self._distinct.exact,
+        }
+
+
+def _classify(value: str) -> tuple[str, float | None]:
+    """Infer the narrowest dtype for a single non-null cell."""
+    if value.strip().lower() in BOOL_TOKENS:
+        return "bool", None
+    try:
+        return "int", int(value)
+    except ValueError:
+        pass
+    try:
+        return "float", float(value)
+    except ValueError:
+        return "string", None
@@ -4,16 +4,77 @@ CSV Tool for retrieving CSV data from a file and metadata about it, such as row
 
 import asyncio
 import csv
+import importlib.util
 import logging
 import os
+from itertools import islice
 from typing import Any
 
 from .base_tool import BaseTool, ToolResult
+from .csv_stats import ColumnStats
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_PREVIEW_ROWS = 20
+DEFAULT_STREAM_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+ENGINES = ("auto", "rows", "stream", "columnar")
+
 
 class CsvTool(BaseTool):
+    def __init__(
+        self,
+        engine: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        preview_rows: int = DEFAULT_PREVIEW_ROWS,
+        stream_threshold_bytes: int = DEFAULT_STREAM_THRESHOLD_BYTES,
+        columnar_max_bytes: int | None = None,
+    ):
+        """
+        Args:
+            engine (str | None): One of ``ENGINES``; None reads
+                ``SMART_AGENT_CSV_ENGINE`` (default ``"auto"``). ``"rows"`` returns every row as a
+                dict, ``"stream"`` profiles the file in constant memory and
+                ``"columnar"`` loads typed NumPy columns for vectorized statistics.
+                ``"auto"`` uses rows below ``stream_threshold_bytes``, columnar up
+                to ``columnar_max_bytes`` when pandas is installed and streaming
+                beyond that. Every engine pads short rows, drops extra cells
+                and skips blank lines.
+            chunk_size (int): Number of rows parsed at a time.
+            preview_rows (int): Number of rows returned as a preview when the
+                file is not fully materialized.
+            stream_threshold_bytes (int): File size above which rows are no
+                longer materialized.
+            columnar_max_bytes (int | None): Largest file ``"auto"`` loads
+                columnar; peak memory grows to several times the file size, so
+                larger files are streamed in constant memory. None reads
+                ``SMART_AGENT_CSV_COLUMNAR_MAX_BYTES``.
+        """
+        if engine is None or columnar_max_bytes is None:
+            from smart_agent.config import Settings
+
+            settings = Settings.from_env()
+            if engine is None:
+                engine = settings.csv_engine
+                if engine not in ENGINES:
+                    logger.warning(
+                        f"Ignoring SMART_AGENT_CSV_ENGINE={engine!r}: "
+                        f"expected one of {ENGINES}"
+                    )
+                    engine = "auto"
+            if columnar_max_bytes is None:
+                columnar_max_bytes = settings.csv_columnar_max_bytes
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown CSV engine '{engine}', expected one of {ENGINES}"
+            )
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.preview_rows = preview_rows
+        self.stream_threshold_bytes = stream_threshold_bytes
+        self.columnar_max_bytes = columnar_max_bytes
+
     async def run(self, file_path: str) -> ToolResult:
         """
         Run the CSV tool with the given arguments and return a ToolResult.
@@ -21,7 +82,17 @@ class CsvTool(BaseTool):
         logger.debug(f"Reading CSV file: {file_path}")
         loop = asyncio.get_running_loop()
         try:
-            data, columns = await loop.run_in_executor(None, self._read_csv, file_path)
+            path = self._resolve_path(file_path)
+            engine = await loop.run_in_executor(None, self._select_engine, path)
+            if engine == "stream":
+                return await loop.run_in_executor(
+                    None, self._stream_result, path, file_path
+                )
+            if engine == "columnar":
+                return await loop.run_in_executor(
+                    None, self._columnar_result, path, file_path
+                )
+            data, columns = await loop.run_in_executor(None, self._read_csv, path)
             logger.info(
                 f"Successfully read CSV file: {file_path} with {len(data)} rows"
             )
@@ -36,13 +107,121 @@ class CsvTool(BaseTool):
             meta={"columns": columns, "row_count": len(data), "file_path": file_path},
         )
 
-    def _read_csv(self, file_path: str):
+    def _resolve_path(self, file_path: str) -> str:
         if file_path[0] == "~":
-            file_path = os.path.expanduser(file_path)
-        with open(file_path) as f:
-            reader = csv.DictReader(f)
-            data = list(reader)
-            return data, reader.fieldnames
+            return os.path.expanduser(file_path)
+        return file_path
+
+    def _select_engine(self, file_path: str) -> str:
+        size = os.path.getsize(file_path)
+        if self.engine != "auto":
+            return self.engine
+        if size <= self.stream_threshold_bytes:
+            return "rows"
+        if size <= self.columnar_max_bytes and _pandas_available():
+            return "columnar"
+        return "stream"
+
+    def _read_csv(self, file_path: str):
+        file_path = self._resolve_path(file_path)
+        with open(file_path, newline="") as f:
+            reader = csv.reader(f)
+            columns = next(reader, None)
+            if columns is None:
+                return [], None
+            width = len(columns)
+            data = [
+                dict(zip(columns, _fit_row(row, width), strict=True))
+                for row in reader
+                if row
+            ]
+            return data, columns
+
+    def _stream_result(self, file_path: str, display_path: str) -> ToolResult:
+        preview, columns, row_count, stats = self._profile_csv(file_path)
+        logger.info(
+            f"Successfully streamed CSV file: {display_path} with {row_count} rows"
+        )
+        return ToolResult(
+            data=preview,
+            meta={
+                "columns": columns,
+                "row_count": row_count,
+                "file_path": display_path,
+                "mode": "stream",
+                "preview_rows": len(preview),
+                "stats": stats,
+            },
+        )
+
+    def _columnar_result(self, file_path: str, display_path: str) -> ToolResult:
+        from .csv_columnar import profile_columns, read_columnar
+
+        table = read_columnar(
+            file_path, chunk_size=self.chunk_size, preview_rows=self.preview_rows
+        )
+        logger.info(
+            f"Successfully loaded CSV file: {display_path} with {table.row_count} rows "
+            f"({table.nbytes} bytes columnar)"
+        )
+        return ToolResult(
+            data=table.preview,
+            meta={
+                "columns": list(table.columns),
+                "row_count": table.row_count,
+                "file_path": display_path,
+                "mode": "columnar",
+                "preview_rows": len(table.preview),
+                "stats": profile_columns(table),
+            },
+        )
+
+    def _profile_csv(
+        self, file_path: str
+    ) -> tuple[list[dict[str, str]], list[str], int, dict[str, dict[str, Any]]]:
+        """
+        Read a CSV file in fixed-size chunks without keeping the rows around.
+
+        Only ``preview_rows`` rows and one ``ColumnStats`` per column are held in
+        memory, so peak usage is bounded by ``chunk_size`` instead of file size.
+
+        Args:
+            file_path (str): Path to the CSV file.
+
+        Returns:
+            tuple: (preview rows as dicts, column names, row count, column stats).
+        """
+        file_path = self._resolve_path(file_path)
+        with open(file_path, newline="") as f:
+            reader = csv.reader(f)
+            columns = next(reader, [])
+            width = len(columns)
+            stats = [ColumnStats(name) for name in columns]
+            preview: list[dict[str, str]] = []
+            row_count = 0
+
+            while True:
+                chunk = list(islice(reader, self.chunk_size))
+                if not chunk:
+                    break
+                rows = [_fit_row(row, width) for row in chunk if row]
+                if not rows:
+                    continue
+                if len(preview) < self.preview_rows:
+                    for row in rows[: self.preview_rows - len(preview)]:
+                        preview.append(dict(zip(columns, row, strict=True)))
+                for column_stats, values in zip(
+                    stats, zip(*rows, strict=True), strict=True
+                ):
+                    column_stats.update(values)
+                row_count += len(rows)
+
+        return (
+            preview,
+            columns,
+            row_count,
+            {s.name: s.to_dict() for s in stats},
+        )
 
     def get_name(self) -> str:
         """
@@ -68,3 +247,14 @@ class CsvTool(BaseTool):
                 },
             },
         }
+
+
+def _fit_row(row: list[str], width: int) -> list[str]:
+    """Pad short rows and drop extra cells so every column lines up."""
+    if len(row) == width:
+        return row
+    return (row + [""] * width)[:width]
+
+
+def _pandas_available() -> bool:
+    return importlib.util.find_spec("pandas") is not None
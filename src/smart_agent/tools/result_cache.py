@@ -0,0 +1,173 @@
+"""
+Memoization of tool results, invalidated by the fingerprints of the files they read.
+"""
+
+import asyncio
+import functools
+import logging
+import sys
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+from smart_agent import metrics
+from smart_agent.cache import fingerprint_file, is_path_argument, stable_hash
+
+if TYPE_CHECKING:
+    from .base_tool import BaseTool, ToolResult
+
+logger = logging.getLogger(__name__)
+
+# Elements sampled when estimating the size of large lists
+_SIZE_SAMPLE = 32
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory size of a result in bytes, sampling long lists."""
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return sys.getsizeof(value)
+        step = max(1, len(value) // _SIZE_SAMPLE)
+        sample = value[::step][:_SIZE_SAMPLE]
+        per_item = sum(estimate_size(v) for v in sample) / len(sample)
+        return sys.getsizeof(value) + int(per_item * len(value))
+    return sys.getsizeof(value)
+
+
+class ToolResultCache:
+    """
+    LRU cache of ``ToolResult`` objects bounded by entry count and bytes.
+
+    Cached results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: OrderedDict[str, tuple[ToolResult, int]] = OrderedDict()
+
+    def get(self, key: str) -> "ToolResult | None":
+        item = self._entries.get(key)
+        if item is None:
+            self.misses += 1
+            metrics.CACHE_REQUESTS.inc(cache="tool", result="miss")
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        metrics.CACHE_REQUESTS.inc(cache="tool", result="hit")
+        return item[0]
+
+    def put(self, key: str, result: "ToolResult") -> None:
+        size = estimate_size(result.data) + estimate_size(result.meta)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        self.discard(key)
+        self._entries[key] = (result, size)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def discard(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self.bytes -= item[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
+
+
+_result_cache: ToolResultCache | None = None
+
+
+def get_result_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache."""
+    global _result_cache
+    if _result_cache is None:
+        from smart_agent.config import Settings
+
+        settings = Settings.from_env()
+        _result_cache = ToolResultCache(
+            max_entries=settings.tool_cache_entries,
+            max_bytes=settings.tool_cache_max_bytes,
+        )
+    return _result_cache
+
+
+RunMethod = Callable[..., Awaitable["ToolResult"]]
+
+
+def cached_run(run: RunMethod) -> RunMethod:
+    """
+    Wrap a tool's ``run`` so results are memoized per file fingerprint.
+
+    Only keyword calls that reference at least one existing file (arguments
+    named ``path``, ``*_path`` or ``*file``) are cached, since those are the
+    only calls with a reliable invalidation signal. The key also covers the
+    tool's public instance attributes, e.g. ``CsvTool.engine``. Error results
+    are never cached.
+    """
+
+    @functools.wraps(run)
+    async def wrapper(self: "BaseTool", *args: Any, **kwargs: Any) -> "ToolResult":
+        paths = [
+            value
+            for name, value in kwargs.items()
+            if isinstance(value, str) and is_path_argument(name)
+        ]
+        if not self.cache_results or args or not paths:
+            return await run(self, *args, **kwargs)
+
+        fingerprints = await asyncio.to_thread(
+            lambda: [fingerprint_file(path) for path in paths]
+        )
+        if None in fingerprints:
+            return await run(self, *args, **kwargs)
+
+        cache = self.result_cache or get_result_cache()
+        key = stable_hash(
+            type(self).__qualname__, _configuration(self), kwargs, fingerprints
+        )
+        result = cache.get(key)
+        if result is not None:
+            logger.debug(f"Tool result cache hit for '{self.get_name()}'")
+            return result
+
+        result = await run(self, *args, **kwargs)
+        if "error" not in (result.meta or {}):
+            cache.put(key, result)
+        return result
+
+    return wrapper
+
+
+def _configuration(tool: "BaseTool") -> dict[str, Any]:
+    """Public instance attributes, which may change what ``run`` returns."""
+    return {
+        name: value
+        for name, value in vars(tool).items()
+        if not name.startswith("_") and name != "result_cache"
+    }
@@ -0,0 +1,424 @@
+"""
+Optional tracing: request ids and OpenTelemetry-compatible spans.
+
+Tracing is off until ``configure_tracing`` installs an exporter. While it is
+off, ``span()`` returns a shared no-op span, so instrumented code pays only a
+global lookup per span. Request ids are always tracked so log lines of one
+query can be correlated even without spans.
+
+Spans are exported as JSON lines to a file (``file:/path/spans.jsonl``) or to
+an OTLP/HTTP collector (``otlp`` or ``otlp:http://collector:4318``).
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from contextvars import ContextVar, Token
+from types import TracebackType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+OTLP_DEFAULT_ENDPOINT = "http://localhost:4318"
+SERVICE_NAME = "smart-agent"
+
+_request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+def new_request_id() -> str:
+    return secrets.token_hex(8)
+
+
+def current_request_id() -> str | None:
+    return _request_id.get()
+
+
+def _reset(var: ContextVar[Any], token: Token[Any]) -> None:
+    try:
+        var.reset(token)
+    except ValueError:
+        # An async generator was finished from another context (e.g. closed
+        # by the event loop); that context is discarded anyway
+        pass
+
+
+class request_context:
+    """
+    Bind a request id to the current context for the duration of a block.
+
+    An id that is already bound is kept, so nested entry points (the API
+    handler, then ``SmartAgent.run``) share the id of the outermost one.
+    """
+
+    def __init__(self, request_id: str | None = None):
+        self.request_id = request_id
+        self._token: Token[str | None] | None = None
+
+    def __enter__(self) -> str:
+        current = _request_id.get()
+        if current is not None and self.request_id is None:
+            return current
+        request_id = self.request_id or new_request_id()
+        self._token = _request_id.set(request_id)
+        return request_id
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._token is not None:
+            _reset(_request_id, self._token)
+
+
+class Span:
+    """
+    A timed operation with attributes, nested under the span active when it
+    was created.
+    """
+
+    recording = True
+
+    def __init__(self, name: str, attributes: dict[str, Any], exporter: "Exporter"):
+        parent = _current_span.get()
+        self.name = name
+        self.attributes = attributes
+        self.trace_id: str = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.request_id = _request_id.get()
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: str | None = None
+        self._exporter = exporter
+        self._token: Token[Span | None] | None = None
+        self._started = 0.0
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        elapsed_ns = int((time.perf_counter() - self._started) * 1e9)
+        self.end_ns = self.start_ns + elapsed_ns
+        if exc is not None:
+            self.error = f"{type(exc).__name__}: {exc}"
+        if self._token is not None:
+            _reset(_current_span, self._token)
+        try:
+            self._exporter.export(self)
+        except Exception as e:
+            logger.debug(f"Dropping span '{self.name}': {e}")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "request_id": self.request_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Exporter:
+    """Receives finished spans."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter(Exporter):
+    """Appends one JSON object per span to a file."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class OtlpHttpExporter(Exporter):
+    """
+    Sends spans to an OTLP/HTTP collector using the JSON encoding.
+
+    Spans are batched by a background thread so request paths never wait on
+    the collector; when the buffer is full new spans are dropped.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = OTLP_DEFAULT_ENDPOINT,
+        batch_size: int = 256,
+        interval: float = 2.0,
+        max_queue: int = 8192,
+        transport: "httpx.BaseTransport | None" = None,
+    ):
+        import httpx
+
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dropped = 0
+        self._queue: queue.Queue[Span | None] = queue.Queue(maxsize=max_queue)
+        self._client = httpx.Client(timeout=5.0, transport=transport)
+        self._thread = threading.Thread(
+            target=self._run, name="otlp-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        """Flush buffered spans and stop the background thread."""
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        self._client.close()
+
+    def _run(self) -> None:
+        batch: list[Span] = []
+        deadline = time.monotonic() + self.interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                span = None
+                stop = False
+            else:
+                stop = span is None
+            if span is not None:
+                batch.append(span)
+            if stop or len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._send(batch)
+                    batch = []
+                deadline = time.monotonic() + self.interval
+            if stop:
+                return
+
+    def _send(self, spans: list[Span]) -> None:
+        import httpx
+
+        try:
+            response = self._client.post(self.url, json=otlp_payload(spans))
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not export {len(spans)} spans to {self.url}: {e}")
+
+
+def otlp_payload(spans: list[Span]) -> dict[str, Any]:
+    """Encode spans as an OTLP ``ExportTraceServiceRequest`` in JSON."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": SERVICE_NAME})
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "smart_agent"},
+                        "spans": [_otlp_span(span) for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    attributes = dict(span.attributes)
+    if span.request_id:
+        attributes["request.id"] = span.request_id
+    encoded: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+_exporter: Exporter | None = None
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """
+    Start a span; use as a context manager.
+
+    Returns a shared no-op span when tracing is disabled. Callers computing
+    expensive attributes should check ``span.recording`` first.
+    """
+    exporter = _exporter
+    if exporter is None:
+        return _NOOP_SPAN
+    return Span(name, attributes, exporter)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def is_enabled() -> bool:
+    return _exporter is not None
+
+
+def shutdown_tracing() -> None:
+    """Flush and remove the installed exporter, if any."""
+    global _exporter
+    previous, _exporter = _exporter, None
+    if previous is not None:
+        previous.shutdown()
+
+
+def configure_tracing(target: str) -> Exporter | None:
+    """
+    Install the span exporter described by ``target``.
+
+    Args:
+        target: ``""`` or ``"none"`` to disable, ``"file:<path>"``, ``"otlp"``
+            or ``"otlp:<collector url>"``.
+
+    Returns:
+        Exporter | None: The installed exporter.
+
+    Raises:
+        ValueError: If ``target`` is not recognized.
+    """
+    global _exporter
+    shutdown_tracing()
+
+    kind, _, arg = target.strip().partition(":")
+    if kind in ("", "none"):
+        return None
+    if kind == "file" and arg:
+        _exporter = FileExporter(arg)
+    elif kind == "otlp":
+        _exporter = OtlpHttpExporter(arg or OTLP_DEFAULT_ENDPOINT)
+    else:
+        raise ValueError(
+            f"Unknown trace export target '{target}', expected "
+            "'file:<path>', 'otlp' or 'otlp:<url>'"
+        )
+    atexit.register(shutdown_tracing)
+    logger.info(f"Tracing enabled: {target}")
+    return _exporter
+
+
+class RequestContextMiddleware:
+    """
+    ASGI middleware binding a request id (``X-Request-Id`` or a new one) and a
+    root ``http.request`` span to every HTTP request, and echoing the id back.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(b"x-request-id", b"").decode("latin-1").strip()
+        with request_context(incoming[:128] or None) as request_id:
+            with span(
+                "http.request", method=scope.get("method"), path=scope.get("path")
+            ) as root:
+
+                async def send_with_id(message: dict) -> None:
+                    if message["type"] == "http.response.start":
+                        root.set_attribute("status_code", message["status"])
+                        message = {
+                            **message,
+                            "headers": [
+                                *message.get("headers", []),
+                                (b"x-request-id", request_id.encode("latin-1")),
+                            ],
+                        }
+                    await send(message)
+
+                await self.app(scope, receive, send_with_id)
@@ -0,0 +1,47 @@
+"""Tests for the info command and CLI import cost."""
+
+import json
+
+from typer.testing import CliRunner
+
+from smart_agent.cli import app
+from smart_agent.cli.commands.info import _parse_importtime, measure_imports
+
+HEAVY = {"fastapi", "uvicorn", "ollama", "httpx", "pandas"}
+
+
+def test_parse_importtime():
+    text = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   typer.core\n"
+        "import time:       300 |        420 | typer\n"
+    )
+    assert _parse_importtime(text) == [
+        {"name": "typer.core", "self_ms": 0.12, "cumulative_ms": 0.12, "depth": 1},
+        {"name": "typer", "self_ms": 0.3, "cumulative_ms": 0.42, "depth": 0},
+    ]
+
+
+def test_cli_does_not_import_heavy_dependencies():
+    report = measure_imports("smart_agent.cli")
+    names = {m["name"].split(".")[0] for m in report["modules"]}
+    assert "smart_agent" in names
+    assert not names & HEAVY
+    assert report["total_ms"] > 0
+
+
+def test_imports_command_json():
+    result = CliRunner().invoke(
+        app,
+        ["info", "imports", "smart_agent.tracing", "--top", "3", "--format", "json"],
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.output)
+    assert report["module"] == "smart_agent.tracing"
+    assert len(report["modules"]) <= 3
+
+
+def test_imports_command_unknown_module():
+    result = CliRunner().invoke(app, ["info", "imports", "smart_agent.nope"])
+    assert result.exit_code == 1
+    assert "No module named" in result.output
@@ -0,0 +1,213 @@
+"""Tests for the FastAPI app built by the run command."""
+
+import os
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from smart_agent.cli.commands import run
+from smart_agent.ollama_health import DEFAULT_MODEL, OllamaHealthMonitor
+from smart_agent.response import AgentResponse, Stage
+
+
+def agent_response(content: str) -> AgentResponse:
+    return AgentResponse(
+        content=content,
+        tool_name="",
+        meta={},
+        duration_ms=5,
+        stages=[Stage("llm", 5.0)],
+    )
+
+
+def ollama_transport(models: list[str] | None, probes: list | None = None):
+    """Mock Ollama /api/tags; ``models=None`` simulates a stopped service."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if probes is not None:
+            probes.append(request.url.path)
+        if models is None:
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"models": [{"model": m} for m in models]})
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def probes():
+    probes: list[str] = []
+    monitor = OllamaHealthMonitor(transport=ollama_transport([DEFAULT_MODEL], probes))
+    with patch.object(run, "get_health_monitor", return_value=monitor):
+        yield probes
+
+
+class TestAnswerEndpoint:
+    def test_agent_is_shared_across_requests(self, probes):
+        with (
+            patch.object(
+                run.SmartAgent, "run", AsyncMock(return_value=agent_response("42"))
+            ),
+            TestClient(run.build_app()) as client,
+        ):
+            agent = client.app.state.agent
+            for _ in range(3):
+                response = client.post("/answer", json={"query": "hi"})
+                body = response.json()
+                assert body["answer"] == "42"
+                assert body["duration_ms"] == 5
+                assert [stage["name"] for stage in body["stages"]] == ["queue", "llm"]
+            assert client.app.state.agent is agent
+            assert agent.validate_health is False
+
+    def test_health_is_cached_not_probed_per_request(self, probes):
+        with (
+            patch.object(
+                run.SmartAgent, "run", AsyncMock(return_value=agent_response("ok"))
+            ),
+            TestClient(run.build_app()) as client,
+        ):
+            for _ in range(5):
+                client.post("/answer", json={"query": "hi"})
+            health = client.get("/healthz").json()
+            assert health["ollama"] == "healthy"
+            assert health["llm"]["queue_depth"] == 0
+        assert probes == ["/api/tags"]
+
+    def test_unhealthy_returns_503(self):
+        monitor = OllamaHealthMonitor(transport=ollama_transport(None))
+        with (
+            patch.object(run, "get_health_monitor", return_value=monitor),
+            TestClient(run.build_app()) as client,
+        ):
+            response = client.post("/answer", json={"query": "hi"})
+            assert response.status_code == 503
+            assert "Ollama service is not running" in response.json()["detail"]
+            assert client.get("/healthz").json()["ollama"] == "unhealthy"
+
+    def test_pool_size_from_env(self, probes, monkeypatch):
+        monkeypatch.setenv("SMART_AGENT_POOL_SIZE", "3")
+        with patch.object(
+            run, "create_transport", wraps=run.create_transport
+        ) as factory:
+            with TestClient(run.build_app()):
+                pass
+        assert factory.call_args.args[0].pool_size == 3
+
+
+async def fake_stream(self, text):
+    for chunk in ["Hello", " world"]:
+        yield chunk
+
+
+async def failing_stream(self, text):
+    yield "partial"
+    raise RuntimeError("model crashed")
+
+
+class TestAnswerStreamEndpoint:
+    def test_streams_server_sent_events(self, probes):
+        with (
+            patch.object(run.SmartAgent, "run_stream", fake_stream),
+            TestClient(run.build_app()) as client,
+        ):
+            response = client.post("/answer/stream", json={"query": "hi"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            'data: {"delta": "Hello"}\n\n'
+            'data: {"delta": " world"}\n\n'
+            "event: done\ndata: {}\n\n"
+        )
+
+    def test_error_mid_stream_is_reported_in_band(self, probes):
+        with (
+            patch.object(run.SmartAgent, "run_stream", failing_stream),
+            TestClient(run.build_app()) as client,
+        ):
+            response = client.post("/answer/stream", json={"query": "hi"})
+
+        assert 'data: {"delta": "partial"}' in response.text
+        assert "event: error" in response.text
+        assert "model crashed" in response.text
+
+    def test_unhealthy_returns_503_before_streaming(self):
+        monitor = OllamaHealthMonitor(transport=ollama_transport(None))
+        with (
+            patch.object(run, "get_health_monitor", return_value=monitor),
+            TestClient(run.build_app()) as client,
+        ):
+            response = client.post("/answer/stream", json={"query": "hi"})
+        assert response.status_code == 503
+
+
+class TestAdmission:
+    def test_queue_headers_and_release(self, probes):
+        with (
+            patch.object(
+                run.SmartAgent, "run", AsyncMock(return_value=agent_response("ok"))
+            ),
+            patch.object(run.SmartAgent, "run_stream", fake_stream),
+            TestClient(run.build_app()) as client,
+        ):
+            response = client.post("/answer", json={"query": "hi"})
+            assert response.headers["X-Queue-Position"] == "0"
+            assert "X-Queue-Wait-Ms" in response.headers
+
+            client.post("/answer/stream", json={"query": "hi"})
+            assert client.get("/healthz").json()["queue"]["active"] == 0
+
+    def test_full_queue_fails_fast_with_retry_after(self, probes, monkeypatch):
+        monkeypatch.setenv("SMART_AGENT_MAX_ACTIVE_REQUESTS", "1")
+        monkeypatch.setenv("SMART_AGENT_MAX_QUEUED_REQUESTS", "0")
+        with (
+            patch.object(
+                run.SmartAgent, "run", AsyncMock(return_value=agent_response("ok"))
+            ),
+            TestClient(run.build_app()) as client,
+        ):
+            admission = client.app.state.admission
+            ticket = client.portal.call(admission.acquire, "other")
+
+            response = client.post("/answer", json={"query": "hi"})
+            assert response.status_code == 503
+            assert int(response.headers["Retry-After"]) >= 1
+
+            admission.release(ticket)
+            assert client.post("/answer", json={"query": "hi"}).status_code == 200
+
+    def test_unknown_priority_is_400(self, probes):
+        with TestClient(run.build_app()) as client:
+            response = client.post(
+                "/answer", json={"query": "hi"}, headers={"X-Priority": "urgent"}
+            )
+        assert response.status_code == 400
+
+
+class TestMetricsEndpoint:
+    def test_exposes_request_pipeline_metrics(self, probes):
+        with (
+            patch.object(
+                run.SmartAgent, "run", AsyncMock(return_value=agent_response("ok"))
+            ),
+            TestClient(run.build_app()) as client,
+        ):
+            client.post("/answer", json={"query": "hi"})
+            response = client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'smart_agent_request_seconds_count{path="/answer",status="200"}' in text
+        assert 'smart_agent_requests_in_flight{path="/answer"} 0' in text
+        assert 'smart_agent_health_check_seconds_count{result="up"}' in text
+        assert "# TYPE smart_agent_llm_chat_seconds histogram" in text
+
+    def test_workers_share_snapshots(self, probes, monkeypatch, tmp_path):
+        monkeypatch.setenv("SMART_AGENT_METRICS_DIR", str(tmp_path))
+        with TestClient(run.build_app()):
+            pass
+        assert [p.name for p in tmp_path.glob("*.json")] == [
+            f"worker-{os.getpid()}.json"
+        ]
@@ -0,0 +1,115 @@
+"""Tests for API admission control."""
+
+import asyncio
+
+import pytest
+
+from smart_agent.admission import BATCH, AdmissionController, QueueFullError
+
+
+async def start(controller, client_id, priority="interactive", log=None):
+    """Acquire in a task; with ``log``, record the admission and release at once."""
+
+    async def run():
+        ticket = await controller.acquire(client_id, priority)
+        if log is not None:
+            log.append(client_id)
+            controller.release(ticket)
+        return ticket
+
+    task = asyncio.create_task(run())
+    await asyncio.sleep(0)
+    return task
+
+
+class TestAdmissionController:
+    @pytest.mark.asyncio
+    async def test_admits_immediately_below_limit(self):
+        controller = AdmissionController(max_active=2)
+        ticket = await controller.acquire("a")
+
+        assert ticket.position == 0
+        assert controller.stats()["active"] == 1
+        controller.release(ticket)
+        controller.release(ticket)
+        assert controller.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_clients_are_served_round_robin(self):
+        controller = AdmissionController(max_active=1)
+        holder = await controller.acquire("x")
+        order: list[str] = []
+        tasks = [
+            await start(controller, client, log=order)
+            for client in ("a", "a", "a", "b", "c")
+        ]
+        assert [t for t in tasks if t.done()] == []
+
+        controller.release(holder)
+        await asyncio.gather(*tasks)
+        assert order == ["a", "b", "c", "a", "a"]
+        assert controller.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_before_batch(self):
+        controller = AdmissionController(max_active=1)
+        holder = await controller.acquire("x")
+        order: list[str] = []
+        batch = await start(controller, "batch-job", BATCH, log=order)
+        interactive = await start(controller, "user", log=order)
+
+        controller.release(holder)
+        await asyncio.gather(batch, interactive)
+        assert order == ["user", "batch-job"]
+
+    @pytest.mark.asyncio
+    async def test_queue_position_is_reported(self):
+        controller = AdmissionController(max_active=1)
+        await controller.acquire("x")
+        first = await start(controller, "a")
+        await start(controller, "a")
+        await start(controller, "b")
+
+        assert controller.stats()["queued"] == 3
+        # b is served after a's first request, before a's second
+        assert controller._position("interactive", "b", 1) == 2
+        first.cancel()
+
+    @pytest.mark.asyncio
+    async def test_per_client_limit_is_429(self):
+        controller = AdmissionController(max_active=1, max_queued_per_client=1)
+        await controller.acquire("x")
+        await start(controller, "a")
+
+        with pytest.raises(QueueFullError) as info:
+            await controller.acquire("a")
+        assert info.value.status_code == 429
+        assert info.value.retry_after >= 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_503(self):
+        controller = AdmissionController(max_active=1, max_queued=1)
+        await controller.acquire("x")
+        await start(controller, "a")
+
+        with pytest.raises(QueueFullError) as info:
+            await controller.acquire("b")
+        assert info.value.status_code == 503
+        assert controller.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        controller = AdmissionController(max_active=1)
+        holder = await controller.acquire("x")
+        waiter = await start(controller, "a")
+        waiter.cancel()
+        await asyncio.sleep(0)
+
+        assert controller.stats()["queued"] == 0
+        controller.release(holder)
+        assert controller.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_priority(self):
+        with pytest.raises(ValueError, match="Unknown priority"):
+            await AdmissionController().acquire("a", "urgent")
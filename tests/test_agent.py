@@ -0,0 +1,660 @@
+"""Tests for the LLaMA3Client tool-calling flow."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from ollama import AsyncClient, ChatResponse, Message
+from smart_agent.agent import (
+    AgentStep,
+    ChatScheduler,
+    LLaMA3Client,
+    SmartAgent,
+    UnknownToolError,
+)
+from smart_agent.config import Settings
+from smart_agent.metrics import REGISTRY
+from smart_agent.mock_ollama import mock_transport
+from smart_agent.tools.base_tool import BaseTool, ToolResult
+
+
+class SleepTool(BaseTool):
+    def __init__(self, name: str, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+
+    async def run(self, file_path: str) -> ToolResult:
+        await asyncio.sleep(self.delay)
+        return ToolResult(data=f"{self.name}:{file_path}", meta={})
+
+    def get_name(self) -> str:
+        return self.name
+
+    def to_ollama_tool(self) -> dict:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": "Sleeps and echoes",
+                "parameters": {
+                    "type": "object",
+                    "properties": {"file_path": {"type": "string"}},
+                    "required": ["file_path"],
+                },
+            },
+        }
+
+
+class FakeClient:
+    """Stands in for ollama.AsyncClient; replays scripted responses.
+
+    A list of responses is replayed as stream chunks when ``stream=True``.
+    """
+
+    def __init__(self, *responses: ChatResponse | list[ChatResponse]):
+        self.responses = list(responses)
+        self.calls: list[dict] = []
+
+    async def chat(self, **kwargs):
+        self.calls.append(kwargs)
+        response = self.responses.pop(0)
+        if kwargs.get("stream"):
+            return self._stream(response)
+        return response
+
+    async def _stream(self, chunks):
+        for chunk in chunks:
+            yield chunk
+
+
+def tool_call_response(*calls: tuple[str, str]) -> ChatResponse:
+    return ChatResponse(
+        message=Message(
+            role="assistant",
+            content="",
+            tool_calls=[
+                Message.ToolCall(
+                    function=Message.ToolCall.Function(
+                        name=name, arguments={"file_path": path}
+                    )
+                )
+                for name, path in calls
+            ],
+        )
+    )
+
+
+def text_response(content: str) -> ChatResponse:
+    return ChatResponse(message=Message(role="assistant", content=content))
+
+
+def make_client(tools, *responses, **kwargs) -> LLaMA3Client:
+    client = LLaMA3Client(tools, "system", **kwargs)
+    client.client = FakeClient(*responses)
+    return client
+
+
+class TestGenerate:
+    @pytest.mark.asyncio
+    async def test_no_tool_calls(self):
+        client = make_client([SleepTool("a")], text_response("hello"))
+
+        assert await client.generate("hi") == "hello"
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_run_concurrently_in_order(self):
+        tools = [SleepTool("slow", 0.2), SleepTool("fast", 0.0), SleepTool("mid", 0.1)]
+        client = make_client(
+            tools,
+            tool_call_response(("slow", "a"), ("fast", "b"), ("mid", "c")),
+            text_response("done"),
+        )
+
+        start = time.perf_counter()
+        assert await client.generate("read three files") == "done"
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.29
+        tool_messages = [
+            m for m in client.client.calls[1]["messages"] if m.role == "tool"
+        ]
+        assert [m.tool_name for m in tool_messages] == ["slow", "fast", "mid"]
+        assert "slow:a" in tool_messages[0].content
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        tools = [SleepTool("t", 0.05)]
+        client = make_client(
+            tools,
+            tool_call_response(("t", "a"), ("t", "b"), ("t", "c")),
+            text_response("done"),
+            max_concurrent_tools=1,
+        )
+
+        start = time.perf_counter()
+        await client.generate("serial")
+        assert time.perf_counter() - start >= 0.15
+
+    @pytest.mark.asyncio
+    async def test_tool_timeout_becomes_error_message(self):
+        client = make_client(
+            [SleepTool("slow", 1.0)],
+            tool_call_response(("slow", "a")),
+            text_response("sorry"),
+            tool_timeout=0.01,
+        )
+
+        assert await client.generate("read") == "sorry"
+        tool_message = client.client.calls[1]["messages"][-1]
+        assert tool_message.role == "tool"
+        assert "Timed out" in tool_message.content
+
+
+class TestMetrics:
+    @pytest.mark.asyncio
+    async def test_rounds_and_tools_are_recorded(self):
+        first = tool_call_response(("a", "1"), ("missing", "2"))
+        first.prompt_eval_count, first.eval_count = 100, 20
+        first.eval_duration = 500_000_000
+        client = make_client([SleepTool("a")], first, text_response("done"))
+        before = REGISTRY.snapshot()["metrics"]
+
+        await client.generate("read")
+
+        after = REGISTRY.snapshot()["metrics"]
+
+        def count(name, labels):
+            samples = {tuple(k): v for k, v in after[name]["samples"]}
+            old = {tuple(k): v for k, v in before[name]["samples"]}
+            return samples[labels]["count"] - old.get(labels, {"count": 0})["count"]
+
+        assert count("smart_agent_tool_seconds", ("a", "ok")) == 1
+        assert count("smart_agent_tool_seconds", ("unknown", "unknown")) == 1
+        model = client.model
+        assert count("smart_agent_llm_chat_seconds", (model, "false")) == 2
+        assert count("smart_agent_llm_eval_tokens", (model,)) == 2
+
+
+class TestAgentLoop:
+    @pytest.mark.asyncio
+    async def test_chains_tool_calls_across_rounds(self):
+        client = make_client(
+            [SleepTool("csv"), SleepTool("md")],
+            tool_call_response(("csv", "data.csv")),
+            tool_call_response(("md", "notes.md")),
+            text_response("combined"),
+        )
+        steps: list[AgentStep] = []
+
+        assert await client.generate("analyse", steps=steps) == "combined"
+        calls = client.client.calls
+        assert len(calls) == 3
+        assert all(call["tools"] is client.tool_schemas for call in calls)
+        assert [step.tool_calls for step in steps] == [["csv"], ["md"], []]
+        assert "md:notes.md" in calls[2]["messages"][-1].content
+
+    @pytest.mark.asyncio
+    async def test_last_step_withholds_tools(self):
+        client = make_client(
+            [SleepTool("a")],
+            tool_call_response(("a", "1")),
+            text_response("forced answer"),
+            max_steps=2,
+        )
+
+        assert await client.generate("loop") == "forced answer"
+        assert client.client.calls[1]["tools"] is None
+
+    @pytest.mark.asyncio
+    async def test_token_budget_withholds_tools(self):
+        first = tool_call_response(("a", "1"))
+        first.prompt_eval_count, first.eval_count = 900, 200
+        client = make_client(
+            [SleepTool("a")], first, text_response("short"), token_budget=1000
+        )
+        steps: list[AgentStep] = []
+
+        assert await client.generate("loop", steps=steps) == "short"
+        assert client.client.calls[1]["tools"] is None
+        assert steps[0].tokens == 1100
+
+    @pytest.mark.asyncio
+    async def test_time_budget_withholds_tools(self):
+        client = make_client(
+            [SleepTool("a", 0.05)],
+            tool_call_response(("a", "1")),
+            text_response("late"),
+            time_budget=0.01,
+        )
+        steps: list[AgentStep] = []
+
+        assert await client.generate("loop", steps=steps) == "late"
+        assert client.client.calls[1]["tools"] is None
+        assert steps[0].tool_seconds >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_stream_chains_rounds(self):
+        client = make_client(
+            [SleepTool("a")],
+            [tool_call_response(("a", "1"))],
+            [tool_call_response(("a", "2"))],
+            [text_response("do"), text_response("ne")],
+        )
+        steps: list[AgentStep] = []
+
+        chunks = [c async for c in client.generate_stream("loop", steps=steps)]
+        assert chunks == ["do", "ne"]
+        assert len(steps) == 3
+        assert client.client.calls[2]["tools"] is client.tool_schemas
+
+
+class SlowChat:
+    """Fake chat endpoint that counts concurrent calls."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def chat(self, **kwargs):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return text_response(kwargs["messages"][-1].content)
+
+
+class TestChatScheduler:
+    @pytest.mark.asyncio
+    async def test_identical_prompts_are_coalesced(self):
+        client = LLaMA3Client([SleepTool("a")], "system")
+        client.client = SlowChat()
+
+        answers = await asyncio.gather(*(client.generate("same") for _ in range(5)))
+
+        assert answers == ["same"] * 5
+        assert client.client.calls == 1
+        assert client.scheduler.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrency_cap_and_queue_stats(self):
+        client = LLaMA3Client(
+            [SleepTool("a")], "system", scheduler=ChatScheduler(max_concurrent=2)
+        )
+        client.client = SlowChat()
+
+        await asyncio.gather(*(client.generate(f"q{i}") for i in range(6)))
+
+        stats = client.scheduler.stats()
+        assert client.client.max_running == 2
+        assert stats["calls"] == 6
+        assert stats["max_queue_depth"] >= 4
+        assert stats["queue_depth"] == 0
+        assert stats["wait_p95_ms"] >= 50
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_call(self):
+        client = LLaMA3Client([SleepTool("a")], "system")
+        client.client = SlowChat()
+
+        first = asyncio.create_task(client.generate("same"))
+        second = asyncio.create_task(client.generate("same"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "same"
+        assert client.client.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_holds_a_slot(self):
+        scheduler = ChatScheduler(max_concurrent=1)
+        client = make_client([SleepTool("a")], [text_response("a"), text_response("b")])
+        client.scheduler = scheduler
+
+        chunks = []
+        async for chunk in client.generate_stream("hi"):
+            chunks.append(chunk)
+            assert scheduler.stats()["running"] == 1
+
+        assert chunks == ["a", "b"]
+        assert scheduler.stats()["running"] == 0
+
+
+class TestToolIndex:
+    def test_schemas_are_built_once(self):
+        tool = SleepTool("a")
+        calls = []
+        original = tool.to_ollama_tool
+        tool.to_ollama_tool = lambda: calls.append(1) or original()
+
+        client = LLaMA3Client([tool], "system")
+        assert len(calls) == 1
+        assert isinstance(client.tool_schemas, tuple)
+        assert client.tool_schemas[0].function.name == "a"
+
+    @pytest.mark.asyncio
+    async def test_cached_schemas_are_sent(self):
+        client = make_client([SleepTool("a")], text_response("hi"))
+        await client.generate("hello")
+
+        assert client.client.calls[0]["tools"] is client.tool_schemas
+
+    def test_get_tool(self):
+        tool = SleepTool("a")
+        client = LLaMA3Client([tool, SleepTool("b")], "system")
+
+        assert client.get_tool("a") is tool
+        with pytest.raises(UnknownToolError, match="Available tools: a, b"):
+            client.get_tool("c")
+
+    def test_reassigning_tools_rebuilds_index(self):
+        client = LLaMA3Client([SleepTool("a")], "system")
+        client.tools = [SleepTool("b")]
+
+        assert [s.function.name for s in client.tool_schemas] == ["b"]
+        with pytest.raises(UnknownToolError):
+            client.get_tool("a")
+
+    def test_duplicate_names_keep_first(self):
+        first = SleepTool("a")
+        client = LLaMA3Client([first, SleepTool("a")], "system")
+
+        assert client.tools == [first]
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool_is_reported_to_model(self):
+        client = make_client(
+            [SleepTool("a")],
+            tool_call_response(("missing", "x.csv")),
+            text_response("no such tool"),
+        )
+
+        assert await client.generate("read") == "no such tool"
+        tool_message = client.client.calls[1]["messages"][-1]
+        assert tool_message.tool_name == "missing"
+        assert "Unknown tool 'missing'" in tool_message.content
+
+
+class ReorderedTool(SleepTool):
+    """Same schema as SleepTool with every mapping in reverse key order."""
+
+    def to_ollama_tool(self) -> dict:
+        def reverse(value):
+            if isinstance(value, dict):
+                return {k: reverse(value[k]) for k in reversed(list(value))}
+            return value
+
+        return reverse(super().to_ollama_tool())
+
+
+class TestPromptPrefix:
+    def test_tool_schemas_are_canonical(self):
+        first = LLaMA3Client([SleepTool("b"), SleepTool("a")], "system")
+        second = LLaMA3Client([ReorderedTool("a"), ReorderedTool("b")], "system")
+
+        assert [s.function.name for s in first.tool_schemas] == ["a", "b"]
+        assert first.tool_schema_hash == second.tool_schema_hash
+        assert first.prefix_hash == second.prefix_hash
+
+    @pytest.mark.asyncio
+    async def test_options_are_sent_unchanged(self):
+        client = make_client(
+            [SleepTool("a")],
+            tool_call_response(("a", "x.csv")),
+            text_response("done"),
+            options={"num_ctx": 4096},
+        )
+        await client.generate("read x")
+
+        assert [call["options"] for call in client.client.calls] == [
+            {"num_ctx": 4096}
+        ] * 2
+
+    @pytest.mark.asyncio
+    async def test_pinned_prefix_is_reused(self):
+        client = LLaMA3Client(
+            [SleepTool("a")],
+            "You are a careful assistant. " * 20,
+            client=AsyncClient(transport=mock_transport()),
+        )
+        assert await client.pin_prefix() == client.prefix_tokens
+        assert client.prefix_tokens[client.model] > 100
+
+        steps: list[AgentStep] = []
+        await client.generate("hello", steps)
+        assert steps[0].prefix_hit is True
+        assert steps[0].prompt_tokens < client.prefix_tokens[client.model]
+
+        # A different prefix is not judged against the pinned one
+        client.system_prompt = "Another prompt."
+        steps = []
+        await client.generate("hello", steps)
+        assert steps[0].prefix_hit is None
+
+    @pytest.mark.asyncio
+    async def test_only_first_round_is_judged(self):
+        first = tool_call_response(("a", "x.csv"))
+        first.prompt_eval_count = 10
+        final = text_response("done")
+        final.prompt_eval_count = 5000  # Tool output longer than the prefix
+        client = make_client([SleepTool("a")], first, final)
+        client.prefix_tokens = {client.model: 200}
+        client._pinned_prefix = client.prefix_hash
+
+        steps: list[AgentStep] = []
+        await client.generate("read x", steps)
+        assert [step.prefix_hit for step in steps] == [True, None]
+
+
+class TestGenerateStream:
+    async def collect(self, client: LLaMA3Client, prompt: str) -> list[str]:
+        return [chunk async for chunk in client.generate_stream(prompt)]
+
+    @pytest.mark.asyncio
+    async def test_streams_direct_answer(self):
+        client = make_client(
+            [SleepTool("a")],
+            [text_response("Hel"), text_response("lo")],
+        )
+
+        assert await self.collect(client, "hi") == ["Hel", "lo"]
+        assert client.client.calls[0]["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_streams_after_tool_calls(self):
+        client = make_client(
+            [SleepTool("a")],
+            [tool_call_response(("a", "x.csv"))],
+            [text_response("The file "), text_response("has data.")],
+        )
+
+        assert await self.collect(client, "read") == ["The file ", "has data."]
+        follow_up = client.client.calls[1]["messages"]
+        assert follow_up[-2].tool_calls[0].function.name == "a"
+        assert follow_up[-1].role == "tool"
+        assert "a:x.csv" in follow_up[-1].content
+
+    @pytest.mark.asyncio
+    async def test_empty_stream(self):
+        client = make_client([SleepTool("a")], [text_response("")])
+
+        assert await self.collect(client, "hi") == ["No response from model."]
+
+
+class TestAgentResponse:
+    @pytest.mark.asyncio
+    async def test_stages_and_token_accounting(self):
+        first = tool_call_response(("a", "x.csv"), ("b", "y.csv"))
+        first.prompt_eval_count, first.eval_count = 200, 10
+        final = text_response("answer")
+        final.prompt_eval_count, final.eval_count = 300, 50
+        final.load_duration = 2_000_000_000
+        final.prompt_eval_duration = 100_000_000
+        final.eval_duration = 500_000_000
+        agent = SmartAgent(validate_health=False, settings=Settings())
+        agent.llm.tools = [SleepTool("a"), SleepTool("b")]
+        agent.llm.client = FakeClient(first, final)
+
+        response = await agent.run("compare x and y")
+
+        assert response.content == "answer"
+        assert response.tool_name == "a, b"
+        assert [(s.name, s.meta.get("tool")) for s in response.stages] == [
+            ("cache", None),
+            ("llm", None),
+            ("tool", "a"),
+            ("tool", "b"),
+            ("llm", None),
+        ]
+        last = response.stages[-1].meta
+        assert last["final"] is True
+        assert last["load_ms"] == 2000
+        assert last["tokens_per_second"] == 100
+        assert response.meta["prompt_tokens"] == 500
+        assert response.meta["eval_tokens"] == 60
+        assert response.meta["steps"] == 2
+        assert response.to_dict()["stages"][2]["meta"]["status"] == "ok"
+
+
+class ClosingTransport(httpx.MockTransport):
+    def __init__(self):
+        super().__init__(lambda request: httpx.Response(200))
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class TestSmartAgentConnections:
+    @pytest.mark.asyncio
+    async def test_aclose_closes_owned_transport(self):
+        transport = ClosingTransport()
+        agent = SmartAgent(
+            validate_health=False, settings=Settings(), transport=transport
+        )
+
+        await agent.aclose()
+        assert transport.closed
+
+    @pytest.mark.asyncio
+    async def test_caller_owns_a_passed_client(self):
+        transport = ClosingTransport()
+        agent = SmartAgent(
+            client=AsyncClient(transport=transport),
+            validate_health=False,
+            settings=Settings(),
+        )
+
+        await agent.aclose()
+        assert agent.transport is None
+        assert not transport.closed
+
+
+class TestSmartAgentCache:
+    @pytest.fixture
+    def csv_file(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a,b\n1,2\n")
+        return str(path)
+
+    def make_agent(self, *responses) -> SmartAgent:
+        agent = SmartAgent(validate_health=False, settings=Settings())
+        agent.llm.tools = [SleepTool("reader")]
+        agent.llm.client = FakeClient(*responses)
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_model(self, csv_file):
+        agent = self.make_agent(
+            tool_call_response(("reader", csv_file)), text_response("two rows")
+        )
+
+        first = await agent.run(f"analyze {csv_file}")
+        second = await agent.run(f"analyze  {csv_file} ")
+        assert first.content == second.content == "two rows"
+        assert first.meta["cached"] is False
+        assert second.meta["cached"] is True
+        assert [stage.name for stage in second.stages] == ["cache"]
+        assert len(agent.llm.client.calls) == 2
+        assert agent.cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_touched_file_change_forces_model_call(self, csv_file):
+        agent = self.make_agent(
+            tool_call_response(("reader", csv_file)),
+            text_response("two rows"),
+            tool_call_response(("reader", csv_file)),
+            text_response("three rows"),
+        )
+
+        await agent.run("analyze data")
+        with open(csv_file, "a") as f:
+            f.write("3,4\n")
+        assert (await agent.run("analyze data")).content == "three rows"
+
+    @pytest.mark.asyncio
+    async def test_relative_path_is_not_shared_across_directories(
+        self, tmp_path, monkeypatch
+    ):
+        for name in ("a", "b"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "data.csv").write_text(f"{name}\n")
+        agent = self.make_agent(
+            tool_call_response(("reader", "data.csv")),
+            text_response("answer about a"),
+            tool_call_response(("reader", "data.csv")),
+            text_response("answer about b"),
+        )
+
+        monkeypatch.chdir(tmp_path / "a")
+        assert (await agent.run("summarize data.csv")).content == "answer about a"
+        monkeypatch.chdir(tmp_path / "b")
+        second = await agent.run("summarize data.csv")
+        assert second.content == "answer about b"
+        assert second.meta["cached"] is False
+
+    @pytest.mark.asyncio
+    async def test_tool_timeout_is_not_cached(self, csv_file):
+        agent = self.make_agent(
+            tool_call_response(("reader", csv_file)),
+            text_response("the file could not be read"),
+            tool_call_response(("reader", csv_file)),
+            text_response("two rows"),
+        )
+        agent.llm.tools = [SleepTool("reader", 1.0)]
+        agent.llm.tool_timeout = 0.01
+
+        await agent.run("analyze data")
+        agent.llm.tools = [SleepTool("reader")]
+        retry = await agent.run("analyze data")
+        assert retry.content == "two rows"
+        assert retry.meta["cached"] is False
+        assert len(agent.llm.client.calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_empty_answer_is_not_cached(self):
+        agent = self.make_agent([text_response("")], [text_response("Hi")])
+
+        assert [c async for c in agent.run_stream("hello")] == [
+            "No response from model."
+        ]
+        assert [c async for c in agent.run_stream("hello")] == ["Hi"]
+
+    @pytest.mark.asyncio
+    async def test_stream_uses_cache(self):
+        agent = self.make_agent([text_response("Hi"), text_response("!")])
+
+        first = [c async for c in agent.run_stream("hello")]
+        second = [c async for c in agent.run_stream("hello")]
+        assert first == ["Hi", "!"]
+        assert second == ["Hi!"]
+
+    def test_cache_disabled(self):
+        agent = SmartAgent(
+            validate_health=False, settings=Settings(response_cache_size=0)
+        )
+        assert agent.cache is None
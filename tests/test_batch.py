@@ -0,0 +1,137 @@
+"""Tests for JSONL batch execution."""
+
+import asyncio
+import json
+
+import pytest
+
+from smart_agent.batch import (
+    BatchInputError,
+    BatchItem,
+    Checkpoint,
+    parse_line,
+    run_batch,
+)
+from smart_agent.response import AgentResponse
+
+
+class FakeAgent:
+    """Answers prompts after a delay encoded in the prompt, e.g. 'sleep:0.05'."""
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run(self, prompt: str) -> AgentResponse:
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if prompt == "fail":
+                raise RuntimeError("model error")
+            if prompt.startswith("sleep:"):
+                await asyncio.sleep(float(prompt.split(":")[1]))
+            return AgentResponse(
+                content=f"answer to {prompt}", tool_name="", meta={}, duration_ms=1
+            )
+        finally:
+            self.in_flight -= 1
+
+
+def jsonl(*records) -> list[str]:
+    return [json.dumps(r) + "\n" for r in records]
+
+
+async def collect(agent, lines, **kwargs) -> tuple[list[dict], object]:
+    results: list[dict] = []
+    summary = await run_batch(agent, iter(lines), results.append, **kwargs)
+    return results, summary
+
+
+class TestParseLine:
+    def test_object_with_id(self):
+        assert parse_line('{"id": 7, "prompt": "hi"}', 1) == BatchItem("7", "hi")
+
+    def test_query_key_and_line_number_id(self):
+        assert parse_line('{"query": "hi"}', 3) == BatchItem("3", "hi")
+
+    def test_bare_string(self):
+        assert parse_line('"hi"', 2) == BatchItem("2", "hi")
+
+    def test_blank_line(self):
+        assert parse_line("  \n", 1) is None
+
+    @pytest.mark.parametrize("line", ["{not json", '{"id": 1}', "42"])
+    def test_invalid(self, line):
+        with pytest.raises(BatchInputError, match="line 5"):
+            parse_line(line, 5)
+
+
+class TestRunBatch:
+    @pytest.mark.asyncio
+    async def test_results_in_completion_order(self):
+        lines = jsonl(
+            {"id": "slow", "prompt": "sleep:0.1"},
+            {"id": "fast", "prompt": "sleep:0"},
+        )
+        results, summary = await collect(FakeAgent(), lines, concurrency=2)
+
+        assert [r["id"] for r in results] == ["fast", "slow"]
+        assert results[0] == {
+            "id": "fast",
+            "status": "success",
+            "response": "answer to sleep:0",
+            "tool_name": "",
+            "meta": {},
+            "duration_ms": 1,
+            "stages": [],
+        }
+        assert summary.succeeded == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        agent = FakeAgent()
+        lines = jsonl(*({"id": i, "prompt": "sleep:0.01"} for i in range(10)))
+        results, _ = await collect(agent, lines, concurrency=3)
+
+        assert len(results) == 10
+        assert agent.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_and_bad_lines_are_reported(self):
+        lines = [*jsonl({"id": "a", "prompt": "fail"}), "{oops\n"]
+        results, summary = await collect(FakeAgent(), lines, concurrency=1)
+
+        by_id = {r["id"]: r for r in results}
+        assert by_id["a"] == {"id": "a", "status": "error", "error": "model error"}
+        assert "invalid JSON" in by_id["2"]["error"]
+        assert summary.failed == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout_per_prompt(self):
+        lines = jsonl({"id": "a", "prompt": "sleep:1"})
+        results, _ = await collect(FakeAgent(), lines, timeout=0.01)
+
+        assert results == [{"id": "a", "status": "error", "error": "timeout"}]
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_resumes(self, tmp_path):
+        path = str(tmp_path / "done.txt")
+        lines = jsonl(
+            {"id": "a", "prompt": "x"},
+            {"id": "b", "prompt": "fail"},
+            {"id": "c", "prompt": "y"},
+        )
+        checkpoint = Checkpoint(path)
+        await collect(FakeAgent(), lines, checkpoint=checkpoint)
+        checkpoint.close()
+
+        agent = FakeAgent()
+        checkpoint = Checkpoint(path)
+        results, summary = await collect(agent, lines, checkpoint=checkpoint)
+        checkpoint.close()
+
+        assert agent.prompts == ["fail"]
+        assert summary.skipped == 2
+        assert checkpoint.done == {"a", "c"}
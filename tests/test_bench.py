@@ -0,0 +1,101 @@
+"""Tests for the benchmark harness."""
+
+import json
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from smart_agent.bench import (
+    bench_agent,
+    bench_api,
+    bench_parsing,
+    compare,
+    generate_csv,
+    parse_size,
+    run_benchmarks,
+    summarize,
+)
+from smart_agent.cli import app
+
+
+class TestHelpers:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [("512KB", 512 * 1024), ("10mb", 10 * 1024**2), ("1GB", 1024**3), ("7B", 7)],
+    )
+    def test_parse_size(self, text, expected):
+        assert parse_size(text) == expected
+
+    def test_parse_size_invalid(self):
+        with pytest.raises(ValueError, match="Invalid size"):
+            parse_size("lots")
+
+    def test_summarize(self):
+        stats = summarize([i / 1000 for i in range(1, 101)])
+        assert stats["count"] == 100
+        assert stats["p50_ms"] == 50
+        assert stats["p95_ms"] == 95
+        assert stats["p99_ms"] == 99
+        assert stats["max_ms"] == 100
+
+    def test_generated_csv_size(self, tmp_path):
+        path = str(tmp_path / "a.csv")
+        generate_csv(path, 50_000)
+        assert 50_000 <= os.path.getsize(path) < 50_100
+
+    def test_compare(self):
+        baseline = {"results": {"api": {"requests_per_second": 100, "p95_ms": 10}}}
+        current = {"results": {"api": {"requests_per_second": 80, "p95_ms": 5}}}
+        regressions, improvements = compare(baseline, current)
+        assert regressions == ["api.requests_per_second: 100 -> 80 (-20.0%)"]
+        assert improvements == ["api.p95_ms: 10 -> 5 (-50.0%)"]
+
+
+class TestSuites:
+    @pytest.mark.asyncio
+    async def test_parsing(self, tmp_path):
+        results = await bench_parsing(str(tmp_path), ["64KB"], repeat=1)
+        assert set(results) == {"csv/64KB", "markdown/64KB"}
+        assert results["csv/64KB"]["rows"] > 1000
+        assert results["markdown/64KB"]["mb_per_second"] > 0
+
+    @pytest.mark.asyncio
+    async def test_agent(self, tmp_path):
+        results = await bench_agent(str(tmp_path), requests=3)
+        assert results["direct"]["count"] == 3
+        assert results["tool"]["mean_ms"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_api(self):
+        results = await bench_api(requests=20, concurrency=4)
+        assert results["errors"] == 0
+        assert results["latency"]["count"] == 20
+
+    @pytest.mark.asyncio
+    async def test_unknown_suite(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown suite"):
+            await run_benchmarks(["nope"], str(tmp_path))
+
+
+def test_cli_writes_report(tmp_path):
+    output = tmp_path / "report.json"
+    result = CliRunner().invoke(
+        app,
+        [
+            "bench",
+            "run",
+            "--suites",
+            "agent",
+            "--requests",
+            "2",
+            "--data-dir",
+            str(tmp_path),
+            "--output",
+            str(output),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(output.read_text())
+    assert report["results"]["agent"]["direct"]["count"] == 2
+    assert report["mock_ollama"]["reply_tokens"] == 32
@@ -0,0 +1,141 @@
+"""Tests for the response cache and file fingerprints."""
+
+import os
+import threading
+
+import pytest
+
+from smart_agent.cache import ResponseCache, fingerprint_file, normalize_prompt
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+    return str(path)
+
+
+def key(prompt: str = "analyze data.csv") -> str:
+    return ResponseCache.make_key(prompt, "llama3.1:8b", "system", "tools")
+
+
+class TestFingerprint:
+    def test_unchanged_file_has_same_fingerprint(self, data_file):
+        assert fingerprint_file(data_file) == fingerprint_file(data_file)
+
+    def test_changed_content_changes_fingerprint(self, data_file):
+        before = fingerprint_file(data_file)
+        with open(data_file, "w") as f:
+            f.write("a,b\n3,4\n")
+        os.utime(data_file, ns=(before.mtime_ns, before.mtime_ns))
+
+        after = fingerprint_file(data_file)
+        assert after.size == before.size
+        assert after.digest != before.digest
+
+    def test_missing_file(self, tmp_path):
+        assert fingerprint_file(str(tmp_path / "nope.csv")) is None
+
+
+class TestMakeKey:
+    def test_whitespace_is_normalized(self):
+        assert normalize_prompt("  analyze \n data.csv ") == "analyze data.csv"
+        assert key("analyze   data.csv") == key("analyze data.csv")
+
+    def test_every_component_matters(self):
+        base = ResponseCache.make_key("q", "m", "s", "t")
+        assert base != ResponseCache.make_key("q2", "m", "s", "t")
+        assert base != ResponseCache.make_key("q", "m2", "s", "t")
+        assert base != ResponseCache.make_key("q", "m", "s2", "t")
+        assert base != ResponseCache.make_key("q", "m", "s", "t2")
+        assert base != ResponseCache.make_key("q", "m", "s", "t", "/elsewhere")
+
+
+class TestResponseCache:
+    def test_hit_and_miss_counters(self, data_file):
+        cache = ResponseCache()
+        assert cache.get(key()) is None
+
+        cache.put(key(), "two rows", [data_file])
+        assert cache.get(key()) == "two rows"
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 1,
+            "hit_rate": 0.5,
+            "entries": 1,
+        }
+
+    def test_changed_file_invalidates(self, data_file):
+        cache = ResponseCache()
+        cache.put(key(), "two rows", [data_file])
+        with open(data_file, "a") as f:
+            f.write("5,6\n")
+
+        assert cache.get(key()) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_created_file_invalidates_not_found_answer(self, tmp_path):
+        path = tmp_path / "later.csv"
+        cache = ResponseCache()
+        cache.put(key(), "File not found", [str(path)])
+        assert cache.get(key()) == "File not found"
+
+        path.write_text("a\n1\n")
+        assert cache.get(key()) is None
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put(key("a"), "A")
+        cache.put(key("b"), "B")
+        cache.get(key("a"))
+        cache.put(key("c"), "C")
+
+        assert cache.get(key("b")) is None
+        assert cache.get(key("a")) == "A"
+        assert cache.get(key("c")) == "C"
+
+    def test_disk_tier_survives_restart(self, tmp_path, data_file):
+        db = str(tmp_path / "cache" / "responses.sqlite")
+        first = ResponseCache(disk_path=db)
+        first.put(key(), "persisted", [data_file])
+        first.close()
+
+        second = ResponseCache(disk_path=db)
+        assert second.get(key()) == "persisted"
+        second.close()
+
+    def test_disk_tier_size_eviction(self, tmp_path):
+        cache = ResponseCache(
+            max_entries=0, disk_path=str(tmp_path / "c.sqlite"), max_disk_bytes=250
+        )
+        for name in "abc":
+            cache.put(key(name), name * 100)
+
+        assert cache.get(key("a")) is None
+        assert cache.get(key("b")) == "b" * 100
+        assert cache.get(key("c")) == "c" * 100
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_async_api(self, tmp_path):
+        cache = ResponseCache(disk_path=str(tmp_path / "c.sqlite"))
+        await cache.aput(key(), "async")
+
+        assert await cache.aget(key()) == "async"
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_async_lookup_fingerprints_off_the_event_loop(
+        self, data_file, monkeypatch
+    ):
+        cache = ResponseCache()
+        await cache.aput(key(), "two rows", [data_file])
+        threads = []
+
+        def record(self):
+            threads.append(threading.get_ident())
+            return True
+
+        monkeypatch.setattr("smart_agent.cache._Entry.is_fresh", record)
+        assert await cache.aget(key()) == "two rows"
+        assert threads and threading.get_ident() not in threads
@@ -0,0 +1,43 @@
+"""Tests for environment-driven settings."""
+
+from smart_agent.config import Settings
+
+
+class TestSettings:
+    def test_defaults(self, monkeypatch):
+        monkeypatch.delenv("SMART_AGENT_POOL_SIZE", raising=False)
+        assert Settings.from_env() == Settings()
+
+    def test_env_override(self, monkeypatch):
+        monkeypatch.setenv("SMART_AGENT_POOL_SIZE", "25")
+        monkeypatch.setenv("SMART_AGENT_HEALTH_INTERVAL", "2.5")
+
+        settings = Settings.from_env()
+        assert settings.pool_size == 25
+        assert settings.health_interval == 2.5
+
+    def test_invalid_value_is_ignored(self, monkeypatch):
+        monkeypatch.setenv("SMART_AGENT_POOL_SIZE", "many")
+        assert Settings.from_env().pool_size == Settings().pool_size
+
+    def test_config_file(self, monkeypatch, tmp_path):
+        path = tmp_path / "smart-agent.toml"
+        path.write_text('route_model = "tiny"\npool_size = 3\nhealth_interval = 2\n')
+        monkeypatch.setenv("SMART_AGENT_CONFIG", str(path))
+        monkeypatch.setenv("SMART_AGENT_POOL_SIZE", "25")
+
+        settings = Settings.from_env()
+        assert settings.route_model == "tiny"
+        assert settings.health_interval == 2.0
+        assert settings.pool_size == 25  # the environment wins
+
+    def test_config_file_bad_entries_are_ignored(self, monkeypatch, tmp_path):
+        path = tmp_path / "smart-agent.json"
+        path.write_text('{"smart_agent": {"pool_size": true, "colour": "red"}}')
+        monkeypatch.setenv("SMART_AGENT_CONFIG", str(path))
+
+        assert Settings.from_env() == Settings()
+
+    def test_missing_config_file_is_ignored(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("SMART_AGENT_CONFIG", str(tmp_path / "missing.toml"))
+        assert Settings.from_env() == Settings()
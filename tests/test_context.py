@@ -0,0 +1,79 @@
+"""Tests for token-budgeted tool result packing."""
+
+from smart_agent.context import ContextBuilder, estimate_tokens
+from smart_agent.tools.base_tool import ToolResult
+
+
+def _csv_result(rows: int) -> ToolResult:
+    data = [{"id": str(i), "name": f"user{i}", "city": "Paris"} for i in range(rows)]
+    return ToolResult(
+        data=data,
+        meta={
+            "columns": ["id", "name", "city"],
+            "row_count": rows,
+            "file_path": "users.csv",
+        },
+    )
+
+
+class TestContextBuilder:
+    def test_small_result_fits_entirely(self):
+        packed = ContextBuilder(token_budget=1000).pack("CSV Tool", _csv_result(3))
+
+        assert "Columns: id, name, city" in packed.content
+        assert "Rows: 3" in packed.content
+        assert "0,user0,Paris" in packed.content
+        assert "2,user2,Paris" in packed.content
+        assert packed.sections[:3] == ["header", "schema", "rows"]
+
+    def test_large_result_respects_budget(self):
+        packed = ContextBuilder(token_budget=200).pack("CSV Tool", _csv_result(10_000))
+
+        assert packed.tokens_used <= 200
+        assert estimate_tokens(packed.content) == packed.tokens_used
+        assert packed.tokens_dropped > 10_000
+        assert "Rows: 10000" in packed.content
+
+    def test_rows_are_stratified(self):
+        packed = ContextBuilder(token_budget=1000, sample_rows=3).pack(
+            "CSV Tool", _csv_result(101)
+        )
+
+        assert "0,user0,Paris" in packed.content
+        assert "50,user50,Paris" in packed.content
+        assert "100,user100,Paris" in packed.content
+        assert "1,user1,Paris" not in packed.content
+
+    def test_stats_are_kept_before_rows(self):
+        result = _csv_result(1000)
+        result.meta["stats"] = {
+            "id": {"dtype": "int", "min": 0, "max": 999, "histogram": {"counts": []}}
+        }
+        packed = ContextBuilder(token_budget=60).pack("CSV Tool", result)
+
+        assert '- id: dtype="int" min=0 max=999' in packed.content
+        assert "histogram" not in packed.content
+        assert "statistics" in packed.sections
+
+    def test_markdown_outline_and_excerpt(self):
+        content = "# Title\n\nintro\n\n## Part\n\n" + "word " * 2000
+        result = ToolResult(
+            data=content,
+            meta={"file_path": "doc.md", "headers": ["# Title", "## Part"]},
+        )
+        packed = ContextBuilder(token_budget=100).pack("Markdown Tool", result)
+
+        assert "Section outline:\n# Title\n## Part" in packed.content
+        assert "excerpt" in packed.sections
+        assert packed.tokens_used <= 100
+        assert packed.tokens_dropped > 0
+
+    def test_error_result(self):
+        result = ToolResult(data="", meta={"error": "File 'x.csv' not found."})
+        packed = ContextBuilder().pack("CSV Tool", result)
+
+        assert (
+            packed.content
+            == "Tool 'CSV Tool' returned:\nError: File 'x.csv' not found."
+        )
+        assert packed.sections == ["header", "error"]
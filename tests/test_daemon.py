@@ -0,0 +1,119 @@
+"""Tests for the local daemon and its thin client."""
+
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+from typer.testing import CliRunner
+
+from smart_agent.cli import app
+from smart_agent.config import Settings
+from smart_agent.daemon import DaemonClient, DaemonError, DaemonServer
+from smart_agent.mock_ollama import MockOllamaConfig, mock_transport
+
+
+def make_server(path: str) -> DaemonServer:
+    return DaemonServer(
+        path,
+        settings=Settings(response_cache_size=0),
+        ollama_transport=mock_transport(MockOllamaConfig(reply_tokens=3)),
+    )
+
+
+def ask(path: str, op: str = "query", **message) -> list[dict]:
+    with DaemonClient.connect(path, timeout=10) as client:
+        if op != "query":
+            return [client.call(op)]
+        return list(client.query(**message))
+
+
+class TestDaemon:
+    @pytest.mark.asyncio
+    async def test_query_status_and_stop(self, tmp_path):
+        path = str(tmp_path / "d.sock")
+        server = make_server(path)
+        await server.start()
+        serving = asyncio.create_task(server.serve_forever())
+
+        (reply,) = await asyncio.to_thread(ask, path, text="hello")
+        assert reply["status"] == "success"
+        assert len(reply["response"]["content"].split()) == 3
+
+        *deltas, done = await asyncio.to_thread(ask, path, text="hi", stream=True)
+        assert len(deltas) == 3 and done == {"status": "success"}
+
+        (status,) = await asyncio.to_thread(ask, path, "status")
+        assert status["requests"] == 2
+        assert status["pid"] == os.getpid()
+
+        await asyncio.to_thread(ask, path, "stop")
+        await asyncio.wait_for(serving, 5)
+        assert not os.path.exists(path)
+
+    @pytest.mark.asyncio
+    async def test_refuses_second_daemon(self, tmp_path):
+        path = str(tmp_path / "d.sock")
+        server = make_server(path)
+        await server.start()
+        try:
+            with pytest.raises(DaemonError, match="already listening"):
+                await make_server(path).start()
+        finally:
+            await server.aclose()
+
+    @pytest.mark.asyncio
+    async def test_relative_paths_resolve_in_client_directory(
+        self, tmp_path, monkeypatch
+    ):
+        daemon_dir, client_dir = tmp_path / "a", tmp_path / "b"
+        daemon_dir.mkdir()
+        client_dir.mkdir()
+        (client_dir / "data.csv").write_text("x,y\n1,2\n")
+        monkeypatch.chdir(daemon_dir)
+        path = str(tmp_path / "d.sock")
+        server = make_server(path)
+        await server.start()
+
+        def tool_status(cwd: str) -> list[str]:
+            (reply,) = ask(path, text="summarize data.csv", cwd=cwd)
+            stages = reply["response"]["stages"]
+            return [s["meta"]["status"] for s in stages if s["name"] == "tool"]
+
+        try:
+            assert await asyncio.to_thread(tool_status, str(client_dir)) == ["ok"]
+            assert await asyncio.to_thread(tool_status, str(daemon_dir)) == ["error"]
+        finally:
+            await server.aclose()
+
+    def test_connect_without_daemon(self, tmp_path):
+        stale = tmp_path / "stale.sock"
+        stale.write_text("")
+        assert DaemonClient.connect(str(stale)) is None
+        assert DaemonClient.connect(str(tmp_path / "missing.sock")) is None
+
+
+def test_query_command_uses_running_daemon(tmp_path, monkeypatch):
+    path = str(tmp_path / "d.sock")
+    monkeypatch.setenv("SMART_AGENT_DAEMON_SOCKET", path)
+    server = make_server(path)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(
+        target=loop.run_until_complete, args=(server.serve_forever(),)
+    )
+    thread.start()
+    try:
+        result = CliRunner().invoke(
+            app,
+            ["--log-level", "WARNING", "query", "--text", "hello", "--format", "json"],
+        )
+        assert result.exit_code == 0, result.output
+        out = json.loads(result.output)
+        assert out["status"] == "success"
+        assert out["response"]["content"]
+    finally:
+        ask(path, "stop")
+        thread.join(5)
+        loop.close()
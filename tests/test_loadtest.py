@@ -0,0 +1,129 @@
+"""Tests for the /answer load generator."""
+
+import asyncio
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from smart_agent.cli import app
+from smart_agent.loadtest import (
+    PromptMix,
+    Sample,
+    arrival_times,
+    closed_loop,
+    open_loop,
+    summarize_load,
+)
+
+
+class FakeServer:
+    def __init__(self, delay: float = 0.0, status: int = 200):
+        self.delay = delay
+        self.status = status
+        self.prompts: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send(self, prompt: str, client_id: str) -> int:
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return self.status
+
+
+class TestArrivalTimes:
+    def test_constant_rate(self):
+        times = arrival_times(10, 2)
+        assert len(times) == 20
+        assert times[1] == pytest.approx(0.1)
+
+    def test_ramp_sends_average_rate(self):
+        times = arrival_times(10, 10, ramp_to=30)
+        assert len(times) == pytest.approx(200, rel=0.05)
+        assert times[1] - times[0] > times[-1] - times[-2]
+
+    def test_poisson_is_seeded(self):
+        assert arrival_times(50, 1, poisson=True, seed=3) == arrival_times(
+            50, 1, poisson=True, seed=3
+        )
+
+    def test_rates_must_be_positive(self):
+        with pytest.raises(ValueError):
+            arrival_times(10, 1, ramp_to=0)
+
+
+class TestPromptMix:
+    def test_weights_and_unique_suffix(self):
+        mix = PromptMix([("a", 3), ("b", 1)], seed=1)
+        prompts = [mix.next() for _ in range(400)]
+        assert prompts[0].endswith("(#1)")
+        share = sum(p.startswith("a") for p in prompts) / len(prompts)
+        assert share == pytest.approx(0.75, abs=0.07)
+
+    def test_from_file(self, tmp_path):
+        path = tmp_path / "mix.jsonl"
+        path.write_text('"plain"\n{"prompt": "heavy", "weight": 2}\n\n')
+        mix = PromptMix.from_file(str(path), unique=False)
+        assert mix.prompts == ["plain", "heavy"]
+        assert mix.weights == [1.0, 2.0]
+        assert mix.next() in {"plain", "heavy"}
+
+    def test_from_file_rejects_bad_lines(self, tmp_path):
+        path = tmp_path / "mix.jsonl"
+        path.write_text('{"query": "x"}\n')
+        with pytest.raises(ValueError, match="line 1"):
+            PromptMix.from_file(str(path))
+
+
+class TestLoops:
+    @pytest.mark.asyncio
+    async def test_closed_loop_bounds_concurrency(self):
+        server = FakeServer(delay=0.005)
+        samples, elapsed = await closed_loop(
+            server.send, PromptMix([("q", 1)]), users=4, requests=20
+        )
+        assert len(samples) == 20
+        assert server.max_in_flight == 4
+        assert elapsed > 0
+
+    @pytest.mark.asyncio
+    async def test_open_loop_does_not_wait_for_responses(self):
+        server = FakeServer(delay=0.1)
+        schedule = [i * 0.01 for i in range(10)]
+        samples, elapsed = await open_loop(server.send, PromptMix([("q", 1)]), schedule)
+        assert server.max_in_flight == 10
+        assert elapsed < 0.5
+        assert all(s.latency >= 0.1 for s in samples)
+
+
+def test_summarize_load():
+    samples = [
+        Sample(0.1, 0.010, 200),
+        Sample(0.5, 0.020, 200),
+        Sample(1.2, 0.030, 503),
+        Sample(1.4, 0.040, 0),
+    ]
+    report = summarize_load(samples, elapsed=2.0)
+    assert report["status_codes"] == {"200": 2, "503": 1, "error": 1}
+    assert report["error_rate"] == 0.5
+    assert report["throughput"] == 1.0
+    assert report["latency"]["max_ms"] == 20
+    assert [b["requests"] for b in report["timeline"]] == [2, 2]
+    assert report["timeline"][1]["error_rate"] == 1.0
+    assert report["timeline"][1]["p95_ms"] is None
+
+
+def test_cli_against_in_process_app(tmp_path):
+    output = tmp_path / "load.json"
+    result = CliRunner().invoke(
+        app,
+        ["loadtest", "--users", "4", "--requests", "12", "--output", str(output)],
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(output.read_text())
+    assert report["target"] == "in-process"
+    assert report["status_codes"] == {"200": 12}
+    assert report["latency"]["count"] == 12
@@ -0,0 +1,118 @@
+"""Tests for the logging pipeline: queued mode, rate limiting and truncation."""
+
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+from smart_agent import tracing
+from smart_agent.logging_setup import (
+    MAX_MESSAGE_CHARS,
+    RateLimitFilter,
+    Truncated,
+    _QueueHandler,
+    configure_logging,
+    stop_logging,
+)
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def make_record(msg="hello", level=logging.INFO, lineno=1) -> logging.LogRecord:
+    return logging.LogRecord("t", level, "site.py", lineno, msg, None, None)
+
+
+class TestTruncated:
+    def test_not_rendered_when_level_disabled(self):
+        class Expensive:
+            calls = 0
+
+            def __repr__(self):
+                Expensive.calls += 1
+                return "x"
+
+        logger = logging.getLogger("smart_agent.test.lazy")
+        logger.setLevel(logging.INFO)
+        logger.debug("payload: %s", Truncated(Expensive()))
+        assert Expensive.calls == 0
+
+    def test_long_values_are_cut(self):
+        text = str(Truncated("a" * 50, limit=10))
+        assert text == "aaaaaaaaaa... [40 more chars]"
+        assert str(Truncated({"k": 1})) == "{'k': 1}"
+
+
+class TestRateLimitFilter:
+    def test_drops_over_burst_then_reports(self):
+        limiter = RateLimitFilter(rate=0.0, burst=2)
+        assert [limiter.filter(make_record()) for _ in range(4)] == [
+            True,
+            True,
+            False,
+            False,
+        ]
+        # Other call sites and warnings have their own budget
+        assert limiter.filter(make_record(lineno=2))
+        assert limiter.filter(make_record(level=logging.WARNING))
+
+        limiter.rate = 1e9
+        record = make_record()
+        assert limiter.filter(record)
+        assert record.getMessage() == "hello (2 similar messages suppressed)"
+        assert limiter.suppressed == 2
+
+    def test_record_is_judged_once_across_handlers(self):
+        limiter = RateLimitFilter(rate=0.0, burst=1)
+        record = make_record()
+        assert limiter.filter(record) and limiter.filter(record)
+        assert not limiter.filter(make_record())
+
+
+class TestQueuedLogging:
+    def test_records_are_written_by_the_listener(self, restore_logging, capsys):
+        configure_logging(level="INFO", fmt="json", queued=True)
+        logger = logging.getLogger("smart_agent.test.queued")
+        with tracing.request_context("req-9"):
+            logger.info("first")
+            logger.info("x" * (MAX_MESSAGE_CHARS + 100))
+        stop_logging()
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [line["request_id"] for line in lines] == ["req-9", "req-9"]
+        assert lines[0]["message"] == "first"
+        assert lines[1]["message"].endswith("... [100 more chars]")
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = _QueueHandler(queue.Queue(maxsize=1))
+        handler.handle(make_record())
+        handler.handle(make_record())
+        assert handler.dropped == 1
+
+    def test_full_queue_waits_for_room_for_warnings(self):
+        log_queue: queue.Queue[logging.LogRecord] = queue.Queue(maxsize=1)
+        handler = _QueueHandler(log_queue)
+        handler.handle(make_record())
+        threading.Timer(0.02, log_queue.get).start()
+
+        handler.handle(make_record("disk full", level=logging.ERROR))
+        assert handler.dropped == 0
+        assert log_queue.get_nowait().getMessage() == "disk full"
+
+    def test_dropped_records_are_reported_on_stop(self, restore_logging, capsys):
+        configure_logging(level="INFO", fmt="json", queued=True)
+        logging.getLogger().handlers[0].dropped = 3
+        stop_logging()
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines[-1]["level"] == "WARNING"
+        assert "Dropped 3 log records" in lines[-1]["message"]
@@ -0,0 +1,88 @@
+"""Tests for the in-house Prometheus metrics registry."""
+
+import json
+import os
+
+import pytest
+
+from smart_agent.metrics import MetricsRegistry, merge_snapshots, render
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestMetricsRegistry:
+    def test_counter_and_gauge(self, registry):
+        hits = registry.counter("hits_total", "Hits.", ("cache",))
+        hits.inc(cache="tool")
+        hits.inc(2, cache="tool")
+        in_flight = registry.gauge("in_flight", "In flight.")
+        in_flight.inc()
+        in_flight.inc()
+        in_flight.dec()
+
+        text = registry.render()
+        assert "# TYPE hits_total counter" in text
+        assert 'hits_total{cache="tool"} 3' in text
+        assert "in_flight 1" in text
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+
+        lines = registry.render().splitlines()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 2' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+        assert "latency_seconds_sum 5.55" in lines
+        assert "latency_seconds_count 3" in lines
+
+    def test_wrong_labels(self, registry):
+        hits = registry.counter("hits_total", "Hits.", ("cache",))
+        with pytest.raises(ValueError, match="expects labels"):
+            hits.inc(result="hit")
+
+    def test_duplicate_name(self, registry):
+        registry.counter("x", "X.")
+        with pytest.raises(ValueError, match="already registered"):
+            registry.gauge("x", "X.")
+
+    def test_label_values_are_escaped(self, registry):
+        registry.counter("c", "C.", ("tool",)).inc(tool='say "hi"\n')
+        assert 'c{tool="say \\"hi\\"\\n"} 1' in registry.render()
+
+
+class TestMultiWorker:
+    def test_merges_worker_snapshots(self, registry, tmp_path):
+        requests = registry.counter("requests_total", "Requests.")
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(1,))
+        requests.inc()
+        latency.observe(0.5)
+        other = registry.snapshot()
+        other["pid"] = os.getppid()
+        (tmp_path / "worker-other.json").write_text(json.dumps(other))
+        requests.inc()
+
+        text = registry.render(str(tmp_path))
+        assert "requests_total 3" in text
+        assert "latency_seconds_count 2" in text
+
+    def test_gauges_of_dead_workers_are_dropped(self, registry):
+        registry.gauge("in_flight", "In flight.").set(2)
+        registry.counter("requests_total", "Requests.").inc()
+        live = registry.snapshot()
+        dead = {**registry.snapshot(), "pid": 2**22 + 1}
+
+        text = render(merge_snapshots([live, dead]))
+        assert "in_flight 2" in text
+        assert "requests_total 2" in text
+
+    def test_write_snapshot(self, registry, tmp_path):
+        registry.counter("requests_total", "Requests.").inc()
+        registry.write_snapshot(str(tmp_path))
+
+        (snapshot,) = tmp_path.iterdir()
+        assert json.loads(snapshot.read_text())["pid"] == os.getpid()
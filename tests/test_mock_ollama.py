@@ -0,0 +1,72 @@
+"""Tests for the mock Ollama server used by benchmarks."""
+
+import pytest
+
+from ollama import AsyncClient
+from smart_agent.mock_ollama import MockOllamaConfig, mock_transport
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "CSV Tool",
+            "description": "Retrieves CSV data",
+            "parameters": {"type": "object", "properties": {}},
+        },
+    }
+]
+
+
+def client(**config) -> AsyncClient:
+    return AsyncClient(transport=mock_transport(MockOllamaConfig(**config)))
+
+
+class TestMockOllama:
+    @pytest.mark.asyncio
+    async def test_chat_is_deterministic_with_usage(self):
+        messages = [{"role": "user", "content": "hello"}]
+        first = await client(reply_tokens=4).chat(
+            model="llama3.1:8b", messages=messages
+        )
+        second = await client(reply_tokens=4).chat(
+            model="llama3.1:8b", messages=messages
+        )
+
+        assert first.message.content == second.message.content
+        assert len(first.message.content.split()) == 4
+        assert first.eval_count == 4
+        assert first.done
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_one_chunk_per_token(self):
+        chunks = [
+            chunk
+            async for chunk in await client(reply_tokens=3).chat(
+                model="llama3.1:8b",
+                messages=[{"role": "user", "content": "hi"}],
+                stream=True,
+            )
+        ]
+
+        assert len(chunks) == 4
+        assert chunks[-1].done and chunks[-1].eval_count == 3
+        assert "".join(c.message.content for c in chunks).count(" ") == 2
+
+    @pytest.mark.asyncio
+    async def test_tool_call_for_mentioned_file(self):
+        response = await client().chat(
+            model="llama3.1:8b",
+            messages=[{"role": "user", "content": "summarize data/sales.csv"}],
+            tools=TOOLS,
+        )
+
+        (call,) = response.message.tool_calls
+        assert call.function.name == "CSV Tool"
+        assert call.function.arguments == {"file_path": "data/sales.csv"}
+
+    @pytest.mark.asyncio
+    async def test_tags_and_unknown_model(self):
+        mock = client(models=("m1",))
+        assert [m.model for m in (await mock.list()).models] == ["m1"]
+        with pytest.raises(Exception, match="not found"):
+            await mock.chat(model="other", messages=[])
@@ -0,0 +1,98 @@
+"""Tests for model warm-up, keep_alive and keep-warm pings."""
+
+import asyncio
+
+import pytest
+
+from ollama import AsyncClient
+from smart_agent import model_lifecycle
+from smart_agent.agent import LLaMA3Client
+from smart_agent.mock_ollama import MockOllamaConfig, mock_transport
+from smart_agent.model_lifecycle import ModelLifecycle, parse_keep_alive
+
+from .test_agent import FakeClient, text_response
+
+MODEL = "llama3.1:8b"
+
+
+def mock_client(**config) -> AsyncClient:
+    return AsyncClient(transport=mock_transport(MockOllamaConfig(**config)))
+
+
+@pytest.mark.parametrize(
+    "raw, expected", [("30m", "30m"), ("-1", -1.0), ("300", 300.0), (" ", None)]
+)
+def test_parse_keep_alive(raw, expected):
+    assert parse_keep_alive(raw) == expected
+
+
+class TestModelLifecycle:
+    @pytest.mark.asyncio
+    async def test_warm_up_records_load_but_no_cold_start(self):
+        lifecycle = ModelLifecycle(mock_client(load_seconds=2.0), [MODEL], "30m")
+
+        assert await lifecycle.warm_up() == {MODEL: 2.0}
+        stats = lifecycle.stats()
+        assert stats["cold_loads"] == 0
+        assert stats["models"][MODEL]["last_load_ms"] == 2000
+        assert stats["models"][MODEL]["idle_seconds"] is not None
+
+    @pytest.mark.asyncio
+    async def test_warm_up_failure_is_not_raised(self):
+        lifecycle = ModelLifecycle(mock_client(), ["missing"])
+        assert await lifecycle.warm_up() == {}
+
+    @pytest.mark.asyncio
+    async def test_pings_idle_models(self, monkeypatch):
+        monkeypatch.setattr(model_lifecycle, "MIN_PING_DELAY", 0.01)
+        lifecycle = ModelLifecycle(mock_client(), [MODEL], keep_warm_interval=0.02)
+        lifecycle.start()
+        await asyncio.sleep(0.15)
+        await lifecycle.stop()
+        assert lifecycle.pings >= 2
+
+    @pytest.mark.asyncio
+    async def test_ping_reload_is_not_a_cold_start(self, monkeypatch):
+        monkeypatch.setattr(model_lifecycle, "MIN_PING_DELAY", 0.01)
+        lifecycle = ModelLifecycle(
+            mock_client(load_seconds=2.0), [MODEL], keep_warm_interval=0.02
+        )
+        lifecycle.start()
+        await asyncio.sleep(0.05)
+        await lifecycle.stop()
+        assert lifecycle.pings >= 1
+        assert lifecycle.cold_loads == 0
+
+    @pytest.mark.asyncio
+    async def test_pings_disabled(self):
+        lifecycle = ModelLifecycle(mock_client(), [MODEL], keep_warm_interval=0)
+        lifecycle.start()
+        assert lifecycle._pinger is None
+
+
+class TestKeepAliveOnChat:
+    def make_client(self, *responses) -> LLaMA3Client:
+        fake = FakeClient(*responses)
+        client = LLaMA3Client(
+            [],
+            "system",
+            client=fake,
+            lifecycle=ModelLifecycle(fake, [MODEL], keep_alive="1h"),
+        )
+        return client
+
+    @pytest.mark.asyncio
+    async def test_generate_sends_keep_alive_and_records_load(self):
+        final = text_response("hi")
+        final.load_duration = 3_000_000_000
+        client = self.make_client(final)
+
+        assert await client.generate("hello") == "hi"
+        assert client.client.calls[0]["keep_alive"] == "1h"
+        assert client.lifecycle.cold_loads == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_keep_alive(self):
+        client = self.make_client([text_response("hi")])
+        assert [chunk async for chunk in client.generate_stream("hello")] == ["hi"]
+        assert client.client.calls[0]["keep_alive"] == "1h"
@@ -1,5 +1,6 @@
 """Tests for Ollama health check functionality."""
 
+import asyncio
 from unittest.mock import MagicMock, patch
 
 import httpx
@@ -8,6 +9,7 @@ import pytest
 from smart_agent.ollama_health import (
     DEFAULT_MODEL,
     OllamaHealthError,
+    OllamaHealthMonitor,
     check_model_availability,
     check_ollama_service,
     get_available_models,
@@ -167,3 +169,161 @@ class TestOllamaHealthCheck:
         ):
             validate_ollama_setup(custom_model)
             mock_check.assert_called_with(custom_model)
+
+    def test_validate_ollama_setup_model_name_keyword(self):
+        """``model_name`` stays usable as a keyword argument."""
+        with (
+            patch("smart_agent.ollama_health.check_ollama_service", return_value=True),
+            patch(
+                "smart_agent.ollama_health.check_model_availability", return_value=True
+            ) as mock_check,
+        ):
+            validate_ollama_setup(model_name="custom:7b")
+            mock_check.assert_called_once_with("custom:7b")
+
+
+def tags_transport(models, calls, delay=0.0):
+    """Mock Ollama /api/tags; ``models=None`` simulates a stopped service."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        await asyncio.sleep(delay)
+        if models is None:
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, json={"models": [{"model": m} for m in models]})
+
+    return httpx.MockTransport(handler)
+
+
+class TestOllamaHealthMonitor:
+    """Test suite for the cached async health monitor."""
+
+    @pytest.mark.asyncio
+    async def test_every_model_is_checked(self):
+        calls = []
+        monitor = OllamaHealthMonitor(
+            transport=tags_transport([DEFAULT_MODEL, "tiny"], calls)
+        )
+
+        await monitor.ensure_healthy(DEFAULT_MODEL, "tiny")
+        await monitor.ensure_healthy(model_name="tiny")
+        with pytest.raises(OllamaHealthError, match="ollama pull other"):
+            await monitor.ensure_healthy(DEFAULT_MODEL, "other")
+        assert calls == ["/api/tags"]
+
+    @pytest.mark.asyncio
+    async def test_single_round_trip(self):
+        """Service and model availability come from one request."""
+        calls = []
+        monitor = OllamaHealthMonitor(transport=tags_transport([DEFAULT_MODEL], calls))
+
+        await monitor.ensure_healthy()
+        assert calls == ["/api/tags"]
+
+    @pytest.mark.asyncio
+    async def test_cached_within_ttl(self):
+        """Repeated checks within the TTL do not probe again."""
+        calls = []
+        monitor = OllamaHealthMonitor(
+            ttl=60, transport=tags_transport([DEFAULT_MODEL], calls)
+        )
+
+        for _ in range(10):
+            await monitor.ensure_healthy()
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_cache_probes_again(self):
+        """A zero TTL forces a probe each time."""
+        calls = []
+        monitor = OllamaHealthMonitor(
+            ttl=0, transport=tags_transport([DEFAULT_MODEL], calls)
+        )
+
+        await monitor.status()
+        await monitor.status()
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_probe(self):
+        """Callers arriving while a probe is in flight join it."""
+        calls = []
+        monitor = OllamaHealthMonitor(
+            transport=tags_transport([DEFAULT_MODEL], calls, delay=0.05)
+        )
+
+        await asyncio.gather(*(monitor.ensure_healthy() for _ in range(20)))
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_service_down(self):
+        """An unreachable service raises the service error."""
+        monitor = OllamaHealthMonitor(transport=tags_transport(None, []))
+
+        with pytest.raises(OllamaHealthError) as exc_info:
+            await monitor.ensure_healthy()
+        assert "Ollama service is not running" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_model_missing(self):
+        """A missing model lists the models that are available."""
+        monitor = OllamaHealthMonitor(transport=tags_transport(["codellama:7b"], []))
+
+        with pytest.raises(OllamaHealthError) as exc_info:
+            await monitor.ensure_healthy()
+        assert f"ollama pull {DEFAULT_MODEL}" in str(exc_info.value)
+        assert "Available models: codellama:7b" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_service_recovery_is_seen_quickly(self):
+        """A failed probe is not cached for the full TTL."""
+        models = None
+        calls = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            if models is None:
+                raise httpx.ConnectError("connection refused")
+            return httpx.Response(200, json={"models": [{"model": m} for m in models]})
+
+        monitor = OllamaHealthMonitor(
+            ttl=60, negative_ttl=0.01, transport=httpx.MockTransport(handler)
+        )
+        with pytest.raises(OllamaHealthError):
+            await monitor.ensure_healthy()
+
+        models = [DEFAULT_MODEL]
+        await asyncio.sleep(0.02)
+        await monitor.ensure_healthy()
+        await monitor.ensure_healthy()
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_model_is_probed_again(self):
+        """A model pulled after the last probe is found without waiting a TTL."""
+        models = ["codellama:7b"]
+        calls = []
+        monitor = OllamaHealthMonitor(
+            ttl=60, negative_ttl=0.01, transport=tags_transport(models, calls)
+        )
+        with pytest.raises(OllamaHealthError):
+            await monitor.ensure_healthy()
+
+        models.append(DEFAULT_MODEL)
+        await asyncio.sleep(0.02)
+        await monitor.ensure_healthy()
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_background_refresh(self):
+        """start() keeps the cache populated without callers waiting."""
+        calls = []
+        monitor = OllamaHealthMonitor(transport=tags_transport([DEFAULT_MODEL], calls))
+
+        monitor.start(interval=0.01)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        assert len(calls) >= 2
+        assert monitor.cached is not None
+        assert monitor.cached.service_running is True
@@ -0,0 +1,32 @@
+"""Tests for lazy tool plugin loading."""
+
+import sys
+
+import pytest
+
+from smart_agent import registry
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_ENTRY_POINTS", None)
+    monkeypatch.setattr(registry, "_TOOLS_CACHE", None)
+    monkeypatch.setattr(registry, "_LOADED", {})
+
+
+def test_tool_names_do_not_import_plugins(fresh_registry, monkeypatch):
+    monkeypatch.delitem(sys.modules, "smart_agent.tools.md_tool", raising=False)
+    assert {"csv_tool", "md_tool"} <= set(registry.tool_names())
+    assert "smart_agent.tools.md_tool" not in sys.modules
+
+
+def test_load_tool_once(fresh_registry):
+    tool = registry.load_tool("md_tool")
+    assert tool.get_name() == "Markdown Tool"
+    assert registry.load_tool("md_tool") is tool
+    assert tool in registry.load_tools()
+
+
+def test_load_unknown_tool(fresh_registry):
+    with pytest.raises(KeyError):
+        registry.load_tool("nope")
@@ -0,0 +1,101 @@
+"""Tests for per-stage model routing."""
+
+import pytest
+
+from smart_agent.agent import AgentStep, SmartAgent
+from smart_agent.config import Settings
+from smart_agent.routing import ModelRouter
+
+from .test_agent import SleepTool, make_client, text_response, tool_call_response
+
+ROUTER = ModelRouter(route="tiny", synthesis="main", direct="main")
+
+
+class TestModelRouter:
+    def test_falls_back_to_main_model(self):
+        router = ModelRouter.from_settings(Settings(model="main", route_model="tiny"))
+
+        assert router == ROUTER
+        assert router.models == ["tiny", "main"]
+        assert router.reroutes_direct
+
+    def test_single_model_key_is_the_model(self):
+        router = ModelRouter.single("main")
+
+        assert router.models == ["main"]
+        assert router.key == "main"
+        assert not router.reroutes_direct
+        assert ROUTER.key != router.key
+
+    def test_unknown_stage(self):
+        with pytest.raises(ValueError, match="Unknown stage"):
+            ROUTER.model_for("summary")
+
+
+class TestRoutedGenerate:
+    @pytest.mark.asyncio
+    async def test_tool_choice_and_synthesis_models(self):
+        client = make_client(
+            [SleepTool("a")],
+            tool_call_response(("a", "x.csv")),
+            text_response("done"),
+            router=ROUTER,
+        )
+        steps: list[AgentStep] = []
+
+        assert await client.generate("read x", steps) == "done"
+        assert [call["model"] for call in client.client.calls] == ["tiny", "main"]
+        assert [(s.stage, s.model) for s in steps] == [
+            ("route", "tiny"),
+            ("synthesis", "main"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_direct_model_answers_without_tools(self):
+        client = make_client(
+            [SleepTool("a")],
+            text_response("draft"),
+            text_response("answer"),
+            router=ModelRouter(route="tiny", synthesis="main", direct="chat"),
+        )
+        steps: list[AgentStep] = []
+
+        assert await client.generate("hello", steps) == "answer"
+        route, direct = client.client.calls
+        assert route["model"] == "tiny" and route["tools"]
+        assert direct["model"] == "chat" and direct["tools"] is None
+        assert [s.stage for s in steps] == ["route", "direct"]
+
+    @pytest.mark.asyncio
+    async def test_same_direct_model_keeps_the_routing_answer(self):
+        client = make_client(
+            [SleepTool("a")],
+            text_response("hello"),
+            router=ModelRouter(route="tiny", synthesis="main", direct="tiny"),
+        )
+
+        assert await client.generate("hi") == "hello"
+        assert len(client.client.calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_holds_back_the_routing_answer(self):
+        client = make_client(
+            [SleepTool("a")],
+            [text_response("draft")],
+            [text_response("ans"), text_response("wer")],
+            router=ROUTER,
+        )
+
+        chunks = [chunk async for chunk in client.generate_stream("hello")]
+        assert chunks == ["ans", "wer"]
+        assert [call["model"] for call in client.client.calls] == ["tiny", "main"]
+
+
+def test_agent_loads_every_routed_model():
+    agent = SmartAgent(
+        validate_health=False,
+        settings=Settings(model="main", route_model="tiny", response_cache_size=0),
+    )
+
+    assert agent.llm.router == ROUTER
+    assert agent.lifecycle.models == ["tiny", "main"]
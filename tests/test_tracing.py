@@ -0,0 +1,160 @@
+"""Tests for request ids, spans and span exporters."""
+
+import json
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from smart_agent import tracing
+from smart_agent.agent import SmartAgent
+from smart_agent.config import Settings
+from smart_agent.logging_setup import JsonFormatter
+
+from .test_agent import FakeClient, SleepTool, text_response, tool_call_response
+
+
+@pytest.fixture
+def span_file(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracing.configure_tracing(f"file:{path}")
+    yield path
+    tracing.shutdown_tracing()
+
+
+def read_spans(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestSpans:
+    def test_disabled_returns_shared_noop(self):
+        assert not tracing.is_enabled()
+        with tracing.span("a", x=1) as first, tracing.span("b") as second:
+            first.set_attribute("y", 2)
+        assert first is second
+        assert not first.recording
+        assert tracing.current_span() is None
+
+    def test_nesting_and_attributes(self, span_file):
+        with tracing.span("outer", model="m") as outer:
+            with tracing.span("inner") as inner:
+                inner.set_attributes(rows=3)
+            outer.set_attribute("tokens", 10)
+
+        inner_record, outer_record = read_spans(span_file)
+        assert inner_record["parent_span_id"] == outer_record["span_id"]
+        assert inner_record["trace_id"] == outer_record["trace_id"]
+        assert outer_record["parent_span_id"] is None
+        assert inner_record["attributes"] == {"rows": 3}
+        assert outer_record["attributes"] == {"model": "m", "tokens": 10}
+        assert outer_record["duration_ms"] >= inner_record["duration_ms"]
+
+    def test_error_is_recorded(self, span_file):
+        with pytest.raises(RuntimeError), tracing.span("boom"):
+            raise RuntimeError("bad")
+
+        assert read_spans(span_file)[0]["error"] == "RuntimeError: bad"
+        assert tracing.current_span() is None
+
+    def test_unknown_target(self):
+        with pytest.raises(ValueError, match="Unknown trace export target"):
+            tracing.configure_tracing("jaeger")
+        assert not tracing.is_enabled()
+
+
+class TestRequestContext:
+    def test_outer_id_is_kept(self):
+        with tracing.request_context("abc") as outer:
+            with tracing.request_context() as inner:
+                assert inner == outer == "abc"
+        assert tracing.current_request_id() is None
+
+    def test_json_formatter_includes_ids(self, span_file):
+        record = logging.LogRecord("t", logging.INFO, __file__, 1, "hi", None, None)
+        formatter = JsonFormatter()
+        assert "request_id" not in json.loads(formatter.format(record))
+
+        with tracing.request_context("req-1"), tracing.span("work") as span:
+            entry = json.loads(formatter.format(record))
+
+        assert entry["request_id"] == "req-1"
+        assert entry["trace_id"] == span.trace_id
+        assert entry["span_id"] == span.span_id
+
+
+class TestOtlpExporter:
+    def test_batches_are_posted_as_otlp_json(self):
+        bodies: list[dict] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/v1/traces"
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200)
+
+        exporter = tracing.OtlpHttpExporter(
+            "http://collector:4318", transport=httpx.MockTransport(handler)
+        )
+        with tracing.request_context("req-1"):
+            with tracing.Span("llm.chat", {"tokens": 5, "stream": False}, exporter):
+                pass
+        exporter.shutdown()
+
+        (body,) = bodies
+        (encoded,) = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert encoded["name"] == "llm.chat"
+        assert len(encoded["traceId"]) == 32
+        assert encoded["status"] == {"code": 1}
+        assert {"key": "tokens", "value": {"intValue": "5"}} in encoded["attributes"]
+        assert {
+            "key": "request.id",
+            "value": {"stringValue": "req-1"},
+        } in encoded["attributes"]
+
+
+class TestInstrumentation:
+    @pytest.mark.asyncio
+    async def test_agent_run_emits_spans(self, span_file, tmp_path):
+        data = tmp_path / "x.csv"
+        data.write_text("a,b\n1,2\n")
+        first = tool_call_response(("a", str(data)))
+        final = text_response("answer")
+        final.prompt_eval_count, final.eval_count = 30, 4
+        agent = SmartAgent(validate_health=False, settings=Settings())
+        agent.llm.tools = [SleepTool("a")]
+        agent.llm.client = FakeClient(first, final)
+
+        await agent.run("look at x")
+
+        spans = read_spans(span_file)
+        assert [s["name"] for s in spans] == [
+            "llm.chat",
+            "tool.run",
+            "llm.chat",
+            "agent.run",
+        ]
+        root = spans[-1]
+        assert root["request_id"]
+        assert {s["request_id"] for s in spans} == {root["request_id"]}
+        assert {s["parent_span_id"] for s in spans[:-1]} == {root["span_id"]}
+        assert spans[1]["attributes"]["file.size"] == data.stat().st_size
+        assert spans[1]["attributes"]["status"] == "ok"
+        assert spans[2]["attributes"]["prompt_tokens"] == 30
+        assert root["attributes"]["eval_tokens"] == 4
+
+    def test_middleware_echoes_request_id(self):
+        api = FastAPI()
+        api.add_middleware(tracing.RequestContextMiddleware)
+
+        @api.get("/id")
+        async def current():
+            return {"id": tracing.current_request_id()}
+
+        client = TestClient(api)
+        response = client.get("/id", headers={"X-Request-Id": "given"})
+        assert response.json() == {"id": "given"}
+        assert response.headers["x-request-id"] == "given"
+
+        generated = client.get("/id")
+        assert generated.headers["x-request-id"] == generated.json()["id"]
@@ -0,0 +1,86 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from smart_agent.tools.csv_columnar import profile_array, profile_columns, read_columnar
+
+
+class TestReadColumnar:
+    @pytest.fixture
+    def mixed_csv_file(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            f.write("n,x,flag,city\n")
+            f.write("1,1,true,Paris\n")
+            f.write("2,2,false,London\n")
+            f.write("3,2.5,true,Paris\n")
+            f.write("4,,true,\n")
+            temp_file = f.name
+        yield temp_file
+        os.unlink(temp_file)
+
+    def test_typed_columns_across_chunks(self, mixed_csv_file):
+        table = read_columnar(mixed_csv_file, chunk_size=2)
+
+        assert table.row_count == 4
+        assert table.columns["n"].dtype == np.int64
+        # Integer in the first chunk, float with a null in the second
+        assert table.columns["x"].dtype == np.float64
+        assert table.columns["flag"].dtype == bool
+        assert table.columns["city"].dtype == object
+        assert table.nbytes > 0
+
+    def test_preview(self, mixed_csv_file):
+        table = read_columnar(mixed_csv_file, chunk_size=3, preview_rows=4)
+
+        assert len(table.preview) == 4
+        assert table.preview[0]["city"] == "Paris"
+        assert table.preview[3]["city"] is None
+
+    def test_header_only(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            f.write("a,b\n")
+            temp_file = f.name
+        try:
+            table = read_columnar(temp_file)
+            assert table.row_count == 0
+            assert list(table.columns) == ["a", "b"]
+            assert profile_columns(table)["a"]["count"] == 0
+        finally:
+            os.unlink(temp_file)
+
+
+class TestProfileArray:
+    def test_numeric_summary(self):
+        summary = profile_array(np.arange(1, 101, dtype=np.int64))
+
+        assert summary["dtype"] == "int"
+        assert summary["min"] == 1
+        assert summary["max"] == 100
+        assert summary["distinct"] == 100
+        assert summary["quantiles"]["p50"] == pytest.approx(50.5)
+        assert sum(summary["histogram"]["counts"]) == 100
+        assert len(summary["histogram"]["edges"]) == 11
+
+    def test_float_nulls(self):
+        summary = profile_array(np.array([1.0, np.nan, 3.0, 3.0]))
+
+        assert summary["count"] == 3
+        assert summary["nulls"] == 1
+        assert summary["top_k"][0] == [3.0, 2]
+
+    def test_string_summary(self):
+        summary = profile_array(np.array(["a", "bb", None, "a"], dtype=object))
+
+        assert summary["dtype"] == "string"
+        assert summary["nulls"] == 1
+        assert summary["distinct"] == 2
+        assert summary["top_k"][0] == ["a", 2]
+        assert summary["length"]["max"] == 2
+
+    def test_bool_summary(self):
+        summary = profile_array(np.array([True, False, True]))
+
+        assert summary["dtype"] == "bool"
+        assert summary["top_k"] == [[True, 2], [False, 1]]
@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+from smart_agent.tools.csv_stats import ColumnStats, DistinctEstimator
+
+ESTIMATE_SCRIPT = """
+from smart_agent.tools.csv_stats import DistinctEstimator
+estimator = DistinctEstimator(k=64)
+for i in range(5_000):
+    estimator.add(f"value-{i}")
+print(estimator.estimate())
+"""
+
+
+class TestDistinctEstimator:
+    def test_exact_below_k(self):
+        estimator = DistinctEstimator(k=16)
+        for value in ["a", "b", "a", "c"]:
+            estimator.add(value)
+
+        assert estimator.exact is True
+        assert estimator.estimate() == 3
+
+    def test_estimate_above_k_is_close(self):
+        estimator = DistinctEstimator(k=256)
+        for i in range(20_000):
+            estimator.add(str(i % 10_000))
+
+        assert estimator.exact is False
+        assert 8_000 < estimator.estimate() < 12_000
+
+    def test_estimate_is_stable_across_processes(self):
+        estimates = {
+            subprocess.run(
+                [sys.executable, "-c", ESTIMATE_SCRIPT],
+                env={**os.environ, "PYTHONHASHSEED": seed},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            for seed in ("1", "2")
+        }
+
+        assert len(estimates) == 1
+
+
+class TestColumnStats:
+    def test_int_column(self):
+        stats = ColumnStats("n")
+        stats.update(["3", "10", "-2"])
+
+        result = stats.to_dict()
+        assert result["dtype"] == "int"
+        assert result["min"] == -2
+        assert result["max"] == 10
+
+    def test_widens_across_chunks(self):
+        stats = ColumnStats("n")
+        stats.update(["1", "2"])
+        stats.update(["2.5"])
+
+        assert stats.to_dict()["dtype"] == "float"
+        stats.update(["abc"])
+        assert stats.to_dict()["dtype"] == "string"
+
+    def test_nulls_are_not_counted(self):
+        stats = ColumnStats("n")
+        stats.update(["", "NA", "null", "4"])
+
+        result = stats.to_dict()
+        assert result["nulls"] == 3
+        assert result["count"] == 1
+
+    def test_bool_mixed_with_numbers_is_string(self):
+        stats = ColumnStats("flag")
+        stats.update(["true", "false"])
+        assert stats.to_dict()["dtype"] == "bool"
+
+        stats.update(["1"])
+        assert stats.to_dict()["dtype"] == "string"
+
+    def test_empty_column(self):
+        assert ColumnStats("x").to_dict()["dtype"] == "empty"
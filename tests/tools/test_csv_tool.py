@@ -92,6 +92,13 @@ class TestCsvTool:
         finally:
             os.unlink(malformed_file)
 
+    @pytest.mark.asyncio
+    async def test_run_small_file_is_not_streamed(self, csv_tool, sample_csv_file):
+        result = await csv_tool.run(file_path=sample_csv_file)
+
+        assert "mode" not in result.meta
+        assert "stats" not in result.meta
+
     def test_read_csv_method(self, csv_tool, sample_csv_file):
         data, columns = csv_tool._read_csv(sample_csv_file)
 
@@ -100,3 +107,172 @@ class TestCsvTool:
         assert data[0]["name"] == "John"
         assert data[1]["name"] == "Jane"
         assert data[2]["name"] == "Bob"
+
+
+class TestCsvToolStreaming:
+    @pytest.fixture
+    def streaming_tool(self):
+        return CsvTool(engine="stream", chunk_size=2, preview_rows=2)
+
+    @pytest.fixture
+    def numeric_csv_file(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            f.write("id,score,label\n")
+            f.write("1,2.5,a\n")
+            f.write("2,,b\n")
+            f.write("3,7.0,a\n")
+            f.write("4,1.0\n")  # Missing column
+            f.write("5,3.5,c\n")
+            temp_file = f.name
+        yield temp_file
+        os.unlink(temp_file)
+
+    @pytest.mark.asyncio
+    async def test_run_streaming_keeps_meta_keys(
+        self, streaming_tool, numeric_csv_file
+    ):
+        result = await streaming_tool.run(file_path=numeric_csv_file)
+
+        assert isinstance(result, ToolResult)
+        assert result.meta["columns"] == ["id", "score", "label"]
+        assert result.meta["row_count"] == 5
+        assert result.meta["file_path"] == numeric_csv_file
+        assert result.meta["mode"] == "stream"
+
+    @pytest.mark.asyncio
+    async def test_run_streaming_bounds_preview(self, streaming_tool, numeric_csv_file):
+        result = await streaming_tool.run(file_path=numeric_csv_file)
+
+        assert len(result.data) == 2
+        assert result.meta["preview_rows"] == 2
+        assert result.data[0] == {"id": "1", "score": "2.5", "label": "a"}
+
+    @pytest.mark.asyncio
+    async def test_run_streaming_column_stats(self, streaming_tool, numeric_csv_file):
+        result = await streaming_tool.run(file_path=numeric_csv_file)
+        stats = result.meta["stats"]
+
+        assert stats["id"]["dtype"] == "int"
+        assert stats["id"]["min"] == 1
+        assert stats["id"]["max"] == 5
+        assert stats["score"]["dtype"] == "float"
+        assert stats["score"]["nulls"] == 1
+        assert stats["score"]["count"] == 4
+        assert stats["label"]["dtype"] == "string"
+        assert stats["label"]["nulls"] == 1
+        assert stats["label"]["distinct"] == 3
+
+    @pytest.mark.asyncio
+    async def test_run_streaming_nonexistent_file(self, streaming_tool):
+        result = await streaming_tool.run(file_path="nonexistent.csv")
+
+        assert result.data == ""
+        assert "not found" in result.meta["error"]
+
+    @pytest.mark.asyncio
+    async def test_auto_mode_streams_above_threshold(self, numeric_csv_file):
+        tool = CsvTool(stream_threshold_bytes=1, columnar_max_bytes=1)
+        result = await tool.run(file_path=numeric_csv_file)
+
+        assert result.meta["mode"] == "stream"
+        assert result.meta["row_count"] == 5
+
+
+class TestCsvToolColumnar:
+    @pytest.fixture
+    def columnar_tool(self):
+        return CsvTool(engine="columnar", chunk_size=2, preview_rows=2)
+
+    @pytest.fixture
+    def numeric_csv_file(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            f.write("id,score,label\n")
+            f.write("1,2.5,a\n")
+            f.write("2,,b\n")
+            f.write("3,7.0,a\n")
+            temp_file = f.name
+        yield temp_file
+        os.unlink(temp_file)
+
+    @pytest.mark.asyncio
+    async def test_run_columnar(self, columnar_tool, numeric_csv_file):
+        result = await columnar_tool.run(file_path=numeric_csv_file)
+
+        assert result.meta["mode"] == "columnar"
+        assert result.meta["columns"] == ["id", "score", "label"]
+        assert result.meta["row_count"] == 3
+        assert len(result.data) == 2
+        assert result.data[1]["score"] is None
+
+        stats = result.meta["stats"]
+        assert stats["id"]["dtype"] == "int"
+        assert stats["score"]["dtype"] == "float"
+        assert stats["score"]["nulls"] == 1
+        assert stats["label"]["top_k"][0] == ["a", 2]
+
+    @pytest.mark.asyncio
+    async def test_auto_mode_prefers_columnar(self, numeric_csv_file):
+        tool = CsvTool(stream_threshold_bytes=1)
+        result = await tool.run(file_path=numeric_csv_file)
+
+        assert result.meta["mode"] == "columnar"
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            CsvTool(engine="spark")
+
+
+class TestCsvToolEngines:
+    @pytest.fixture
+    def ragged_csv_file(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".csv", delete=False) as f:
+            f.write("id,score,label\n")
+            f.write("1,2.5,a\n")
+            f.write("2,4.0\n")  # Missing column
+            f.write("3,1.5,b,extra\n")  # Extra column
+            f.write("\n")  # Blank line
+            f.write("4,,c\n")
+            temp_file = f.name
+        yield temp_file
+        os.unlink(temp_file)
+
+    @pytest.mark.asyncio
+    async def test_ragged_rows_agree_across_engines(self, ragged_csv_file):
+        results = {
+            engine: await CsvTool(engine=engine, chunk_size=2).run(
+                file_path=ragged_csv_file
+            )
+            for engine in ("rows", "stream", "columnar")
+        }
+
+        for result in results.values():
+            assert result.meta["columns"] == ["id", "score", "label"]
+            assert result.meta["row_count"] == 4
+        assert results["rows"].data == results["stream"].data
+        assert results["rows"].data[1] == {"id": "2", "score": "4.0", "label": ""}
+        assert results["rows"].data[2] == {"id": "3", "score": "1.5", "label": "b"}
+        for name in ("id", "score", "label"):
+            stream = results["stream"].meta["stats"][name]
+            columnar = results["columnar"].meta["stats"][name]
+            assert (stream["count"], stream["nulls"]) == (
+                columnar["count"],
+                columnar["nulls"],
+            )
+
+    def test_auto_mode_streams_large_files(self, ragged_csv_file, monkeypatch):
+        monkeypatch.setattr(os.path, "getsize", lambda path: 64 * 1024 * 1024)
+
+        assert CsvTool()._select_engine(ragged_csv_file) == "stream"
+
+    def test_engine_settings_from_env(self, ragged_csv_file, monkeypatch):
+        monkeypatch.setattr(os.path, "getsize", lambda path: 64 * 1024 * 1024)
+        monkeypatch.setenv("SMART_AGENT_CSV_COLUMNAR_MAX_BYTES", str(128 * 1024**2))
+        assert CsvTool()._select_engine(ragged_csv_file) == "columnar"
+
+        monkeypatch.setenv("SMART_AGENT_CSV_ENGINE", "stream")
+        assert CsvTool().engine == "stream"
+        assert CsvTool(engine="rows").engine == "rows"
+
+    def test_invalid_engine_setting_falls_back_to_auto(self, monkeypatch):
+        monkeypatch.setenv("SMART_AGENT_CSV_ENGINE", "spark")
+        assert CsvTool().engine == "auto"
@@ -0,0 +1,124 @@
+import os
+import tempfile
+
+import pytest
+
+from smart_agent.tools.base_tool import BaseTool, ToolResult
+from smart_agent.tools.csv_tool import CsvTool
+from smart_agent.tools.result_cache import ToolResultCache, estimate_size
+
+
+class CountingTool(BaseTool):
+    def __init__(self, cache: ToolResultCache, fail: bool = False):
+        self.result_cache = cache
+        self.fail = fail
+        self._calls = 0
+
+    async def run(self, *args, **kwargs) -> ToolResult:
+        self._calls += 1
+        if self.fail:
+            return ToolResult(data="", meta={"error": "boom"})
+        with open(kwargs["file_path"]) as f:
+            return ToolResult(data=f.read(), meta={"call": self._calls})
+
+    def get_name(self) -> str:
+        return "Counting Tool"
+
+    def to_ollama_tool(self) -> dict:
+        return {}
+
+
+class TestToolResultCache:
+    @pytest.fixture
+    def cache(self):
+        return ToolResultCache()
+
+    @pytest.fixture
+    def sample_file(self):
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+            f.write("hello")
+            temp_file = f.name
+        yield temp_file
+        os.unlink(temp_file)
+
+    @pytest.mark.asyncio
+    async def test_repeat_call_is_served_from_cache(self, cache, sample_file):
+        tool = CountingTool(cache)
+        first = await tool.run(file_path=sample_file)
+        second = await tool.run(file_path=sample_file)
+        assert tool._calls == 1
+        assert second is first
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_file_change_invalidates(self, cache, sample_file):
+        tool = CountingTool(cache)
+        await tool.run(file_path=sample_file)
+        with open(sample_file, "w") as f:
+            f.write("hello, world")
+        result = await tool.run(file_path=sample_file)
+        assert tool._calls == 2
+        assert result.data == "hello, world"
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, cache, sample_file):
+        tool = CountingTool(cache, fail=True)
+        await tool.run(file_path=sample_file)
+        await tool.run(file_path=sample_file)
+        assert tool._calls == 2
+        assert cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_files_and_positional_calls_bypass_cache(
+        self, cache, sample_file
+    ):
+        tool = CountingTool(cache, fail=True)
+        await tool.run(file_path="does_not_exist.txt")
+        await tool.run(sample_file)
+        assert cache.stats()["hits"] + cache.stats()["misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_results_false_disables(self, cache, sample_file):
+        tool = CountingTool(cache)
+        tool.cache_results = False
+        await tool.run(file_path=sample_file)
+        await tool.run(file_path=sample_file)
+        assert tool._calls == 2
+
+    @pytest.mark.asyncio
+    async def test_tool_configuration_is_part_of_key(self, cache, sample_file):
+        with open(sample_file, "w") as f:
+            f.write("a,b\n1,2\n3,4\n")
+        rows = CsvTool(engine="rows")
+        rows.result_cache = cache
+        stream = CsvTool(engine="stream")
+        stream.result_cache = cache
+        assert "mode" not in (await rows.run(file_path=sample_file)).meta
+        assert (await stream.run(file_path=sample_file)).meta["mode"] == "stream"
+        assert "mode" not in (await rows.run(file_path=sample_file)).meta
+        assert cache.stats()["hits"] == 1
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        result = ToolResult(data="x" * 1000, meta={})
+        size = estimate_size(result.data) + estimate_size(result.meta)
+        cache = ToolResultCache(max_bytes=size * 2)
+        cache.put("a", result)
+        cache.put("b", result)
+        cache.get("a")
+        cache.put("c", result)
+        assert cache.get("b") is None
+        assert cache.get("a") is result
+        assert cache.stats()["evictions"] == 1
+        assert cache.bytes == size * 2
+
+    def test_oversized_result_is_not_stored(self):
+        cache = ToolResultCache(max_bytes=10)
+        cache.put("a", ToolResult(data="x" * 100, meta={}))
+        assert cache.stats()["entries"] == 0
+
+    def test_estimate_size_extrapolates_long_lists(self):
+        rows = [{"a": "1"} for _ in range(10_000)]
+        estimate = estimate_size(rows)
+        exact = estimate_size(rows[:1]) * 10_000
+        assert 0.5 * exact < estimate < 1.5 * exact